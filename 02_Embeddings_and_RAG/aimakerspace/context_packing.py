@@ -0,0 +1,115 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+    tiktoken = None
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base"):
+    """Returns a process-wide tiktoken encoding, or None if tiktoken is not installed."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    return tiktoken.get_encoding(encoding_name)
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """
+    Token count of text. Results are memoized because the same retrieved chunks
+    come back across many requests. Without tiktoken, ~4 characters per token
+    is assumed.
+    """
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode_ordinary(text))
+
+
+class ContextPacker:
+    """
+    Fills a prompt's {context} slot from ranked chunks within a token budget.
+
+    Chunks are taken greedily by descending score; exact duplicates
+    (ignoring case and whitespace) are skipped, and a chunk that does not fit is
+    skipped so that smaller, lower-ranked chunks can still use the remaining
+    budget. Statistics for the last call are kept in self.last_stats.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        separator: str = "\n\n",
+        encoding_name: str = "cl100k_base",
+    ):
+        self.token_budget = token_budget
+        self.separator = separator
+        self.encoding_name = encoding_name
+        self.last_stats: Dict[str, int] = {}
+
+    def pack(self, chunks: Sequence[Union[str, Tuple[str, float]]]) -> str:
+        """
+        :param chunks: Chunk texts in rank order, or (text, score) pairs such as
+            the output of VectorDatabase.search_by_text
+        :return: The packed context string
+        """
+        scored = [
+            (chunk, float(-rank)) if isinstance(chunk, str) else (chunk[0], float(chunk[1]))
+            for rank, chunk in enumerate(chunks)
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+
+        separator_tokens = count_tokens(self.separator, self.encoding_name)
+        input_tokens = sum(count_tokens(text, self.encoding_name) for text, _ in scored)
+        if scored:
+            input_tokens += separator_tokens * (len(scored) - 1)
+
+        selected: List[str] = []
+        seen = set()
+        used_tokens = 0
+        for text, _ in scored:
+            key = " ".join(text.lower().split())
+            if key in seen:
+                continue
+            seen.add(key)
+            cost = count_tokens(text, self.encoding_name) + (separator_tokens if selected else 0)
+            if used_tokens + cost > self.token_budget:
+                continue
+            selected.append(text)
+            used_tokens += cost
+
+        self.last_stats = {
+            "chunks_in": len(scored),
+            "chunks_packed": len(selected),
+            "input_tokens": input_tokens,
+            "packed_tokens": used_tokens,
+            "tokens_saved": input_tokens - used_tokens,
+        }
+        return self.separator.join(selected)
+
+    def format_prompt(self, prompt: Any, chunks: Sequence[Union[str, Tuple[str, float]]], **kwargs) -> str:
+        """Packs chunks into prompt's {context} variable and formats it (e.g. a UserRolePrompt)."""
+        return prompt.format_prompt(context=self.pack(chunks), **kwargs)
+
+    def create_message(self, prompt: Any, chunks: Sequence[Union[str, Tuple[str, float]]], **kwargs) -> Dict[str, str]:
+        """Like format_prompt, but returns the role message from a RolePrompt."""
+        return prompt.create_message(context=self.pack(chunks), **kwargs)
+
+
+if __name__ == "__main__":
+    from aimakerspace.openai_utils.prompts import UserRolePrompt
+
+    user_prompt = UserRolePrompt("Context:\n{context}\n\nUser Query:\n{user_query}")
+    ranked = [
+        ("Pell Grants are awarded based on financial need.", 0.91),
+        ("pell grants are awarded  based on financial need.", 0.90),
+        ("Direct Loans are offered to students and parents.", 0.72),
+        ("A long tangential passage. " * 200, 0.65),
+    ]
+    packer = ContextPacker(token_budget=100)
+    print(packer.create_message(user_prompt, ranked, user_query="Who gets a Pell Grant?"))
+    print(packer.last_stats)
@@ -1,5 +1,6 @@
 import re
-from typing import Dict, List, Any, Optional, Union, Callable
+from string import Formatter
+from typing import Dict, Iterable, List, Any, Optional, Union, Callable, Tuple
 from abc import ABC, abstractmethod
 
 
@@ -8,6 +9,42 @@ class PromptValidationError(Exception):
     pass
 
 
+_CONVERSIONS = {None: lambda value: value, "s": str, "r": repr, "a": ascii}
+
+# A compiled template is a list of segments: a literal string, or a
+# (variable_name, format_spec, conversion) tuple for a placeholder
+Segment = Union[str, Tuple[str, str, Optional[str]]]
+
+
+def _compile_format_template(template: str) -> List[Segment]:
+    """Parses a str.format-style template once into literal and placeholder segments."""
+    segments: List[Segment] = []
+    try:
+        for literal, name, spec, conversion in Formatter().parse(template):
+            if literal:
+                segments.append(literal)
+            if name is not None:
+                if not name or conversion not in _CONVERSIONS:
+                    raise ValueError(f"unsupported placeholder {{{name}}}")
+                segments.append((name, spec or "", conversion))
+    except ValueError as e:
+        raise PromptValidationError(f"Invalid template syntax: {e}")
+    return segments
+
+
+def _render_segments(segments: List[Segment], values: Dict[str, Any]) -> str:
+    """Renders compiled segments with a single join; missing variables render as ''."""
+    parts = []
+    for segment in segments:
+        if segment.__class__ is str:
+            parts.append(segment)
+        else:
+            name, spec, conversion = segment
+            value = _CONVERSIONS[conversion](values.get(name, ""))
+            parts.append(format(value, spec))
+    return "".join(parts)
+
+
 class ConditionalPrompt:
     """Enhanced prompt with conditional logic support"""
     
@@ -24,56 +61,95 @@ class ConditionalPrompt:
         :param strict: If True, raises error when required variables are missing
         :param defaults: Default values for template variables
         """
-        self.prompt = prompt
         self.strict = strict
         self.defaults = defaults or {}
         self._var_pattern = re.compile(r'\{([^{}]+)\}')
         self._conditional_pattern = re.compile(r'\{if\s+([^}]+)\}(.*?)(?:\{else\}(.*?))?\{/if\}', re.DOTALL)
-        
+        self.prompt = prompt
+
+    @property
+    def prompt(self) -> str:
+        return self._prompt
+
+    @prompt.setter
+    def prompt(self, prompt: str) -> None:
+        self._prompt = prompt
+        self._nodes = self._compile(prompt)
+
+    def _compile_text(self, text: str) -> List[Segment]:
+        """Splits plain text into literal and {variable} segments."""
+        segments: List[Segment] = []
+        position = 0
+        for match in self._var_pattern.finditer(text):
+            if match.start() > position:
+                segments.append(text[position:match.start()])
+            segments.append((match.group(1), "", None))
+            position = match.end()
+        if position < len(text):
+            segments.append(text[position:])
+        return segments
+
+    def _compile(self, prompt: str) -> List[Any]:
+        """
+        Parses the template once into a flat node list: literal strings,
+        variable tuples, and conditional nodes of the form
+        ("if", condition, true_segments, false_segments).
+        """
+        nodes: List[Any] = []
+        position = 0
+        for match in self._conditional_pattern.finditer(prompt):
+            nodes.extend(self._compile_text(prompt[position:match.start()]))
+            true_content = match.group(2).strip()
+            false_content = match.group(3).strip() if match.group(3) else ""
+            nodes.append((
+                "if",
+                match.group(1).strip(),
+                self._compile_text(true_content),
+                self._compile_text(false_content),
+            ))
+            position = match.end()
+        nodes.extend(self._compile_text(prompt[position:]))
+        return nodes
+
     def format_prompt(self, **kwargs) -> str:
         """Format prompt with conditional logic evaluation"""
         merged_kwargs = {**self.defaults, **kwargs}
-        
-        # Process conditional statements
-        result = self._process_conditionals(self.prompt, merged_kwargs)
-        
-        # Process regular variables
-        variables = self._var_pattern.findall(result)
-        
+
+        # Resolve conditionals to the segments of the chosen branch
+        segments: List[Segment] = []
+        for node in self._nodes:
+            if node.__class__ is tuple and node[0] == "if":
+                _, condition, true_segments, false_segments = node
+                chosen = true_segments if self._condition_holds(condition, merged_kwargs) else false_segments
+                segments.extend(chosen)
+            else:
+                segments.append(node)
+
         if self.strict:
-            missing_vars = set(variables) - set(merged_kwargs.keys())
+            variables = {segment[0] for segment in segments if segment.__class__ is tuple}
+            missing_vars = variables - set(merged_kwargs.keys())
             if missing_vars:
                 raise PromptValidationError(f"Missing required variables: {missing_vars}")
-        
-        # Format remaining variables
-        for var in variables:
-            value = merged_kwargs.get(var, "")
-            result = result.replace(f"{{{var}}}", str(value))
-            
-        return result
-    
-    def _process_conditionals(self, text: str, context: Dict[str, Any]) -> str:
-        """Process conditional statements in the text"""
-        def replace_conditional(match):
-            condition = match.group(1).strip()
-            true_content = match.group(2).strip()
-            false_content = match.group(3).strip() if match.group(3) else ""
-            
-            # Evaluate condition
-            try:
-                # Simple evaluation - check if variable exists and is truthy
-                if condition in context:
-                    condition_result = bool(context[condition])
-                else:
-                    # Try to evaluate as a simple expression
-                    condition_result = self._evaluate_condition(condition, context)
-                
-                return true_content if condition_result else false_content
-            except Exception:
-                return false_content
-        
-        return self._conditional_pattern.sub(replace_conditional, text)
-    
+
+        return "".join(
+            segment if segment.__class__ is str else str(merged_kwargs.get(segment[0], ""))
+            for segment in segments
+        )
+
+    def format_many(self, list_of_kwargs: Iterable[Dict[str, Any]]) -> List[str]:
+        """Formats the prompt once per kwargs dict, reusing the compiled template"""
+        return [self.format_prompt(**kwargs) for kwargs in list_of_kwargs]
+
+    def _condition_holds(self, condition: str, context: Dict[str, Any]) -> bool:
+        try:
+            # Simple evaluation - check if variable exists and is truthy
+            if condition in context:
+                return bool(context[condition])
+            # Try to evaluate as a simple expression
+            return self._evaluate_condition(condition, context)
+        except Exception:
+            return False
+
     def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> bool:
         """Evaluate simple conditions like 'var > 5' or 'var == "value"'"""
         # Simple equality check
@@ -115,19 +191,21 @@ class BasePrompt:
         :param strict: If True, raises error when required variables are missing
         :param defaults: Default values for template variables
         """
-        self.prompt = prompt
         self.strict = strict
         self.defaults = defaults or {}
-        self._pattern = re.compile(r"\{([^}]+)\}")
-        self._validate_template()
+        self.prompt = prompt
 
-    def _validate_template(self) -> None:
-        """Validates the template syntax"""
-        try:
-            test_vars = {var: "test" for var in self.get_input_variables()}
-            self.prompt.format(**test_vars)
-        except (KeyError, ValueError) as e:
-            raise PromptValidationError(f"Invalid template syntax: {e}")
+    @property
+    def prompt(self) -> str:
+        return self._prompt
+
+    @prompt.setter
+    def prompt(self, prompt: str) -> None:
+        """Compiles the template once; format_prompt only renders the segments."""
+        self._segments = _compile_format_template(prompt)
+        self._variables = [segment[0] for segment in self._segments if segment.__class__ is tuple]
+        self._variable_set = set(self._variables)
+        self._prompt = prompt
 
     def format_prompt(self, **kwargs) -> str:
         """
@@ -137,29 +215,53 @@ class BasePrompt:
         :return: The formatted prompt string
         :raises PromptValidationError: If strict mode and required variables are missing
         """
-        variables = self.get_input_variables()
-        merged_kwargs = {**self.defaults, **kwargs}
-        
+        merged_kwargs = {**self.defaults, **kwargs} if self.defaults else kwargs
+
         if self.strict:
-            missing_vars = set(variables) - set(merged_kwargs.keys())
+            missing_vars = self._variable_set - merged_kwargs.keys()
             if missing_vars:
                 raise PromptValidationError(f"Missing required variables: {missing_vars}")
-        
-        # Use defaults for missing variables
-        format_dict = {var: merged_kwargs.get(var, self.defaults.get(var, "")) for var in variables}
-        
+
         try:
-            return self.prompt.format(**format_dict)
+            return _render_segments(self._segments, merged_kwargs)
         except (KeyError, ValueError) as e:
             raise PromptValidationError(f"Error formatting prompt: {e}")
 
+    def format_many(self, list_of_kwargs: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Formats the prompt once per kwargs dict, reusing the compiled template.
+
+        A template without variables renders to one shared string.
+
+        :param list_of_kwargs: One dict of substitution values per prompt
+        :return: The formatted prompt strings, in input order
+        :raises PromptValidationError: If strict mode and required variables are missing
+        """
+        if not self._variables:
+            rendered = _render_segments(self._segments, {})
+            return [rendered for _ in list_of_kwargs]
+        defaults, strict, variable_set = self.defaults, self.strict, self._variable_set
+        segments = self._segments
+        results = []
+        for kwargs in list_of_kwargs:
+            merged_kwargs = {**defaults, **kwargs} if defaults else kwargs
+            if strict:
+                missing_vars = variable_set - merged_kwargs.keys()
+                if missing_vars:
+                    raise PromptValidationError(f"Missing required variables: {missing_vars}")
+            try:
+                results.append(_render_segments(segments, merged_kwargs))
+            except (KeyError, ValueError) as e:
+                raise PromptValidationError(f"Error formatting prompt: {e}")
+        return results
+
     def get_input_variables(self) -> List[str]:
         """
         Gets the list of input variable names from the prompt string.
 
         :return: List of input variable names
         """
-        return self._pattern.findall(self.prompt)
+        return list(self._variables)
     
     def validate_inputs(self, **kwargs) -> Dict[str, List[str]]:
         """
@@ -168,7 +270,7 @@ class BasePrompt:
         :param kwargs: Variables to validate
         :return: Dict with 'missing' and 'extra' keys containing respective variable names
         """
-        required_vars = set(self.get_input_variables())
+        required_vars = self._variable_set
         provided_vars = set(kwargs.keys())
         
         return {
@@ -209,6 +311,27 @@ class RolePrompt(BasePrompt):
         
         return {"role": self.role, "content": self.prompt}
 
+    def create_messages(self, list_of_kwargs: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Creates one message per kwargs dict via format_many.
+
+        Items that render to the same content share a single message dict (e.g.
+        a system prompt repeated across a bulk run), so treat the returned
+        messages as read-only.
+
+        :param list_of_kwargs: One dict of substitution values per message
+        :return: List of message dictionaries, in input order
+        """
+        shared: Dict[str, Dict[str, str]] = {}
+        role = self.role
+        messages = []
+        for content in self.format_many(list_of_kwargs):
+            message = shared.get(content)
+            if message is None:
+                message = shared[content] = {"role": role, "content": content}
+            messages.append(message)
+        return messages
+
 
 class SystemRolePrompt(RolePrompt):
     def __init__(self, prompt: str, strict: bool = False, defaults: Optional[Dict[str, Any]] = None):
@@ -304,6 +427,42 @@ class MessageAdapter:
                 converted.append(msg)
         return converted
     
+    @classmethod
+    def convert_many(cls, conversations: Iterable[List[Dict[str, str]]], provider: str = "openai") -> List[Any]:
+        """
+        Convert many conversations to a provider format in one call.
+
+        Converted system messages are memoized by content, so a system prompt
+        shared by every conversation is converted once and the same converted
+        message object is reused; treat the results as read-only.
+
+        :param conversations: Lists of OpenAI-style messages
+        :param provider: 'openai', 'anthropic' or 'cohere'
+        :return: One converted conversation per input, in order
+        """
+        if provider == "openai":
+            return list(conversations)
+        if provider == "cohere":
+            return [cls.to_cohere(messages) for messages in conversations]
+        if provider != "anthropic":
+            raise ValueError(f"Unsupported provider: {provider}")
+
+        converted_system: Dict[str, Dict[str, str]] = {}
+        results = []
+        for messages in conversations:
+            converted = []
+            for msg in messages:
+                if msg['role'] == 'system':
+                    content = msg['content']
+                    system_message = converted_system.get(content)
+                    if system_message is None:
+                        system_message = converted_system[content] = {"role": "user", "content": f"System: {content}"}
+                    converted.append(system_message)
+                else:
+                    converted.append(msg)
+            results.append(converted)
+        return results
+
     @staticmethod
     def to_cohere(messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """Convert to Cohere format"""
@@ -0,0 +1,116 @@
+"""Micro-benchmark for aimakerspace prompt rendering at realistic RAG prompt sizes.
+
+Compares the compiled BasePrompt / ConditionalPrompt against the previous
+per-call regex implementations, reproduced below as legacy_* functions.
+
+Usage:
+    python bench_prompts.py [--iterations N]
+"""
+import argparse
+import random
+import re
+import timeit
+
+from aimakerspace.openai_utils.prompts import BasePrompt, ConditionalPrompt
+
+RAG_TEMPLATE = """Use the provided context to answer the user's query.
+
+You may not answer the user's query unless there is specific context in the following text.
+
+If you do not know the answer, or cannot answer, please respond with "I don't know".
+
+Context:
+{context}
+
+User Query:
+{user_query}"""
+
+CONDITIONAL_TEMPLATE = (
+    "{if include_sources}Cite the source of every claim.{else}Do not cite sources.{/if}\n"
+    "Answer in a {tone} tone for a {audience} audience.\n\n"
+    "Context:\n{context}\n\nUser Query:\n{user_query}\n"
+    "{if length > 100}Keep the answer under {length} words.{/if}"
+)
+
+_BASE_PATTERN = re.compile(r"\{([^}]+)\}")
+_VAR_PATTERN = re.compile(r"\{([^{}]+)\}")
+_CONDITIONAL_PATTERN = re.compile(
+    r"\{if\s+([^}]+)\}(.*?)(?:\{else\}(.*?))?\{/if\}", re.DOTALL
+)
+
+
+def legacy_base_format(template, **kwargs):
+    variables = _BASE_PATTERN.findall(template)
+    return template.format(**{var: kwargs.get(var, "") for var in variables})
+
+
+def legacy_conditional_format(template, **kwargs):
+    def replace_conditional(match):
+        condition = match.group(1).strip()
+        if condition in kwargs:
+            holds = bool(kwargs[condition])
+        else:
+            left, _, right = condition.partition(">")
+            holds = float(kwargs.get(left.strip(), 0)) > float(right)
+        if holds:
+            return match.group(2).strip()
+        return match.group(3).strip() if match.group(3) else ""
+
+    result = _CONDITIONAL_PATTERN.sub(replace_conditional, template)
+    for var in _VAR_PATTERN.findall(result):
+        result = result.replace(f"{{{var}}}", str(kwargs.get(var, "")))
+    return result
+
+
+def make_context(size_chars, seed=0):
+    rng = random.Random(seed)
+    words = ["loan", "grant", "student", "aid", "federal", "eligibility", "award",
+             "repayment", "interest", "subsidized", "institution", "enrollment"]
+    parts, length = [], 0
+    while length < size_chars:
+        sentence = " ".join(rng.choice(words) for _ in range(12)).capitalize() + ". "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size_chars]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    base_prompt = BasePrompt(RAG_TEMPLATE)
+    conditional_prompt = ConditionalPrompt(CONDITIONAL_TEMPLATE)
+
+    print(f"{'template':<12} {'context':>8} {'legacy us':>10} {'compiled us':>12} {'speedup':>8}")
+    for size in (2_000, 10_000, 40_000):
+        kwargs = {
+            "context": make_context(size),
+            "user_query": "What is the maximum Pell Grant award?",
+            "include_sources": True,
+            "tone": "friendly",
+            "audience": "student",
+            "length": 150,
+        }
+        # Output equivalence is covered by tests/test_prompts.py; this only guards the timings
+        if (
+            legacy_base_format(RAG_TEMPLATE, **kwargs) != base_prompt.format_prompt(**kwargs)
+            or legacy_conditional_format(CONDITIONAL_TEMPLATE, **kwargs)
+            != conditional_prompt.format_prompt(**kwargs)
+        ):
+            raise SystemExit(f"compiled prompts render differently at {size:,} characters")
+
+        runs = [
+            ("base", lambda: legacy_base_format(RAG_TEMPLATE, **kwargs),
+             lambda: base_prompt.format_prompt(**kwargs)),
+            ("conditional", lambda: legacy_conditional_format(CONDITIONAL_TEMPLATE, **kwargs),
+             lambda: conditional_prompt.format_prompt(**kwargs)),
+        ]
+        for name, legacy, compiled in runs:
+            legacy_us = min(timeit.repeat(legacy, number=args.iterations, repeat=3)) / args.iterations * 1e6
+            compiled_us = min(timeit.repeat(compiled, number=args.iterations, repeat=3)) / args.iterations * 1e6
+            print(f"{name:<12} {size:>8,} {legacy_us:>10.1f} {compiled_us:>12.1f} {legacy_us / compiled_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import pytest
+
+from aimakerspace.openai_utils.prompts import (
+    BasePrompt,
+    ConditionalPrompt,
+    PromptValidationError,
+    SystemRolePrompt,
+)
+from bench_prompts import (
+    CONDITIONAL_TEMPLATE,
+    RAG_TEMPLATE,
+    legacy_base_format,
+    legacy_conditional_format,
+    make_context,
+)
+
+CASES = [
+    {"context": make_context(2_000), "user_query": "What is a Pell Grant?",
+     "include_sources": True, "tone": "friendly", "audience": "student", "length": 150},
+    {"context": "", "user_query": "Who qualifies?",
+     "include_sources": False, "tone": "formal", "audience": "parent", "length": 50},
+    {"context": make_context(500, seed=1), "user_query": "Do loans accrue interest?",
+     "include_sources": "", "tone": "plain", "audience": "borrower", "length": 100},
+]
+
+
+@pytest.mark.parametrize("kwargs", CASES + [{"user_query": "No context given"}])
+def test_compiled_base_prompt_matches_per_call_rendering(kwargs):
+    assert BasePrompt(RAG_TEMPLATE).format_prompt(**kwargs) == legacy_base_format(
+        RAG_TEMPLATE, **kwargs
+    )
+
+
+@pytest.mark.parametrize("kwargs", CASES)
+def test_compiled_conditional_prompt_matches_per_call_rendering(kwargs):
+    assert ConditionalPrompt(CONDITIONAL_TEMPLATE).format_prompt(
+        **kwargs
+    ) == legacy_conditional_format(CONDITIONAL_TEMPLATE, **kwargs)
+
+
+def test_base_prompt_format_specs_defaults_and_strict_mode():
+    prompt = BasePrompt("{name!r} scored {score:.1f} in {subject}", defaults={"subject": "math"})
+    assert prompt.get_input_variables() == ["name", "score", "subject"]
+    assert prompt.format_prompt(name="Ada", score=9.25) == "'Ada' scored 9.2 in math"
+
+    strict = BasePrompt("Hello {name}", strict=True)
+    with pytest.raises(PromptValidationError, match="name"):
+        strict.format_prompt()
+    with pytest.raises(PromptValidationError):
+        BasePrompt("Hello {name")
+
+
+def test_changing_the_template_recompiles_it():
+    prompt = BasePrompt("Hello {name}")
+    prompt.prompt = "Bye {name}, see you {when}"
+    assert prompt.get_input_variables() == ["name", "when"]
+    assert prompt.format_prompt(name="Ada", when="soon") == "Bye Ada, see you soon"
+
+
+def test_format_many_matches_format_prompt():
+    prompt = BasePrompt("Q: {question}", defaults={"question": "none"})
+    items = [{"question": "a"}, {}, {"question": "c"}]
+    assert prompt.format_many(items) == [prompt.format_prompt(**item) for item in items]
+    assert BasePrompt("static").format_many([{}, {}]) == ["static", "static"]
+
+
+def test_conditional_branches_and_comparisons():
+    prompt = ConditionalPrompt(
+        "{if verbose}Long{else}Short{/if}|{if count > 2}many{/if}|{if mode == 'json'}JSON{/if}"
+    )
+    assert prompt.format_prompt(verbose=True, count=3, mode="json") == "Long|many|JSON"
+    assert prompt.format_prompt(verbose=False, count=2, mode="text") == "Short||"
+
+
+def test_create_messages_shares_identical_messages():
+    prompt = SystemRolePrompt("You answer questions about {topic}.")
+    messages = prompt.create_messages([{"topic": "loans"}, {"topic": "loans"}, {"topic": "grants"}])
+    assert [m["content"] for m in messages] == [
+        "You answer questions about loans.",
+        "You answer questions about loans.",
+        "You answer questions about grants.",
+    ]
+    assert messages[0] is messages[1]
+    assert messages[0]["role"] == "system"
@@ -0,0 +1,144 @@
+from typing import List, Tuple
+
+import numpy as np
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Picks (bands, rows) whose LSH threshold (1/bands)^(1/rows) is closest to threshold."""
+    best = (num_perm, 1)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashDeduplicator:
+    """
+    Drops near-duplicate chunks before they are embedded.
+
+    Chunks are normalized (lower-cased, whitespace collapsed) and shingled into
+    shingle_size-character windows anchored at word starts, which keeps about
+    one shingle per word instead of one per character. MinHash signatures are
+    computed for a whole batch of chunks at once with NumPy, and LSH banding
+    finds candidate pairs whose estimated Jaccard similarity is then checked
+    against threshold. The first occurrence of every near-duplicate group is
+    kept, in input order.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 12,
+        batch_size: int = 10_000,
+        seed: int = 1,
+    ):
+        assert 0 < threshold <= 1, "threshold must be in (0, 1]"
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.batch_size = batch_size
+        self.bands, self.rows = _choose_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family; odd multipliers keep it a permutation mod 2**64
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2**63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.num_dropped = 0
+
+    def _shingle_hashes(self, chunks: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (shingle hashes of all chunks, start offset of each chunk's shingles)."""
+        k = self.shingle_size
+        encoded = [" ".join(chunk.lower().split()).encode("utf-8").ljust(k) for chunk in chunks]
+        lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+        positions = len(data) - k + 1
+        hashes = np.zeros(positions, dtype=np.uint64)
+        for j in range(k):
+            hashes = hashes * np.uint64(257) + data[j : j + positions]
+        hashes ^= hashes >> np.uint64(29)
+        hashes *= _MIX
+
+        # Keep windows that start a word (or a chunk) and do not straddle two chunks
+        ends = np.cumsum(lengths)
+        chunk_starts = ends - lengths
+        chunk_ids = np.repeat(np.arange(len(chunks)), lengths)[:positions]
+        index = np.arange(positions)
+        word_start = np.zeros(positions, dtype=bool)
+        word_start[1:] = data[: positions - 1] == ord(" ")
+        word_start[chunk_starts[chunk_starts < positions]] = True
+        valid = word_start & (index + k <= ends[chunk_ids])
+        # Every chunk is padded to k bytes, so its first window is always valid
+        counts = np.bincount(chunk_ids[valid], minlength=len(chunks))
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return hashes[valid], offsets
+
+    def signatures(self, chunks: List[str]) -> np.ndarray:
+        """MinHash signatures, shape (len(chunks), num_perm)."""
+        signatures = np.empty((len(chunks), self.num_perm), dtype=np.uint64)
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start : start + self.batch_size]
+            hashes, offsets = self._shingle_hashes(batch)
+            permuted = np.empty_like(hashes)
+            for p in range(self.num_perm):
+                np.multiply(hashes, self._a[p], out=permuted)
+                permuted += self._b[p]
+                signatures[start : start + len(batch), p] = np.minimum.reduceat(permuted, offsets)
+        return signatures
+
+    def dedupe(self, chunks: List[str]) -> List[str]:
+        """Returns chunks without near-duplicates; the number removed is kept in self.num_dropped."""
+        if not chunks:
+            self.num_dropped = 0
+            return []
+
+        signatures = self.signatures(chunks)
+        band_keys = np.stack(
+            [
+                signatures[:, band * self.rows : (band + 1) * self.rows] @ self._band_mix
+                for band in range(self.bands)
+            ],
+            axis=1,
+        ).tolist()
+
+        # Every kept chunk is registered in each of its band buckets, so a later
+        # chunk is compared with all kept chunks it shares any band with
+        buckets = [{} for _ in range(self.bands)]
+        kept = []
+        for i, keys in enumerate(band_keys):
+            duplicate = False
+            candidates = {
+                j for band, key in enumerate(keys) for j in buckets[band].get(key, ())
+            }
+            for j in sorted(candidates):
+                if np.mean(signatures[i] == signatures[j]) >= self.threshold:
+                    duplicate = True
+                    break
+            if duplicate:
+                continue
+            kept.append(i)
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(i)
+
+        self.num_dropped = len(chunks) - len(kept)
+        return [chunks[i] for i in kept]
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    from aimakerspace.text_utils import CharacterTextSplitter, PDFLoader
+    from aimakerspace.vectordatabase import VectorDatabase
+
+    documents = PDFLoader("data").load_documents()
+    chunks = CharacterTextSplitter().split_texts(documents)
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    unique_chunks = deduplicator.dedupe(chunks)
+    print(f"Dropped {deduplicator.num_dropped} of {len(chunks)} chunks as near-duplicates")
+    vector_db = asyncio.run(VectorDatabase().abuild_from_list(unique_chunks))
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from aimakerspace.text_utils import CharacterTextSplitter, PDFLoader, TextFileLoader
+from aimakerspace.vectordatabase import VectorDatabase
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+MANIFEST_VERSION = 2
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_digest(chunk: str) -> str:
+    """
+    Stable id of a chunk: the SHA-256 of its text. The source is left out on
+    purpose, because VectorDatabase stores a chunk shared by several files once.
+    """
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    Records, per source file, its size, mtime and content hash together with
+    the digests of the chunks it produced (see chunk_digest), so a re-ingest
+    can tell which files are new, changed or removed without keeping a second
+    copy of the corpus.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.files = state["files"]
+            if state.get("version", 1) < 2:
+                # Version 1 stored the chunk texts themselves
+                for entry in self.files.values():
+                    entry["chunk_ids"] = [chunk_digest(chunk) for chunk in entry["chunk_ids"]]
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+    def diff(self, file_paths: List[str]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Compares file_paths against the manifest.
+
+        Files whose size and mtime match are assumed unchanged without hashing;
+        otherwise the content hash decides, so a touched but identical file is
+        not re-ingested.
+
+        :return: (changed, removed, unchanged) where changed includes new files
+        """
+        changed, unchanged = [], []
+        for path in file_paths:
+            entry = self.files.get(path)
+            stat = os.stat(path)
+            if entry is None:
+                changed.append(path)
+            elif entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                unchanged.append(path)
+            elif file_sha256(path) == entry["sha256"]:
+                entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+                unchanged.append(path)
+            else:
+                changed.append(path)
+        current = set(file_paths)
+        removed = [path for path in self.files if path not in current]
+        return changed, removed, unchanged
+
+    def record(self, path: str, chunks: List[str]) -> None:
+        stat = os.stat(path)
+        self.files[path] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": file_sha256(path),
+            "chunk_ids": [chunk_digest(chunk) for chunk in chunks],
+        }
+
+    def forget(self, path: str) -> List[str]:
+        return self.files.pop(path, {}).get("chunk_ids", [])
+
+    def chunk_ids(self) -> set:
+        return {chunk_id for entry in self.files.values() for chunk_id in entry["chunk_ids"]}
+
+
+class IncrementalIngestor:
+    """
+    Keeps a VectorDatabase in sync with a directory of .txt/.pdf files.
+
+    The manifest and the vectors are stored side by side in state_dir, so a
+    later run (or process) only loads, splits and embeds new or changed files
+    and deletes the chunks of files that disappeared.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        state_dir: str,
+        splitter: Optional[CharacterTextSplitter] = None,
+        vector_db: Optional[VectorDatabase] = None,
+    ):
+        self.data_dir = data_dir
+        self.state_dir = state_dir
+        self.splitter = splitter or CharacterTextSplitter()
+        self.manifest = IngestionManifest(os.path.join(state_dir, "manifest.json"))
+        self.vectors_path = os.path.join(state_dir, "vectors.npz")
+        if vector_db is None:
+            if os.path.exists(self.vectors_path):
+                vector_db = VectorDatabase.load(self.vectors_path)
+            else:
+                # Vectors are gone, so every file has to be embedded again
+                vector_db = VectorDatabase()
+                self.manifest.files = {}
+        self.vector_db = vector_db
+
+    def _source_files(self) -> List[str]:
+        file_paths = []
+        for root, _, files in os.walk(self.data_dir):
+            for file in files:
+                if file.lower().endswith(SUPPORTED_EXTENSIONS):
+                    file_paths.append(os.path.join(root, file))
+        return sorted(file_paths)
+
+    def _load_text(self, path: str) -> str:
+        if path.lower().endswith(".pdf"):
+            return "".join(PDFLoader(path).load_documents())
+        return "".join(TextFileLoader(path).load_documents())
+
+    async def aingest(self) -> Dict[str, int]:
+        changed, removed, unchanged = self.manifest.diff(self._source_files())
+
+        previous_ids = self.manifest.chunk_ids()
+        for path in removed:
+            self.manifest.forget(path)
+
+        new_chunks = []
+        for path in changed:
+            chunks = list(dict.fromkeys(self.splitter.split(self._load_text(path))))
+            self.manifest.record(path, chunks)
+            new_chunks.extend(chunks)
+
+        # Chunk ids are digests of the chunk text, so one shared by several files
+        # is only deleted once no file in the manifest references it anymore
+        current_ids = self.manifest.chunk_ids()
+        stale_ids = previous_ids - current_ids
+        if stale_ids:
+            keys_by_id = {chunk_digest(str(key)): key for key in self.vector_db.vectors}
+            for chunk_id in stale_ids:
+                if chunk_id in keys_by_id:
+                    self.vector_db.delete(keys_by_id[chunk_id])
+
+        to_embed = [
+            chunk for chunk in dict.fromkeys(new_chunks) if chunk not in self.vector_db.vectors
+        ]
+        if to_embed:
+            await self.vector_db.abuild_from_list(to_embed)
+
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.vector_db.save(self.vectors_path)
+        self.manifest.save()
+
+        return {
+            "changed": len(changed),
+            "removed": len(removed),
+            "unchanged": len(unchanged),
+            "chunks_embedded": len(to_embed),
+            "chunks_deleted": len(stale_ids),
+        }
+
+    def ingest(self) -> Dict[str, int]:
+        return asyncio.run(self.aingest())
+
+
+if __name__ == "__main__":
+    ingestor = IncrementalIngestor("data", ".ingest_state")
+    print(ingestor.ingest())
+    print(f"{len(ingestor.vector_db.vectors)} chunks indexed")
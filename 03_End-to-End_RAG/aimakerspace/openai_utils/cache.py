@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def make_cache_key(model_name: str, messages: List[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    """Returns a stable hash of a chat request (model, messages and call kwargs)."""
+    payload = {"model": model_name, "messages": messages, "kwargs": kwargs}
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created_at = entry
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    def __init__(
+        self,
+        path: str = "cache/chat_responses.db",
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = 100_000,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        if self.max_entries is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (excess,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for chat completions: an in-memory LRU in front of an
+    optional SQLite store. Values found only in SQLite are promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_memory_entries: int = 1024,
+        sqlite_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_sqlite_entries: Optional[int] = 100_000,
+    ):
+        self.memory = LRUCache(max_memory_entries, ttl_seconds=ttl_seconds)
+        self.sqlite = (
+            SQLiteCache(sqlite_path, ttl_seconds=ttl_seconds, max_entries=max_sqlite_entries)
+            if sqlite_path
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None and self.sqlite is not None:
+            value = self.sqlite.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.sqlite is not None:
+            self.sqlite.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.sqlite is not None:
+            self.sqlite.clear()
+
+
+if __name__ == "__main__":
+    cache = ResponseCache(sqlite_path="cache/example.db", ttl_seconds=60)
+    key = make_cache_key("gpt-4o-mini", [{"role": "user", "content": "Hello!"}], {"temperature": 0})
+    print(cache.get(key))
+    cache.set(key, "Hi there!")
+    print(cache.get(key))
+    print(f"hits={cache.hits} misses={cache.misses}")
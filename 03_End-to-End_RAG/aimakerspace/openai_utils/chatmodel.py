@@ -1,13 +1,23 @@
 from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
+from typing import Optional
 import os
 
+from aimakerspace.openai_utils.cache import ResponseCache, make_cache_key
+
 load_dotenv()
 
 
 class ChatOpenAI:
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        cache: Optional[ResponseCache] = None,
+        replay_chunk_size: int = 32,
+    ):
         self.model_name = model_name
+        self.cache = cache
+        self.replay_chunk_size = replay_chunk_size
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         if self.openai_api_key is None:
             raise ValueError("OPENAI_API_KEY is not set")
@@ -16,20 +26,41 @@ class ChatOpenAI:
         if not isinstance(messages, list):
             raise ValueError("messages must be a list")
 
+        # Only plain-text completions are cached; full response objects are not
+        cache_key = None
+        if self.cache is not None and text_only:
+            cache_key = make_cache_key(self.model_name, messages, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         client = OpenAI()
         response = client.chat.completions.create(
             model=self.model_name, messages=messages, **kwargs
         )
 
         if text_only:
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
+            if cache_key is not None and content is not None:
+                self.cache.set(cache_key, content)
+            return content
 
         return response
-    
+
     async def astream(self, messages, **kwargs):
         if not isinstance(messages, list):
             raise ValueError("messages must be a list")
-        
+
+        # Streamed and non-streamed calls share a key, so either can serve the other
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(self.model_name, messages, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                for i in range(0, len(cached), self.replay_chunk_size):
+                    yield cached[i : i + self.replay_chunk_size]
+                return
+
         client = AsyncOpenAI()
 
         stream = await client.chat.completions.create(
@@ -39,7 +70,12 @@ class ChatOpenAI:
             **kwargs
         )
 
+        parts = []
         async for chunk in stream:
             content = chunk.choices[0].delta.content
             if content is not None:
+                parts.append(content)
                 yield content
+
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
@@ -1,5 +1,12 @@
+import codecs
+import mmap
 import os
-from typing import List
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
 import PyPDF2
 
 
@@ -24,18 +31,133 @@ class TextFileLoader:
             self.documents.append(f.read())
 
     def load_directory(self):
-        for root, _, files in os.walk(self.path):
-            for file in files:
-                if file.endswith(".txt"):
-                    with open(
-                        os.path.join(root, file), "r", encoding=self.encoding
-                    ) as f:
-                        self.documents.append(f.read())
+        for file_path in self._iter_file_paths():
+            with open(file_path, "r", encoding=self.encoding) as f:
+                self.documents.append(f.read())
 
     def load_documents(self):
         self.load()
         return self.documents
 
+    def _iter_file_paths(self) -> Iterator[str]:
+        if os.path.isfile(self.path) and self.path.endswith(".txt"):
+            yield self.path
+            return
+        if not os.path.isdir(self.path):
+            raise ValueError(
+                "Provided path is neither a valid directory nor a .txt file."
+            )
+        for root, _, files in os.walk(self.path):
+            for file in files:
+                if file.endswith(".txt"):
+                    yield os.path.join(root, file)
+
+    def iter_documents(
+        self, window_size: Optional[int] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Lazily yields (path, text) pairs without accumulating them in
+        self.documents. With a window_size, files are read in windows of at
+        most that many characters; consecutive windows share the same path.
+        """
+        for file_path in self._iter_file_paths():
+            with open(file_path, "r", encoding=self.encoding) as f:
+                if window_size is None:
+                    yield file_path, f.read()
+                    continue
+                while True:
+                    window = f.read(window_size)
+                    if not window:
+                        break
+                    yield file_path, window
+
+
+class MappedText:
+    """
+    Read-only, memory-mapped view of a text file that can back TextSpans.
+
+    Offsets are byte offsets. Spans from CharacterTextSplitter start and end on
+    UTF-8 character boundaries (see char_start), so no character is cut; other
+    encodings are rejected, since boundaries cannot be aligned for them. The
+    file stays open until close(); use it as a context manager:
+
+        with MappedText(path) as text:
+            spans = splitter.split_spans(text, doc_id=path)
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        if codecs.lookup(encoding).name != "utf-8":
+            raise ValueError(f"MappedText only supports UTF-8 files, not {encoding!r}")
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, item: slice) -> str:
+        return self._data[item].decode(self.encoding)
+
+    def char_start(self, offset: int) -> int:
+        """Moves offset back to the first byte of the UTF-8 character containing it."""
+        while 0 < offset < len(self._data) and self._data[offset] & 0xC0 == 0x80:
+            offset -= 1
+        return offset
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedText":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TextSpan:
+    """
+    A chunk stored as (doc_id, start, end) offsets into its source document.
+
+    The chunk text is only sliced from the source when .text is read, so a
+    list of spans costs a few dozen bytes per chunk however large the overlap.
+    Spans compare and hash by (doc_id, start, end) and can be used as
+    VectorDatabase keys.
+    """
+
+    __slots__ = ("doc_id", "start", "end", "source")
+
+    def __init__(self, doc_id: Hashable, start: int, end: int, source: Union[str, MappedText]):
+        self.doc_id = doc_id
+        self.start = start
+        self.end = end
+        self.source = source
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start : self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"TextSpan(doc_id={self.doc_id!r}, start={self.start}, end={self.end})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TextSpan):
+            return NotImplemented
+        return (self.doc_id, self.start, self.end) == (other.doc_id, other.start, other.end)
+
+    def __hash__(self) -> int:
+        return hash((self.doc_id, self.start, self.end))
+
 
 class CharacterTextSplitter:
     def __init__(
@@ -62,64 +184,334 @@ class CharacterTextSplitter:
             chunks.extend(self.split(text))
         return chunks
 
+    def split_spans(self, text: Union[str, MappedText], doc_id: Hashable = 0) -> List[TextSpan]:
+        """
+        Same boundaries as split(), returned as offsets into text instead of copies.
+        For a MappedText, boundaries move back to the start of the UTF-8
+        character they fall in.
+        """
+        length = len(text)
+        spans = [
+            TextSpan(doc_id, i, min(i + self.chunk_size, length), text)
+            for i in range(0, length, self.chunk_size - self.chunk_overlap)
+        ]
+        if not isinstance(text, MappedText):
+            return spans
+        aligned = []
+        for span in spans:
+            start, end = text.char_start(span.start), text.char_start(span.end)
+            if end > start and (not aligned or start > aligned[-1].start):
+                aligned.append(TextSpan(doc_id, start, end, text))
+        return aligned
+
+    def split_texts_spans(self, texts: List[str]) -> List[TextSpan]:
+        """Like split_texts(); each span's doc_id is the index of its text."""
+        spans = []
+        for doc_id, text in enumerate(texts):
+            spans.extend(self.split_spans(text, doc_id))
+        return spans
+
+    def split_file_spans(
+        self, path: str, encoding: str = "utf-8"
+    ) -> Tuple[MappedText, List[TextSpan]]:
+        """
+        Splits a memory-mapped UTF-8 file (byte offsets) without reading it into memory.
+
+        Returns the MappedText backing the spans with the spans; the spans can
+        be read until it is closed, e.g. by using it as a context manager.
+        """
+        text = MappedText(path, encoding)
+        try:
+            return text, self.split_spans(text, doc_id=path)
+        except BaseException:
+            text.close()
+            raise
+
+    def split_stream(self, documents: Iterable[Tuple[str, str]]) -> Iterator[str]:
+        """
+        Splits a stream of (path, text) pairs, such as TextFileLoader.iter_documents,
+        yielding chunks as soon as they are complete. Consecutive pairs with the
+        same path are treated as windows of one document, so the chunks match
+        split() on the whole file while only a window plus overlap is held.
+        """
+        step = self.chunk_size - self.chunk_overlap
+        current_path = None
+        buffer, start = "", 0
+        for path, text in documents:
+            if path != current_path:
+                yield from self._drain(buffer, start)
+                current_path = path
+                buffer, start = "", 0
+            buffer = buffer[start:] + text
+            start = 0
+            while len(buffer) - start >= self.chunk_size:
+                yield buffer[start : start + self.chunk_size]
+                start += step
+        yield from self._drain(buffer, start)
+
+    def _drain(self, buffer: str, start: int) -> Iterator[str]:
+        step = self.chunk_size - self.chunk_overlap
+        while start < len(buffer):
+            yield buffer[start : start + self.chunk_size]
+            start += step
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base"):
+    """Returns a process-wide tiktoken encoding; loading one costs far more than using it."""
+    import tiktoken
+
+    return tiktoken.get_encoding(encoding_name)
+
+
+@lru_cache(maxsize=None)
+def _token_byte_lengths(encoding_name: str) -> np.ndarray:
+    """Byte length of every token id in the encoding's vocabulary (0 for unused ids)."""
+    encoding = get_encoding(encoding_name)
+    lengths = np.zeros(encoding.max_token_value + 1, dtype=np.int64)
+    for token in range(encoding.max_token_value + 1):
+        try:
+            lengths[token] = len(encoding.decode_single_token_bytes(token))
+        except KeyError:
+            pass
+    return lengths
+
+
+class TokenTextSplitter:
+    """
+    Splits text into chunks of at most chunk_size tokens, preferring to cut at
+    paragraph, then sentence, then word boundaries.
+
+    Each document is encoded exactly once. Token byte offsets come from a
+    cached per-vocabulary length table and boundaries are mapped onto token
+    indices with NumPy, so chunks are cut on token offsets instead of
+    re-encoding candidate chunks.
+    """
+
+    _PARAGRAPH_PATTERN = re.compile(rb"\n[ \t\r]*\n")
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        encoding_name: str = "cl100k_base",
+        encode_block_chars: int = 1_000_000,
+    ):
+        assert (
+            chunk_size > chunk_overlap
+        ), "Chunk size must be greater than chunk overlap"
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_name = encoding_name
+        self.encoding = get_encoding(encoding_name)
+        self.encode_block_chars = encode_block_chars
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+    def _encode(self, text: str) -> np.ndarray:
+        if len(text) <= self.encode_block_chars:
+            return np.array(self.encoding.encode_ordinary(text), dtype=np.int64)
+        # Large documents are cut at paragraph breaks and encoded on tiktoken's
+        # thread pool; each block is still encoded only once
+        blocks, pos = [], 0
+        while pos < len(text):
+            cut = text.find("\n\n", pos + self.encode_block_chars)
+            cut = len(text) if cut == -1 else cut
+            blocks.append(text[pos:cut])
+            pos = cut
+        encoded = self.encoding.encode_ordinary_batch(blocks)
+        return np.fromiter(
+            (token for block in encoded for token in block),
+            dtype=np.int64,
+            count=sum(len(block) for block in encoded),
+        )
+
+    def split(self, text: str) -> List[str]:
+        data = text.encode("utf-8")
+        tokens = self._encode(text)
+        if len(tokens) == 0:
+            return []
+
+        # starts[i] is the byte offset of token i; starts[-1] == len(data)
+        starts = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(_token_byte_lengths(self.encoding_name)[tokens], out=starts[1:])
+
+        # Cuts happen *before* separator whitespace, which is where tiktoken's
+        # pre-tokenizer starts a new token (" word", "\n\n", ...)
+        raw = np.frombuffer(data, dtype=np.uint8)
+        whitespace = np.isin(raw, np.frombuffer(b" \t\r\n", dtype=np.uint8))
+        run_starts = np.flatnonzero(whitespace[1:] & ~whitespace[:-1]) + 1
+        sentence_ends = np.isin(raw[run_starts - 1], np.frombuffer(b".!?", dtype=np.uint8))
+        newlines = np.flatnonzero(raw == ord("\n"))
+        paragraphs = [m.start() for m in self._PARAGRAPH_PATTERN.finditer(data)]
+        levels = [
+            self._boundary_tokens(starts, paragraphs),
+            self._boundary_tokens(
+                starts, np.union1d(run_starts[sentence_ends], newlines)
+            ),
+            self._boundary_tokens(starts, run_starts),
+        ]
+        # Tokens that start a UTF-8 character are safe for hard cuts
+        char_starts = (raw[starts[:-1]] & 0xC0) != 0x80
+
+        chunks = []
+        n_tokens = len(tokens)
+        start = end = 0
+        while start < n_tokens:
+            # An overlapping chunk must reach past the previous one's end
+            end = self._chunk_end(start, max(start, end), n_tokens, levels, char_starts)
+            chunk = data[starts[start] : starts[end]].decode("utf-8").strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= n_tokens:
+                break
+            start = self._next_start(start, end, levels[-1])
+        return chunks
+
+    def split_texts(self, texts: List[str]) -> List[str]:
+        chunks = []
+        for text in texts:
+            chunks.extend(self.split(text))
+        return chunks
+
+    @staticmethod
+    def _boundary_tokens(starts: np.ndarray, byte_positions) -> np.ndarray:
+        """Token indices whose start offset is exactly one of byte_positions."""
+        positions = np.asarray(byte_positions, dtype=np.int64)
+        indices = np.searchsorted(starts, positions)
+        exact = (indices < len(starts) - 1) & (starts[np.minimum(indices, len(starts) - 1)] == positions)
+        # Positions arrive sorted, so exact matches are already sorted and distinct
+        return indices[exact]
+
+    def _chunk_end(
+        self, start: int, floor: int, n_tokens: int, levels, char_starts: np.ndarray
+    ) -> int:
+        """Latest boundary after floor that keeps [start, end) within chunk_size."""
+        limit = start + self.chunk_size
+        if limit >= n_tokens:
+            return n_tokens
+        for boundaries in levels:
+            k = np.searchsorted(boundaries, limit, side="right") - 1
+            if k >= 0 and boundaries[k] > floor:
+                return int(boundaries[k])
+        end = limit
+        while end > floor + 1 and not char_starts[end]:
+            end -= 1
+        return end
+
+    def _next_start(self, start: int, end: int, words: np.ndarray) -> int:
+        if self.chunk_overlap == 0:
+            return end
+        k = np.searchsorted(words, max(end - self.chunk_overlap, start + 1))
+        if k < len(words) and words[k] < end:
+            return int(words[k])
+        return end
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> Tuple[List[str], float]:
+    """Extracts the text of pages [start, stop) from a PDF; runs in a worker process."""
+    started = time.perf_counter()
+    with open(file_path, "rb") as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        pages = [pdf_reader.pages[i].extract_text() for i in range(start, stop)]
+    return pages, time.perf_counter() - started
+
 
 class PDFLoader:
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        max_workers: Optional[int] = None,
+        pages_per_task: int = 50,
+        record_timings: bool = False,
+    ):
+        """
+        :param path: A .pdf file or a directory searched recursively for .pdf files
+        :param max_workers: Size of the extraction process pool (defaults to the CPU count);
+            when it resolves to 1, pages are extracted in-process without a pool
+        :param pages_per_task: Files with more pages than this are split across workers
+        :param record_timings: If True, per-file extraction seconds and the total wall
+            time are stored in self.timings
+        """
         self.documents = []
         self.path = path
-        print(f"PDFLoader initialized with path: {self.path}")
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        self.record_timings = record_timings
+        self.timings: Dict[str, float] = {}
 
     def load(self):
-        print(f"Loading PDF from path: {self.path}")
-        print(f"Path exists: {os.path.exists(self.path)}")
-        print(f"Is file: {os.path.isfile(self.path)}")
-        print(f"Is directory: {os.path.isdir(self.path)}")
-        print(f"File permissions: {oct(os.stat(self.path).st_mode)[-3:]}")
-        
         try:
-            # Try to open the file first to verify access
-            with open(self.path, 'rb') as test_file:
-                pass
-            
-            # If we can open it, proceed with loading
-            self.load_file()
-            
+            if os.path.isdir(self.path):
+                self.load_directory()
+            elif os.path.isfile(self.path):
+                self.load_file()
+            else:
+                raise ValueError(
+                    "Provided path is neither a valid directory nor a .pdf file."
+                )
         except IOError as e:
             raise ValueError(f"Cannot access file at '{self.path}': {str(e)}")
         except Exception as e:
             raise ValueError(f"Error processing file at '{self.path}': {str(e)}")
 
     def load_file(self):
-        with open(self.path, 'rb') as file:
-            # Create PDF reader object
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Extract text from each page
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            self.documents.append(text)
+        self._load_paths([self.path])
 
     def load_directory(self):
+        file_paths = []
         for root, _, files in os.walk(self.path):
             for file in files:
-                if file.lower().endswith('.pdf'):
-                    file_path = os.path.join(root, file)
-                    with open(file_path, 'rb') as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
-                        
-                        # Extract text from each page
-                        text = ""
-                        for page in pdf_reader.pages:
-                            text += page.extract_text() + "\n"
-                        
-                        self.documents.append(text)
+                if file.lower().endswith(".pdf"):
+                    file_paths.append(os.path.join(root, file))
+        self._load_paths(file_paths)
 
     def load_documents(self):
         self.load()
         return self.documents
 
+    def resolved_workers(self) -> int:
+        """Process pool size: max_workers, else the CPUs this process may run on."""
+        if self.max_workers is not None:
+            return max(1, self.max_workers)
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0)) or 1
+        return os.cpu_count() or 1
+
+    def _load_paths(self, file_paths: List[str]) -> None:
+        started = time.perf_counter()
+
+        # One task per page range, so large files are spread over several workers
+        tasks = []
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                page_count = len(PyPDF2.PdfReader(f).pages)
+            for start in range(0, page_count, self.pages_per_task):
+                stop = min(start + self.pages_per_task, page_count)
+                tasks.append((file_path, start, stop))
+
+        max_workers = min(self.resolved_workers(), len(tasks))
+        if max_workers <= 1:
+            results = [_extract_page_range(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_extract_page_range, *zip(*tasks)))
+
+        pages_by_file = {file_path: [] for file_path in file_paths}
+        seconds_by_file = {file_path: 0.0 for file_path in file_paths}
+        for (file_path, _, _), (pages, seconds) in zip(tasks, results):
+            pages_by_file[file_path].extend(pages)
+            seconds_by_file[file_path] += seconds
+
+        for file_path in file_paths:
+            self.documents.append("".join(page + "\n" for page in pages_by_file[file_path]))
+
+        if self.record_timings:
+            self.timings.update(seconds_by_file)
+            self.timings["total"] = time.perf_counter() - started
+
 
 if __name__ == "__main__":
     loader = TextFileLoader("data/KingLear.txt")
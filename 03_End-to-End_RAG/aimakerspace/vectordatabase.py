@@ -2,6 +2,7 @@ import numpy as np
 from collections import defaultdict
 from typing import List, Tuple, Callable
 from aimakerspace.openai_utils.embedding import EmbeddingModel
+from aimakerspace.text_utils import TextSpan
 import asyncio
 
 
@@ -21,6 +22,9 @@ class VectorDatabase:
     def insert(self, key: str, vector: np.array) -> None:
         self.vectors[key] = vector
 
+    def delete(self, key: str) -> None:
+        self.vectors.pop(key, None)
+
     def search(
         self,
         query_vector: np.array,
@@ -53,6 +57,37 @@ class VectorDatabase:
             self.insert(text, np.array(embedding))
         return self
 
+    async def abuild_from_spans(
+        self, spans: List[TextSpan], batch_size: int = 1024
+    ) -> "VectorDatabase":
+        """
+        Embeds TextSpans and stores them as keys, so chunk text is only
+        materialized one batch at a time while it is being embedded.
+        """
+        for i in range(0, len(spans), batch_size):
+            batch = spans[i : i + batch_size]
+            embeddings = await self.embedding_model.async_get_embeddings(
+                [span.text for span in batch]
+            )
+            for span, embedding in zip(batch, embeddings):
+                self.insert(span, np.array(embedding))
+        return self
+
+    def save(self, path: str) -> None:
+        """Writes keys and vectors to a single .npz file; TextSpan keys are saved as their text."""
+        keys = list(self.vectors.keys())
+        matrix = np.array([self.vectors[key] for key in keys]) if keys else np.empty((0, 0))
+        np.savez(path, keys=np.array(keys, dtype=str), vectors=matrix)
+
+    @classmethod
+    def load(cls, path: str, embedding_model: EmbeddingModel = None) -> "VectorDatabase":
+        """Rebuilds a VectorDatabase from a file written by save()."""
+        vector_db = cls(embedding_model)
+        with np.load(path) as data:
+            for key, vector in zip(data["keys"].tolist(), data["vectors"]):
+                vector_db.insert(key, vector)
+        return vector_db
+
 
 if __name__ == "__main__":
     list_of_text = [
@@ -0,0 +1,66 @@
+"""Benchmark sequential vs. process-pool PDF extraction with aimakerspace's PDFLoader.
+
+Usage:
+    python bench_pdf_loader.py [DATA_DIR] [--workers N] [--pages-per-task N]
+
+DATA_DIR defaults to ../14_LangGraph_Platform/data (the four student-aid PDFs
+used by the LangGraph apps); any directory of PDFs works. With a single CPU the
+loader falls back to in-process extraction, so both runs take the same path.
+"""
+import argparse
+import os
+import time
+
+from aimakerspace.text_utils import PDFLoader
+
+
+def run(data_dir: str, max_workers, pages_per_task: int):
+    loader = PDFLoader(
+        data_dir,
+        max_workers=max_workers,
+        pages_per_task=pages_per_task,
+        record_timings=True,
+    )
+    started = time.perf_counter()
+    documents = loader.load_documents()
+    return time.perf_counter() - started, documents, loader.timings
+
+
+def main():
+    default_dir = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "14_LangGraph_Platform", "data"
+    )
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_dir", nargs="?", default=default_dir)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pages-per-task", type=int, default=50)
+    args = parser.parse_args()
+
+    pdfs = [
+        os.path.join(root, file)
+        for root, _, files in os.walk(args.data_dir)
+        for file in files
+        if file.lower().endswith(".pdf")
+    ]
+    if not pdfs:
+        print(f"No PDFs found under {args.data_dir}")
+        return
+
+    sequential_seconds, sequential_docs, _ = run(args.data_dir, 1, args.pages_per_task)
+    parallel_seconds, parallel_docs, timings = run(
+        args.data_dir, args.workers, args.pages_per_task
+    )
+    if sequential_docs != parallel_docs:
+        raise SystemExit("parallel extraction changed the output")
+
+    workers = PDFLoader(args.data_dir, max_workers=args.workers).resolved_workers()
+    print(f"{len(pdfs)} PDFs, {sum(len(d) for d in parallel_docs):,} characters")
+    print(f"CPUs available: {os.cpu_count()}, pool workers: {workers}")
+    for file_path in sorted(pdfs):
+        print(f"  {os.path.basename(file_path):<60} {timings[file_path]:7.2f}s extract")
+    print(f"sequential: {sequential_seconds:7.2f}s")
+    print(f"pooled:     {parallel_seconds:7.2f}s  ({sequential_seconds / parallel_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
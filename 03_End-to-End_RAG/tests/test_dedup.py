@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+import pytest
+
+from aimakerspace.dedup import MinHashDeduplicator, _choose_bands
+
+WORDS = (
+    "grant loan student aid federal award year school cost income parent "
+    "tuition program eligible amount request form office enrollment credit"
+).split()
+
+
+def paragraph(seed: int, length: int = 80) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randrange(100)) for _ in range(length))
+
+
+def test_choose_bands_approximates_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = _choose_bands(128, threshold)
+        assert bands * rows <= 128
+        assert abs((1 / bands) ** (1 / rows) - threshold) < 0.05
+
+
+def test_drops_copies_that_differ_in_case_and_whitespace():
+    original = paragraph(1)
+    copy = "  " + original.upper().replace(" ", "\n ")
+    other = paragraph(2)
+    deduplicator = MinHashDeduplicator()
+    assert deduplicator.dedupe([original, other, copy]) == [original, other]
+    assert deduplicator.num_dropped == 1
+
+
+def test_drops_near_duplicates_and_keeps_first_occurrence():
+    original = paragraph(3)
+    words = original.split()
+    words[40] = "changed"
+    edited = " ".join(words)
+    distinct = [paragraph(seed) for seed in range(10, 20)]
+
+    deduplicator = MinHashDeduplicator(threshold=0.8)
+    kept = deduplicator.dedupe([edited] + distinct + [original])
+    assert kept == [edited] + distinct
+    assert deduplicator.num_dropped == 1
+
+
+def test_keeps_chunks_below_threshold():
+    original = paragraph(4)
+    words = original.split()
+    half_changed = " ".join(words[:40] + paragraph(5).split()[40:])
+    deduplicator = MinHashDeduplicator(threshold=0.9)
+    assert deduplicator.dedupe([original, half_changed]) == [original, half_changed]
+    assert deduplicator.num_dropped == 0
+
+
+def test_signatures_estimate_jaccard_similarity():
+    deduplicator = MinHashDeduplicator(num_perm=256)
+    first, second = paragraph(6), paragraph(7)
+    signatures = deduplicator.signatures([first, first, second])
+    assert np.array_equal(signatures[0], signatures[1])
+    assert np.mean(signatures[0] == signatures[2]) < 0.2
+
+
+def test_batches_do_not_change_signatures():
+    chunks = [paragraph(seed, length=seed % 7 + 1) for seed in range(25)] + ["", "a"]
+    whole = MinHashDeduplicator(batch_size=10_000).signatures(chunks)
+    batched = MinHashDeduplicator(batch_size=4).signatures(chunks)
+    assert np.array_equal(whole, batched)
+
+
+@pytest.mark.parametrize("chunks", [[], ["tiny"], ["", ""]])
+def test_handles_empty_and_short_input(chunks):
+    deduplicator = MinHashDeduplicator()
+    kept = deduplicator.dedupe(chunks)
+    assert kept == chunks[:1]
+    assert deduplicator.num_dropped == max(len(chunks) - 1, 0)
+
+
+def test_compares_with_every_kept_chunk_in_a_shared_bucket():
+    # Hand-made signatures with 2 bands of 2 rows: "b" shares band 0 with "a"
+    # but is kept; "c" matches "b" (3 of 4 values) only through that band
+    signatures = np.array(
+        [[1, 1, 10, 10], [1, 1, 20, 20], [1, 1, 20, 21]], dtype=np.uint64
+    )
+    deduplicator = MinHashDeduplicator(threshold=0.75, num_perm=4)
+    deduplicator.bands, deduplicator.rows = 2, 2
+    deduplicator._band_mix = np.array([1, 3], dtype=np.uint64)
+    deduplicator.signatures = lambda chunks: signatures
+
+    assert deduplicator.dedupe(["a", "b", "c"]) == ["a", "b"]
+    assert deduplicator.num_dropped == 1
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pytest
+
+from aimakerspace import vectordatabase
+from aimakerspace.ingestion import (
+    IncrementalIngestor,
+    IngestionManifest,
+    MANIFEST_VERSION,
+    chunk_digest,
+    file_sha256,
+)
+from aimakerspace.text_utils import CharacterTextSplitter
+from aimakerspace.vectordatabase import VectorDatabase
+
+CHUNK = 10
+
+
+class FakeEmbeddingModel:
+    """Deterministic embeddings derived from the text; records every text embedded."""
+
+    embedded = []
+
+    def __init__(self, embeddings_model_name: str = "fake"):
+        pass
+
+    def get_embedding(self, text: str):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[:8]]
+
+    async def async_get_embeddings(self, list_of_text):
+        FakeEmbeddingModel.embedded.extend(list_of_text)
+        return [self.get_embedding(text) for text in list_of_text]
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    """Every VectorDatabase, also one loaded from disk, embeds with FakeEmbeddingModel."""
+    monkeypatch.setattr(vectordatabase, "EmbeddingModel", FakeEmbeddingModel)
+    monkeypatch.setattr(FakeEmbeddingModel, "embedded", [])
+    return FakeEmbeddingModel
+
+
+def chunks(*names):
+    """Text made of CHUNK-sized blocks, one per name, so each name is one chunk."""
+    return "".join(name.ljust(CHUNK - 1, ".") + "\n" for name in names)
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def ingestor(tmp_path):
+    return IncrementalIngestor(
+        str(tmp_path / "data"),
+        str(tmp_path / "state"),
+        splitter=CharacterTextSplitter(chunk_size=CHUNK, chunk_overlap=0),
+    )
+
+
+def indexed(tmp_path):
+    return set(ingestor(tmp_path).vector_db.vectors)
+
+
+def test_first_run_embeds_everything_and_a_rerun_nothing(tmp_path, fake_embeddings):
+    write(tmp_path / "data" / "a.txt", chunks("alpha", "beta"))
+    write(tmp_path / "data" / "nested" / "b.txt", chunks("gamma"))
+    write(tmp_path / "data" / "notes.md", chunks("ignored"))
+
+    stats = ingestor(tmp_path).ingest()
+    assert stats == {
+        "changed": 2, "removed": 0, "unchanged": 0, "chunks_embedded": 3, "chunks_deleted": 0
+    }
+    assert indexed(tmp_path) == {chunks("alpha"), chunks("beta"), chunks("gamma")}
+
+    stats = ingestor(tmp_path).ingest()
+    assert stats == {
+        "changed": 0, "removed": 0, "unchanged": 2, "chunks_embedded": 0, "chunks_deleted": 0
+    }
+    assert len(fake_embeddings.embedded) == 3
+
+
+def test_touched_but_identical_file_is_not_reingested(tmp_path):
+    path = write(tmp_path / "data" / "a.txt", chunks("alpha"))
+    ingestor(tmp_path).ingest()
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 100))
+
+    stats = ingestor(tmp_path).ingest()
+    assert (stats["changed"], stats["unchanged"]) == (0, 1)
+    manifest = IngestionManifest(str(tmp_path / "state" / "manifest.json"))
+    assert manifest.files[path]["mtime"] == stat.st_mtime + 100
+
+
+def test_changed_and_removed_files_replace_their_chunks(tmp_path, fake_embeddings):
+    write(tmp_path / "data" / "a.txt", chunks("alpha", "beta"))
+    write(tmp_path / "data" / "b.txt", chunks("gamma"))
+    ingestor(tmp_path).ingest()
+
+    write(tmp_path / "data" / "a.txt", chunks("alpha", "delta"))
+    os.remove(tmp_path / "data" / "b.txt")
+    fake_embeddings.embedded.clear()
+    stats = ingestor(tmp_path).ingest()
+
+    assert stats == {
+        "changed": 1, "removed": 1, "unchanged": 0, "chunks_embedded": 1, "chunks_deleted": 2
+    }
+    assert fake_embeddings.embedded == [chunks("delta")]
+    assert indexed(tmp_path) == {chunks("alpha"), chunks("delta")}
+
+
+def test_shared_chunk_is_deleted_with_its_last_file(tmp_path):
+    write(tmp_path / "data" / "a.txt", chunks("shared", "alpha"))
+    write(tmp_path / "data" / "b.txt", chunks("shared", "beta"))
+    assert ingestor(tmp_path).ingest()["chunks_embedded"] == 3
+
+    os.remove(tmp_path / "data" / "a.txt")
+    assert ingestor(tmp_path).ingest()["chunks_deleted"] == 1
+    assert indexed(tmp_path) == {chunks("shared"), chunks("beta")}
+
+    os.remove(tmp_path / "data" / "b.txt")
+    assert ingestor(tmp_path).ingest()["chunks_deleted"] == 2
+    assert indexed(tmp_path) == set()
+
+
+def test_version_1_manifest_is_migrated(tmp_path):
+    path = write(tmp_path / "data" / "a.txt", chunks("alpha", "beta"))
+    stat = os.stat(path)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({"files": {path: {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": file_sha256(path),
+        "chunk_ids": [chunks("alpha"), chunks("beta")],
+    }}}))
+
+    manifest = IngestionManifest(str(manifest_path))
+    expected = [chunk_digest(chunks("alpha")), chunk_digest(chunks("beta"))]
+    assert manifest.files[path]["chunk_ids"] == expected
+    assert manifest.diff([path]) == ([], [], [path])
+
+    manifest.save()
+    saved = json.loads(manifest_path.read_text())
+    assert saved["version"] == MANIFEST_VERSION
+    assert IngestionManifest(str(manifest_path)).files[path]["chunk_ids"] == expected
+
+
+def test_missing_vectors_reset_the_manifest(tmp_path, fake_embeddings):
+    write(tmp_path / "data" / "a.txt", chunks("alpha", "beta"))
+    ingestor(tmp_path).ingest()
+    os.remove(tmp_path / "state" / "vectors.npz")
+
+    fake_embeddings.embedded.clear()
+    stats = ingestor(tmp_path).ingest()
+    assert (stats["changed"], stats["chunks_embedded"]) == (1, 2)
+    assert indexed(tmp_path) == {chunks("alpha"), chunks("beta")}
+
+
+def test_vector_database_save_load_and_delete(tmp_path):
+    vector_db = VectorDatabase(FakeEmbeddingModel())
+    vector_db.insert("first", np.array([1.0, 0.0]))
+    vector_db.insert("second", np.array([0.0, 1.0]))
+    vector_db.delete("first")
+    vector_db.delete("never inserted")
+    path = str(tmp_path / "vectors.npz")
+    vector_db.save(path)
+
+    loaded = VectorDatabase.load(path)
+    assert list(loaded.vectors) == ["second"]
+    np.testing.assert_array_equal(loaded.retrieve_from_key("second"), [0.0, 1.0])
+    assert loaded.search(np.array([0.0, 1.0]), k=1)[0][0] == "second"
+
+    loaded.delete("second")
+    loaded.save(path)
+    assert len(VectorDatabase.load(path).vectors) == 0
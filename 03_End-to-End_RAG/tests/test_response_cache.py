@@ -0,0 +1,181 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aimakerspace.openai_utils import cache as cache_module
+from aimakerspace.openai_utils import chatmodel
+from aimakerspace.openai_utils.cache import (
+    LRUCache,
+    ResponseCache,
+    SQLiteCache,
+    make_cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+def test_cache_key_ignores_kwarg_order_but_not_content():
+    messages = [{"role": "user", "content": "Hello!"}]
+    key = make_cache_key("gpt-4o-mini", messages, {"temperature": 0, "top_p": 1})
+    assert key == make_cache_key("gpt-4o-mini", messages, {"top_p": 1, "temperature": 0})
+    assert key != make_cache_key("gpt-4o", messages, {"temperature": 0, "top_p": 1})
+    assert key != make_cache_key("gpt-4o-mini", messages, {"temperature": 1, "top_p": 1})
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # "b" is now the oldest
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert len(cache) == 2
+
+
+def test_lru_expires_entries_after_ttl(clock):
+    cache = LRUCache(ttl_seconds=10)
+    cache.set("a", "1")
+    clock.now += 10
+    assert cache.get("a") == "1"
+    clock.now += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_persists_across_connections(tmp_path):
+    path = str(tmp_path / "nested" / "responses.db")
+    cache = SQLiteCache(path)
+    cache.set("a", "1")
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("a") == "1"
+    reopened.close()
+
+
+def test_sqlite_evicts_least_recently_accessed(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "responses.db"), max_entries=2)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"  # "b" is now the least recently accessed
+    clock.now += 1
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    cache.close()
+
+
+def test_sqlite_expires_entries_after_ttl(tmp_path, clock):
+    cache = SQLiteCache(str(tmp_path / "responses.db"), ttl_seconds=10)
+    cache.set("a", "1")
+    clock.now += 11
+    assert cache.get("a") is None
+    # Expired rows are also swept on write
+    cache.set("b", "2")
+    clock.now += 11
+    cache.set("c", "3")
+    (count,) = cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+    assert count == 1
+    cache.close()
+
+
+def test_response_cache_promotes_sqlite_hits_to_memory(tmp_path):
+    path = str(tmp_path / "responses.db")
+    first = ResponseCache(sqlite_path=path)
+    first.set("a", "1")
+    first.sqlite.close()
+
+    second = ResponseCache(sqlite_path=path)
+    assert len(second.memory) == 0
+    assert second.get("a") == "1"
+    assert second.memory.get("a") == "1"
+    assert second.get("missing") is None
+    assert (second.hits, second.misses) == (1, 1)
+    second.sqlite.close()
+
+
+class FakeCompletions:
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeAsyncCompletions:
+    def __init__(self, parts):
+        self.parts = parts
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+
+        async def stream():
+            for part in self.parts:
+                delta = SimpleNamespace(content=part)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return stream()
+
+
+def fake_client(completions):
+    return lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+async def collect(stream):
+    return [part async for part in stream]
+
+
+def test_chat_model_serves_repeated_requests_from_cache(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    completions = FakeCompletions("Hi there!")
+    monkeypatch.setattr(chatmodel, "OpenAI", fake_client(completions))
+    model = chatmodel.ChatOpenAI(cache=ResponseCache())
+    messages = [{"role": "user", "content": "Hello!"}]
+
+    assert model.run(messages, temperature=0) == "Hi there!"
+    assert model.run(messages, temperature=0) == "Hi there!"
+    assert completions.calls == 1
+    model.run(messages, temperature=1)
+    assert completions.calls == 2
+    # Full response objects bypass the cache
+    model.run(messages, text_only=False, temperature=0)
+    assert completions.calls == 3
+
+
+def test_chat_model_stream_and_run_share_entries(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    stream_completions = FakeAsyncCompletions(["Hi", " there", "!"])
+    completions = FakeCompletions("unused")
+    monkeypatch.setattr(chatmodel, "AsyncOpenAI", fake_client(stream_completions))
+    monkeypatch.setattr(chatmodel, "OpenAI", fake_client(completions))
+    model = chatmodel.ChatOpenAI(cache=ResponseCache(), replay_chunk_size=4)
+    messages = [{"role": "user", "content": "Hello!"}]
+
+    assert asyncio.run(collect(model.astream(messages))) == ["Hi", " there", "!"]
+    # A replay is re-chunked by replay_chunk_size
+    assert asyncio.run(collect(model.astream(messages))) == ["Hi t", "here", "!"]
+    assert model.run(messages) == "Hi there!"
+    assert (stream_completions.calls, completions.calls) == (1, 0)
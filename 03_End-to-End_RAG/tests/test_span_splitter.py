@@ -0,0 +1,97 @@
+import pytest
+
+from aimakerspace.text_utils import CharacterTextSplitter, MappedText, TextSpan
+
+TEXT = "The quick brown fox jumps over the lazy dog. " * 20
+
+
+def test_split_spans_matches_split():
+    splitter = CharacterTextSplitter(chunk_size=100, chunk_overlap=20)
+    spans = splitter.split_spans(TEXT, doc_id="fox")
+    assert [span.text for span in spans] == splitter.split(TEXT)
+    assert all(span.doc_id == "fox" for span in spans)
+
+
+def test_split_texts_spans_uses_text_index_as_doc_id():
+    splitter = CharacterTextSplitter(chunk_size=30, chunk_overlap=10)
+    spans = splitter.split_texts_spans(["a" * 50, "b" * 50])
+    assert [str(span) for span in spans] == splitter.split_texts(["a" * 50, "b" * 50])
+    assert {span.doc_id for span in spans} == {0, 1}
+
+
+def test_spans_compare_by_offsets_not_source():
+    span = TextSpan("doc", 0, 10, "x" * 20)
+    same = TextSpan("doc", 0, 10, "y" * 20)
+    assert span == same and hash(span) == hash(same)
+    assert span != TextSpan("doc", 0, 11, "x" * 20)
+    assert len({span, same}) == 1
+    assert len(span) == 10
+
+
+def test_split_file_spans_reads_mapped_file(tmp_path):
+    path = tmp_path / "fox.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    splitter = CharacterTextSplitter(chunk_size=100, chunk_overlap=20)
+
+    text, spans = splitter.split_file_spans(str(path))
+    with text:
+        assert [span.text for span in spans] == splitter.split(TEXT)
+        assert all(span.doc_id == str(path) for span in spans)
+    assert text._file.closed
+    assert text._data.closed
+
+
+@pytest.mark.parametrize("chunk_size", [7, 10, 13, 64])
+def test_mapped_spans_never_cut_a_character(tmp_path, chunk_size):
+    # Two-, three- and four-byte characters with ASCII in between
+    content = "café ☕ naïve 😀 jalapeño ünïcödé 日本語 " * 10
+    path = tmp_path / "utf8.txt"
+    path.write_text(content, encoding="utf-8")
+    splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=0)
+
+    with MappedText(str(path)) as text:
+        spans = splitter.split_spans(text, doc_id="utf8")
+        assert "".join(span.text for span in spans) == content
+        # A start moved back to its character's first byte adds at most 3 bytes
+        assert all(0 < len(span) < chunk_size + 4 for span in spans)
+
+
+def test_mapped_spans_with_overlap_cover_file(tmp_path):
+    content = "日本語のテキスト" * 50
+    path = tmp_path / "ja.txt"
+    path.write_text(content, encoding="utf-8")
+    splitter = CharacterTextSplitter(chunk_size=20, chunk_overlap=5)
+
+    with MappedText(str(path)) as text:
+        spans = splitter.split_spans(text)
+        assert spans[0].start == 0 and spans[-1].end == len(text)
+        for previous, span in zip(spans, spans[1:]):
+            assert previous.start < span.start <= previous.end
+        # Every span decodes strictly, so no bytes were dropped
+        assert all(span.text for span in spans)
+
+
+def test_mapped_text_handles_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    text, spans = CharacterTextSplitter().split_file_spans(str(path))
+    with text:
+        assert len(text) == 0
+        assert spans == []
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-32-le", "cp1252"])
+def test_mapped_text_rejects_other_encodings(tmp_path, encoding):
+    path = tmp_path / "text.txt"
+    path.write_text("naïve café", encoding=encoding)
+    with pytest.raises(ValueError, match="UTF-8"):
+        MappedText(str(path), encoding=encoding)
+    with pytest.raises(ValueError, match="UTF-8"):
+        CharacterTextSplitter().split_file_spans(str(path), encoding=encoding)
+
+
+def test_mapped_text_accepts_utf8_aliases(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_text("naïve café", encoding="utf-8")
+    with MappedText(str(path), encoding="UTF8") as text:
+        assert text[0 : len(text)] == "naïve café"
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+import tiktoken
+import tiktoken.registry
+
+from aimakerspace import text_utils
+from aimakerspace.text_utils import TokenTextSplitter, get_encoding
+
+ENCODING_NAME = "aimakerspace_test_words"
+
+PARAGRAPHS = [
+    "Retrieval augmented generation grounds answers in documents. "
+    "The retriever finds relevant chunks. The generator writes the answer.",
+    "Chunks should not cut sentences in half. A splitter that respects "
+    "paragraphs and sentences keeps each chunk readable on its own.",
+    "Overlap repeats a few tokens between chunks. It helps when an answer "
+    "spans a boundary, but it also costs storage and embedding calls.",
+]
+TEXT = "\n\n".join(PARAGRAPHS)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def test_encoding():
+    """A small offline BPE vocabulary registered under ENCODING_NAME."""
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in set(re.findall(rb"[A-Za-z]+", TEXT.encode("utf-8"))):
+        for form in (word, b" " + word):
+            for k in range(2, len(form) + 1):
+                ranks.setdefault(form[:k], len(ranks))
+    encoding = tiktoken.Encoding(
+        ENCODING_NAME,
+        pat_str=r"""'(?:[sdmt]|ll|ve|re)| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+    tiktoken.registry.ENCODINGS[ENCODING_NAME] = encoding
+    yield encoding
+    del tiktoken.registry.ENCODINGS[ENCODING_NAME]
+    get_encoding.cache_clear()
+    text_utils._token_byte_lengths.cache_clear()
+
+
+def splitter(chunk_size, chunk_overlap=0):
+    return TokenTextSplitter(chunk_size, chunk_overlap, encoding_name=ENCODING_NAME)
+
+
+def squash(text):
+    return "".join(text.split())
+
+
+def test_get_encoding_is_cached(test_encoding):
+    assert get_encoding(ENCODING_NAME) is get_encoding(ENCODING_NAME)
+    assert splitter(10).encoding is test_encoding
+
+
+@pytest.mark.parametrize("chunk_size", [5, 12, 25, 60])
+def test_chunks_fit_and_cover_text(chunk_size):
+    token_splitter = splitter(chunk_size)
+    chunks = token_splitter.split(TEXT)
+    assert all(token_splitter.count_tokens(chunk) <= chunk_size for chunk in chunks)
+    assert squash("".join(chunks)) == squash(TEXT)
+
+
+def test_prefers_paragraph_then_sentence_boundaries():
+    # Room for any one paragraph and the break before it, but not for two
+    chunk_size = max(splitter(10).count_tokens("\n\n" + p) for p in PARAGRAPHS)
+    token_splitter = splitter(chunk_size)
+    assert token_splitter.split(TEXT) == PARAGRAPHS
+
+    sentence_chunks = splitter(20).split(TEXT)
+    assert len(sentence_chunks) > len(PARAGRAPHS)
+    assert all(chunk.endswith(".") for chunk in sentence_chunks)
+
+
+def test_overlap_starts_on_a_word_inside_the_previous_chunk():
+    chunks = splitter(15, chunk_overlap=5).split(TEXT)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        first_word = chunk.split()[0]
+        assert first_word in previous.split()
+
+
+def test_hard_cuts_keep_multibyte_characters_whole():
+    # No whitespace and no merges for these bytes: every cut is a hard cut
+    text = "日本語😀é" * 40
+    token_splitter = splitter(7)
+    chunks = token_splitter.split(text)
+    assert "".join(chunks) == text
+    assert all(token_splitter.count_tokens(chunk) <= 7 for chunk in chunks)
+
+
+def test_large_documents_are_encoded_in_blocks():
+    text = "\n\n".join(PARAGRAPHS * 20)
+    whole = splitter(30).split(text)
+    blocked = TokenTextSplitter(30, 0, encoding_name=ENCODING_NAME, encode_block_chars=200)
+    assert blocked.split(text) == whole
+    assert splitter(30).split("") == []
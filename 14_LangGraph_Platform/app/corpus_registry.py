@@ -0,0 +1,320 @@
+"""Registry of the RAG document collections (corpora) served by one process.
+
+Each corpus id maps to a data directory (`RAG_CORPORA`, see `parse_corpora`).
+A corpus' index is built on first use or by a warm-up, rebuilt incrementally
+when its files change, and evicted, least recently used first, once the
+estimated size of all loaded indexes exceeds the memory budget. An evicted
+corpus is rebuilt on its next use, normally straight from its snapshot.
+
+The registry only manages lifecycles; building an index generation is left
+to the `build` callable supplied by `app.rag`.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.query_cache import QueryCache
+from app.semantic_cache import SemanticAnswerCache
+
+DEFAULT_CORPUS = "default"
+
+
+def parse_corpora(spec: str, default_dir: str) -> Dict[str, str]:
+    """Parse `id=path,id=path` into an ordered map of corpus id -> data dir.
+
+    An empty `spec` yields a single corpus, DEFAULT_CORPUS, at `default_dir`.
+    """
+    corpora: Dict[str, str] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        corpus_id, separator, data_dir = (part.strip() for part in item.partition("="))
+        if not separator or not corpus_id or not data_dir:
+            raise ValueError(f"Invalid RAG_CORPORA entry {item.strip()!r}; expected id=path")
+        corpora[corpus_id] = data_dir
+    return corpora or {DEFAULT_CORPUS: default_dir}
+
+
+class Corpus:
+    """One corpus: its data directory, served index generation, caches and build status."""
+
+    def __init__(
+        self,
+        corpus_id: str,
+        data_dir: str,
+        answer_cache: SemanticAnswerCache,
+        query_cache: QueryCache,
+    ):
+        self.corpus_id = corpus_id
+        self.data_dir = data_dir
+        self.answer_cache = answer_cache
+        self.query_cache = query_cache
+        self.generation: Any = None
+        self.lock = threading.Lock()
+        self.last_used = 0.0
+        self.status: Dict[str, Any] = {
+            "state": "idle",
+            "stage": None,
+            "stages": [],
+            "started_at": None,
+            "ready_at": None,
+            "error": None,
+            "generation": 0,
+            "last_reload": None,
+            "failed_files": {},
+        }
+
+    @property
+    def nbytes(self) -> int:
+        generation = self.generation
+        return generation.nbytes if generation is not None else 0
+
+    def record_stage(self, stage: str) -> None:
+        """Progress callback for builds; records elapsed time per stage."""
+        self.status["stage"] = stage
+        self.status["stages"].append(
+            {"stage": stage, "at_seconds": round(time.time() - self.status["started_at"], 3)}
+        )
+
+    def activate(self, generation: Any) -> None:
+        """Rebind the caches to `generation` and make its graph the one served.
+
+        The generation is swapped in a single assignment; queries already
+        running keep the graph they started with.
+        """
+        self.answer_cache.set_namespace(generation.answer_namespace)
+        self.query_cache.set_namespace(generation.snapshot_key)
+        self.generation = generation
+        self.status["failed_files"] = generation.stats.get("failed_files") or {}
+
+    def evict(self) -> None:
+        """Drop the loaded index and cached results; the next use rebuilds them."""
+        self.generation = None
+        self.answer_cache.clear()
+        self.query_cache.clear()
+        self.status.update(state="evicted", stage=None)
+
+    def readiness(self) -> Dict[str, Any]:
+        """Return a snapshot of the build status for readiness probes.
+
+        Keys: `ready`, `state` (idle/building/ready/failed/evicted), the
+        current `stage`, the `stages` reached with their offsets in seconds,
+        `elapsed_seconds` (build time so far, or time-to-ready once ready),
+        `error`, the index `generation` being served, the `last_reload`
+        summary (or error) and the `failed_files` of that generation (path ->
+        error of each file that could not be parsed). An evicted corpus still counts as ready, since it
+        was built once and reloads from its snapshot on demand.
+        """
+        status = dict(self.status, stages=list(self.status["stages"]))
+        started_at, ready_at = status.pop("started_at"), status.pop("ready_at")
+        status["ready"] = status["state"] in ("ready", "evicted")
+        status["elapsed_seconds"] = (
+            round((ready_at or time.time()) - started_at, 3) if started_at else None
+        )
+        return status
+
+
+class CorpusRegistry:
+    """Corpus id -> lazily built index generation, with LRU eviction by bytes.
+
+    `build(corpus, previous, progress)` returns a new generation for
+    `corpus`: an object with `graph`, `signatures`, `snapshot_key`,
+    `answer_namespace`, `stats` and `nbytes` attributes. `signatures(data_dir)`
+    fingerprints a data directory, for change detection. A budget of 0 or
+    less disables eviction.
+    """
+
+    def __init__(
+        self,
+        corpora: Callable[[], Dict[str, str]],
+        build: Callable[[Corpus, Any, Optional[Callable[[str], None]]], Any],
+        signatures: Callable[[str], Dict[str, Any]],
+        memory_budget_bytes: int,
+        answer_cache_factory: Callable[[], SemanticAnswerCache],
+        query_cache_factory: Callable[[], QueryCache],
+    ):
+        self._load_corpora = corpora
+        self._build = build
+        self._signatures = signatures
+        self.memory_budget_bytes = memory_budget_bytes
+        self._answer_cache_factory = answer_cache_factory
+        self._query_cache_factory = query_cache_factory
+        self._data_dirs: Optional[Dict[str, str]] = None
+        self._corpora: Dict[str, Corpus] = {}
+        self._lock = threading.Lock()
+        self.loads = self.evictions = 0
+
+    def ids(self) -> List[str]:
+        """Configured corpus ids; the first one is the default."""
+        if self._data_dirs is None:
+            self._data_dirs = self._load_corpora()
+        return list(self._data_dirs)
+
+    def corpus(self, corpus_id: Optional[str] = None) -> Corpus:
+        """Return the corpus for `corpus_id` (default: the first configured one)."""
+        corpus_id = corpus_id or self.ids()[0]
+        corpus = self._corpora.get(corpus_id)
+        if corpus is not None:
+            return corpus
+        if corpus_id not in self.ids():
+            raise ValueError(
+                f"Unknown corpus {corpus_id!r}; available: {', '.join(self.ids())}"
+            )
+        with self._lock:
+            if corpus_id not in self._corpora:
+                self._corpora[corpus_id] = Corpus(
+                    corpus_id,
+                    self._data_dirs[corpus_id],
+                    self._answer_cache_factory(),
+                    self._query_cache_factory(),
+                )
+            return self._corpora[corpus_id]
+
+    def loaded_graph(self, corpus_id: Optional[str] = None):
+        """Return the corpus' graph if its index is loaded, else None. Never blocks."""
+        corpus = self.corpus(corpus_id)
+        generation = corpus.generation
+        if generation is None:
+            return None
+        corpus.last_used = time.monotonic()
+        return generation.graph
+
+    def get_graph(self, corpus_id: Optional[str] = None):
+        """Return the corpus' graph, building its index first if needed.
+
+        Single-flight per corpus: the first caller builds while concurrent
+        callers block on the corpus lock and then reuse its result. A failed
+        build is recorded in the corpus status and retried by the next caller.
+        Once built, the graph is returned without locking, also while a
+        reload is in progress.
+        """
+        graph = self.loaded_graph(corpus_id)
+        if graph is not None:
+            return graph
+        corpus = self.corpus(corpus_id)
+        with corpus.lock:
+            if corpus.generation is None:
+                generation_count = corpus.status["generation"]
+                corpus.status.update(
+                    state="building", stage=None, stages=[], started_at=time.time(),
+                    ready_at=None, error=None,
+                )
+                try:
+                    generation = self._build(corpus, None, corpus.record_stage)
+                except Exception as exc:
+                    corpus.status.update(state="failed", error=f"{type(exc).__name__}: {exc}")
+                    raise
+                corpus.activate(generation)
+                corpus.status.update(
+                    state="ready", stage=None, ready_at=time.time(),
+                    generation=generation_count + 1,
+                )
+                self.loads += 1
+            corpus.last_used = time.monotonic()
+            graph = corpus.generation.graph
+        self._enforce_budget(keep=corpus)
+        return graph
+
+    def reload(self, corpus_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Re-index a loaded corpus if its files changed, then swap the new graph in.
+
+        Queries keep being served by the current graph while the next one is
+        built. Returns the reload summary, or None if nothing changed or the
+        corpus is not loaded.
+        """
+        corpus = self.corpus(corpus_id)
+        with corpus.lock:
+            previous = corpus.generation
+            if previous is None:
+                return None  # the next build will index the current files
+            if self._signatures(corpus.data_dir) == previous.signatures:
+                return None
+            started_at = time.time()
+            generation = self._build(corpus, previous, None)
+            corpus.activate(generation)
+            summary = dict(
+                generation.stats,
+                generation=corpus.status["generation"] + 1,
+                seconds=round(time.time() - started_at, 3),
+                at=time.time(),
+            )
+            corpus.status.update(generation=summary["generation"], last_reload=summary)
+        self._enforce_budget(keep=corpus)
+        return summary
+
+    def watch(self, interval: float) -> None:
+        """Poll loaded corpora forever, reloading each once a change has been stable for `interval`."""
+        last_seen: Dict[str, Dict[str, Any]] = {}
+        while True:
+            time.sleep(interval)
+            for corpus in list(self._corpora.values()):
+                generation = corpus.generation
+                if generation is None:
+                    last_seen.pop(corpus.corpus_id, None)
+                    continue
+                signatures = self._signatures(corpus.data_dir)
+                # Files still being copied in change between polls; wait until they don't
+                if (
+                    signatures != generation.signatures
+                    and signatures == last_seen.get(corpus.corpus_id)
+                ):
+                    try:
+                        self.reload(corpus.corpus_id)
+                    except Exception as exc:
+                        corpus.status["last_reload"] = {
+                            "error": f"{type(exc).__name__}: {exc}", "at": time.time()
+                        }
+                last_seen[corpus.corpus_id] = signatures
+
+    def _enforce_budget(self, keep: Corpus) -> None:
+        """Evict least recently used corpora (never `keep`) until within budget.
+
+        A corpus that is being built or reloaded holds its lock and is skipped,
+        so eviction cannot interleave with it swapping in a new generation;
+        the next call reconsiders it.
+        """
+        if self.memory_budget_bytes <= 0:
+            return
+        with self._lock:
+            loaded = [corpus for corpus in self._corpora.values() if corpus.nbytes]
+            total = sum(corpus.nbytes for corpus in loaded)
+            for corpus in sorted(loaded, key=lambda corpus: corpus.last_used):
+                if total <= self.memory_budget_bytes:
+                    break
+                if corpus is keep or not corpus.lock.acquire(blocking=False):
+                    continue
+                try:
+                    nbytes = corpus.nbytes
+                    if not nbytes:
+                        continue  # evicted meanwhile
+                    corpus.evict()
+                finally:
+                    corpus.lock.release()
+                total -= nbytes
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory use, load/eviction counts and per-corpus state."""
+        now = time.monotonic()
+        corpora = {}
+        for corpus_id in self.ids():
+            corpus = self._corpora.get(corpus_id)
+            corpora[corpus_id] = {
+                "data_dir": self._data_dirs[corpus_id],
+                "state": corpus.status["state"] if corpus else "idle",
+                "loaded": bool(corpus and corpus.generation is not None),
+                "bytes": corpus.nbytes if corpus else 0,
+                "failed_files": sorted(corpus.status["failed_files"]) if corpus else [],
+                "idle_seconds": (
+                    round(now - corpus.last_used, 3) if corpus and corpus.last_used else None
+                ),
+            }
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "loaded_bytes": sum(entry["bytes"] for entry in corpora.values()),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "corpora": corpora,
+        }
@@ -5,10 +5,10 @@ If helpful, end; otherwise, continue the loop or terminate after a safe limit.
 """
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Any, Dict, List
 
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import AIMessage
@@ -16,17 +16,17 @@ from langchain_core.messages import AIMessage
 from app.state import AgentState
 from app.models import get_chat_model
 from app.tools import get_tool_belt
+from app.parallel_tools import build_tool_node
 
 
-def _build_model_with_tools():
-    """Return a chat model instance bound to the current tool belt."""
+def _build_model_with_tools(tools: List):
+    """Return a chat model instance bound to `tools`."""
     model = get_chat_model()
-    return model.bind_tools(get_tool_belt())
+    return model.bind_tools(tools)
 
 
-def call_model(state: AgentState) -> Dict[str, Any]:
-    """Invoke the model with the accumulated messages and append its response."""
-    model = _build_model_with_tools()
+def call_model(state: AgentState, model) -> Dict[str, Any]:
+    """Invoke the tool-bound model with the accumulated messages and append its response."""
     messages = state["messages"]
     response = model.invoke(messages)
     return {"messages": [response]}
@@ -40,15 +40,8 @@ def route_to_action_or_helpfulness(state: AgentState):
     return "helpfulness"
 
 
-def helpfulness_node(state: AgentState) -> Dict[str, Any]:
-    """Evaluate helpfulness of the latest response relative to the initial query."""
-    # If we've exceeded loop limit, short-circuit with END decision marker
-    if len(state["messages"]) > 10:
-        return {"messages": [AIMessage(content="HELPFULNESS:END")]}    
-
-    initial_query = state["messages"][0]
-    final_response = state["messages"][-1]
-
+def _build_helpfulness_chain():
+    """Return the prompt | model | parser chain that grades a response 'Y'/'N'."""
     prompt_template = """
   Given an initial query and a final response, determine if the final response is extremely helpful or not. Please indicate helpfulness with a 'Y' and unhelpfulness as an 'N'.
 
@@ -60,9 +53,20 @@ def helpfulness_node(state: AgentState) -> Dict[str, Any]:
 
     helpfulness_prompt_template = PromptTemplate.from_template(prompt_template)
     helpfulness_check_model = get_chat_model(model_name="gpt-4.1-mini")
-    helpfulness_chain = (
+    # The Y/N verdict is internal, so keep it out of streamed message tokens
+    return (
         helpfulness_prompt_template | helpfulness_check_model | StrOutputParser()
-    )
+    ).with_config(tags=[TAG_NOSTREAM])
+
+
+def helpfulness_node(state: AgentState, helpfulness_chain) -> Dict[str, Any]:
+    """Evaluate helpfulness of the latest response relative to the initial query."""
+    # If we've exceeded loop limit, short-circuit with END decision marker
+    if len(state["messages"]) > 10:
+        return {"messages": [AIMessage(content="HELPFULNESS:END")]}    
+
+    initial_query = state["messages"][0]
+    final_response = state["messages"][-1]
 
     helpfulness_response = helpfulness_chain.invoke(
         {
@@ -89,12 +93,29 @@ def helpfulness_decision(state: AgentState):
 
 
 def build_graph():
-    """Build an agent graph with an auxiliary helpfulness evaluation subgraph."""
+    """Build an agent graph with an auxiliary helpfulness evaluation subgraph.
+
+    The tool belt, the model bound to it and the helpfulness chain are
+    created once here and shared by every turn of every run of the graph.
+    """
+    tools = get_tool_belt()
+    model_with_tools = _build_model_with_tools(tools)
+    helpfulness_chain = _build_helpfulness_chain()
+
+    def _call_model(state: AgentState) -> Dict[str, Any]:
+        """Wrapper to pass the tool-bound model to call_model."""
+        return call_model(state, model_with_tools)
+
+    def _helpfulness_node(state: AgentState) -> Dict[str, Any]:
+        """Wrapper to pass the helpfulness chain to helpfulness_node."""
+        return helpfulness_node(state, helpfulness_chain)
+
     graph = StateGraph(AgentState)
-    tool_node = ToolNode(get_tool_belt())
-    graph.add_node("agent", call_model)
+    # Runs a turn's tool calls concurrently, with per-call timeouts
+    tool_node = build_tool_node(tools)
+    graph.add_node("agent", _call_model)
     graph.add_node("action", tool_node)
-    graph.add_node("helpfulness", helpfulness_node)
+    graph.add_node("helpfulness", _helpfulness_node)
     graph.set_entry_point("agent")
     graph.add_conditional_edges(
         "agent",
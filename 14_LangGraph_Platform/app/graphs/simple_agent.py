@@ -2,30 +2,30 @@
 
 The graph:
 - Calls a chat model bound to the tool belt.
-- If the last message requested tool calls, routes to a ToolNode.
+- If the last message requested tool calls, routes to a tool node that runs
+  them concurrently (`app.parallel_tools`).
 - Otherwise, terminates.
 """
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Any, Dict, List
 
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 
 from app.state import AgentState
 from app.models import get_chat_model
 from app.tools import get_tool_belt
+from app.parallel_tools import build_tool_node
 
 
-def _build_model_with_tools():
-    """Return a chat model instance bound to the current tool belt."""
+def _build_model_with_tools(tools: List):
+    """Return a chat model instance bound to `tools`."""
     model = get_chat_model()
-    return model.bind_tools(get_tool_belt())
+    return model.bind_tools(tools)
 
 
-def call_model(state: AgentState) -> Dict[str, Any]:
-    """Invoke the model with the accumulated messages and append its response."""
-    model = _build_model_with_tools()
+def call_model(state: AgentState, model) -> Dict[str, Any]:
+    """Invoke the tool-bound model with the accumulated messages and append its response."""
     messages = state["messages"]
     response = model.invoke(messages)
     return {"messages": [response]}
@@ -40,10 +40,22 @@ def should_continue(state: AgentState):
 
 
 def build_graph():
-    """Build an agent graph that interleaves model and tool execution."""
+    """Build an agent graph that interleaves model and tool execution.
+
+    The tool belt and the model bound to it are created once here and shared
+    by every turn of every run of the graph.
+    """
+    tools = get_tool_belt()
+    model_with_tools = _build_model_with_tools(tools)
+
+    def _call_model(state: AgentState) -> Dict[str, Any]:
+        """Wrapper to pass the tool-bound model to call_model."""
+        return call_model(state, model_with_tools)
+
     graph = StateGraph(AgentState)
-    tool_node = ToolNode(get_tool_belt())
-    graph.add_node("agent", call_model)
+    # Runs a turn's tool calls concurrently, with per-call timeouts
+    tool_node = build_tool_node(tools)
+    graph.add_node("agent", _call_model)
     graph.add_node("action", tool_node)
     graph.set_entry_point("agent")
     # Explicitly map END sentinel to avoid KeyError('__end__') in platform runtime
@@ -0,0 +1,276 @@
+"""Concurrent execution of the tool calls in an agent turn.
+
+When the model requests several tools in one message (say a web search, an
+Arxiv query and a RAG lookup), the turn should take as long as the slowest
+call, not their sum. `build_tool_node(tools)` returns a graph node that runs
+all calls of the last AI message at once:
+
+- Sync path (`invoke`): every call runs on a shared tool pool of
+  `AGENT_TOOL_WORKERS` concurrent calls (default 8); async-only tools get an
+  event loop of their own there.
+- Async path (`ainvoke`): tools with a native coroutine are awaited together
+  with `asyncio.gather`; sync-only tools are sent to the same tool pool.
+
+Each call has a timeout (`AGENT_TOOL_TIMEOUT` seconds, default 60, or a
+per-tool override), counted from when the call starts running, not from when
+it was queued. A call that times out, raises or names an unknown tool yields
+an error ToolMessage for the model instead of failing the turn. Every
+ToolMessage records `latency_ms` (and `timed_out`) in its `response_metadata`,
+in the order the calls were made.
+
+A thread cannot be stopped, so a sync tool that times out keeps running in
+the background until it returns on its own. Its thread no longer counts
+against `AGENT_TOOL_WORKERS`, so later turns are not queued behind it. At most
+`AGENT_TOOL_MAX_ABANDONED` (default: the worker count) such threads are
+tolerated; beyond that, new sync tool calls fail fast with an error
+ToolMessage until some of them finish. Native coroutines are cancelled on
+timeout.
+
+This is the canonical copy; 15_A2A_LangGraph/app/parallel_tools.py mirrors it
+for the standalone A2A app and must be kept in sync.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+
+
+class ToolTimeoutError(Exception):
+    """A tool call exceeded its timeout."""
+
+
+class ToolPoolExhaustedError(Exception):
+    """Too many timed-out tool calls are still running to start another one."""
+
+
+class ToolPool:
+    """Runs sync tool calls on threads, each with a timeout counted from its start.
+
+    At most `workers` calls run at once; further calls wait for a slot. A call
+    that times out gives its slot back immediately and its thread is left to
+    finish in the background ("abandoned"). While `max_abandoned` threads are
+    abandoned, `submit` fails fast instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_abandoned: int):
+        self.workers = workers
+        self.max_abandoned = max_abandoned
+        self.abandoned = 0
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        # Running calls plus abandoned ones never exceed the thread count
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers + max_abandoned, thread_name_prefix="agent-tool"
+        )
+
+    def submit(self, fn: Callable[[], Any], timeout: float) -> Future:
+        """Run `fn` in the current context; return a future of `(result, seconds, timed_out)`.
+
+        `result` is `fn`'s return value or the exception it raised; a timeout
+        resolves the future with a ToolTimeoutError after `timeout` seconds of
+        running time, without waiting for `fn`.
+        """
+        outcome: Future = Future()
+        with self._lock:
+            abandoned = self.abandoned
+        if abandoned >= self.max_abandoned:
+            error = ToolPoolExhaustedError(
+                f"{abandoned} timed-out tool calls are still running; try again later"
+            )
+            outcome.set_result((error, 0.0, False))
+            return outcome
+        context = contextvars.copy_context()
+        self._executor.submit(self._run, context, fn, timeout, outcome)
+        return outcome
+
+    def _run(self, context, fn: Callable[[], Any], timeout: float, outcome: Future) -> None:
+        self._slots.acquire()
+        started = time.perf_counter()
+        decided = []
+
+        def finish(result: Any, timed_out: bool) -> bool:
+            """Settle the outcome once, from either the call or its timer."""
+            with self._lock:
+                if decided:
+                    return False
+                decided.append(True)
+                if timed_out:
+                    self.abandoned += 1
+            self._slots.release()
+            outcome.set_result((result, time.perf_counter() - started, timed_out))
+            return True
+
+        timer = threading.Timer(
+            timeout, finish, args=(ToolTimeoutError(f"timed out after {timeout:g}s"), True)
+        )
+        timer.daemon = True
+        timer.start()
+        try:
+            result = context.run(fn)
+        except Exception as exc:
+            result = exc
+        timer.cancel()
+        if not finish(result, False):
+            with self._lock:
+                self.abandoned -= 1  # the abandoned call has come back
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "abandoned": self.abandoned,
+                "max_abandoned": self.max_abandoned,
+            }
+
+
+_pool: Optional[ToolPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_tool_pool() -> ToolPool:
+    """Return the process-wide pool that runs sync tools, shared by all runs."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("AGENT_TOOL_WORKERS") or 8)
+            _pool = ToolPool(
+                workers=workers,
+                max_abandoned=int(os.environ.get("AGENT_TOOL_MAX_ABANDONED") or workers),
+            )
+        return _pool
+
+
+def _has_native_async(tool: BaseTool) -> bool:
+    """True if `tool` wraps a coroutine or implements `_arun` itself."""
+    if hasattr(tool, "coroutine"):
+        # StructuredTool and Tool override `_arun` for every instance and
+        # send a missing coroutine to the event loop's default executor
+        return tool.coroutine is not None
+    return type(tool)._arun is not BaseTool._arun
+
+
+def _sync_call(tool: BaseTool, call: Dict[str, Any], config: RunnableConfig) -> Callable[[], Any]:
+    """Return a thunk that runs one call on a pool thread."""
+    if getattr(tool, "func", True) is None:
+        # Coroutine-only StructuredTool: no sync implementation to call
+        return lambda: asyncio.run(tool.ainvoke(call, config))
+    return lambda: tool.invoke(call, config)
+
+
+def _with_latency(
+    message: Any, call: Dict[str, Any], seconds: float, timed_out: bool = False
+) -> ToolMessage:
+    if not isinstance(message, ToolMessage):
+        message = ToolMessage(content=str(message), name=call["name"], tool_call_id=call["id"])
+    message.response_metadata = dict(
+        message.response_metadata,
+        latency_ms=round(seconds * 1e3, 1),
+        timed_out=timed_out,
+    )
+    return message
+
+
+def _error_message(call: Dict[str, Any], error: str) -> ToolMessage:
+    return ToolMessage(
+        content=f"Error: {error}\n Please fix your mistakes.",
+        name=call["name"],
+        tool_call_id=call["id"],
+        status="error",
+    )
+
+
+def _outcome_message(call: Dict[str, Any], outcome: Tuple[Any, float, bool]) -> ToolMessage:
+    """ToolMessage for a `ToolPool` outcome."""
+    result, seconds, timed_out = outcome
+    if isinstance(result, ToolTimeoutError):
+        result = _error_message(call, f"{call['name']} {result}")
+    elif isinstance(result, Exception):
+        result = _error_message(call, repr(result))
+    return _with_latency(result, call, seconds, timed_out=timed_out)
+
+
+def build_tool_node(
+    tools: Sequence[BaseTool],
+    timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> RunnableLambda:
+    """Return a node that executes the last AI message's tool calls concurrently.
+
+    `timeout` applies to every tool (default: AGENT_TOOL_TIMEOUT, 60s);
+    `timeouts` overrides it per tool name. Use it in place of `ToolNode`.
+    """
+    tools_by_name = {tool.name: tool for tool in tools}
+    default_timeout = (
+        timeout if timeout is not None
+        else float(os.environ.get("AGENT_TOOL_TIMEOUT", "60"))
+    )
+    timeouts = dict(timeouts or {})
+
+    def _tool_calls(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        message = state["messages"][-1]
+        return list(message.tool_calls) if isinstance(message, AIMessage) else []
+
+    def _timeout_for(call: Dict[str, Any]) -> float:
+        return timeouts.get(call["name"], default_timeout)
+
+    def run_tools(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        pool = get_tool_pool()
+        pending = []
+        for call in _tool_calls(state):
+            tool = tools_by_name.get(call["name"])
+            outcome = (
+                pool.submit(_sync_call(tool, call, config), _timeout_for(call))
+                if tool is not None else None
+            )
+            pending.append((call, outcome))
+
+        messages = []
+        for call, outcome in pending:
+            if outcome is None:
+                message = _error_message(call, f"{call['name']} is not a valid tool")
+                messages.append(_with_latency(message, call, 0.0))
+            else:
+                # Settles by the call's own deadline, whatever the others do
+                messages.append(_outcome_message(call, outcome.result()))
+        return {"messages": messages}
+
+    async def _arun_one(call: Dict[str, Any], config: RunnableConfig) -> ToolMessage:
+        tool = tools_by_name.get(call["name"])
+        if tool is None:
+            message = _error_message(call, f"{call['name']} is not a valid tool")
+            return _with_latency(message, call, 0.0)
+        if not _has_native_async(tool):
+            outcome = get_tool_pool().submit(_sync_call(tool, call, config), _timeout_for(call))
+            return _outcome_message(call, await asyncio.wrap_future(outcome))
+        started = time.perf_counter()
+        try:
+            message = await asyncio.wait_for(
+                tool.ainvoke(call, config), timeout=_timeout_for(call)
+            )
+        except asyncio.TimeoutError:
+            message = _error_message(
+                call, f"{call['name']} timed out after {_timeout_for(call):g}s"
+            )
+            return _with_latency(
+                message, call, time.perf_counter() - started, timed_out=True
+            )
+        except Exception as exc:
+            message = _error_message(call, repr(exc))
+        return _with_latency(message, call, time.perf_counter() - started)
+
+    async def arun_tools(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        messages = await asyncio.gather(
+            *(_arun_one(call, config) for call in _tool_calls(state))
+        )
+        return {"messages": list(messages)}
+
+    return RunnableLambda(run_tools, afunc=arun_tools, name="tools")
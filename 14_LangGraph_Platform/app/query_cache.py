@@ -0,0 +1,122 @@
+"""In-process cache of query embeddings and retrieval results.
+
+Agents tend to call the RAG tool repeatedly with the same question, differing
+only in case, spacing or trailing punctuation. Entries are keyed on the
+normalized query text and hold its embedding and the documents retrieved for
+it, so a repeat skips both the embeddings API call and the vector search.
+
+The least recently used entry is evicted once `max_entries` is reached, and
+all entries are dropped when the namespace (the RAG index snapshot the
+results came from) changes.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+_STRIP_CHARS = " \t\n?!.,;:\"'"
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop surrounding punctuation."""
+    return " ".join(query.casefold().split()).strip(_STRIP_CHARS)
+
+
+class QueryCache:
+    """Bounded LRU map of normalized query -> embedding and retrieved documents."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.namespace: Optional[str] = None
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = {"embedding": 0, "documents": 0}
+        self.misses = {"embedding": 0, "documents": 0}
+        self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def set_namespace(self, namespace: str) -> None:
+        """Bind the cache to an index snapshot; a different one clears it."""
+        with self._lock:
+            if namespace != self.namespace:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.namespace = namespace
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        return self._get(query, "embedding")
+
+    def put_embedding(
+        self, query: str, embedding: List[float], namespace: Optional[str] = None
+    ) -> None:
+        self._put(query, "embedding", list(embedding), namespace)
+
+    def get_documents(self, query: str) -> Optional[List[Document]]:
+        documents = self._get(query, "documents")
+        return list(documents) if documents is not None else None
+
+    def put_documents(
+        self, query: str, documents: List[Document], namespace: Optional[str] = None
+    ) -> None:
+        self._put(query, "documents", list(documents), namespace)
+
+    def _get(self, query: str, field: str) -> Any:
+        if not self.enabled:
+            return None
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or field not in entry:
+                self.misses[field] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[field] += 1
+            return entry[field]
+
+    def _put(self, query: str, field: str, value: Any, namespace: Optional[str]) -> None:
+        """Store `value`; dropped if `namespace` is given and is not the current one."""
+        if not self.enabled:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            if namespace is not None and namespace != self.namespace:
+                return
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+                entry = self._entries[key] = {}
+            else:
+                self._entries.move_to_end(key)
+            entry[field] = value
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-field hit-rate metrics and current occupancy."""
+        with self._lock:
+            stats: Dict[str, Any] = {}
+            for field in ("embedding", "documents"):
+                lookups = self.hits[field] + self.misses[field]
+                stats[field] = {
+                    "hits": self.hits[field],
+                    "misses": self.misses[field],
+                    "hit_rate": round(self.hits[field] / lookups, 4) if lookups else 0.0,
+                }
+            stats.update(
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                evictions=self.evictions,
+                invalidations=self.invalidations,
+            )
+            return stats
@@ -1,83 +1,520 @@
 """Retrieval-Augmented Generation (RAG) utilities and tool.
 
 This module builds an in-memory RAG pipeline that:
-- Loads PDF documents from `RAG_DATA_DIR` (default: "data").
-- Splits documents into chunks using a token-aware splitter.
+- Loads PDF documents from `RAG_DATA_DIR` (default: "data"), parsing files
+  concurrently in a process pool (`RAG_INGEST_WORKERS`, default: CPU count).
+  PDFs that cannot be parsed are logged and listed as `failed_files` in the
+  readiness and stats output.
+- Splits documents into chunks using a token-aware splitter as each file
+  arrives, embedding full batches of chunks while parsing continues.
 - Embeds chunks with OpenAI and stores vectors in an in-memory Qdrant store.
+- Persists the chunks and their vectors to `RAG_INDEX_DIR` (default:
+  ".rag_index"), keyed by the data contents and embedding model, so later
+  cold starts skip loading, splitting and embedding. Only the newest
+  `RAG_INDEX_KEEP` snapshots (default 2) of each data directory are kept
+  (`app.rag_snapshot`).
 - Exposes a LangChain Tool `retrieve_information` that retrieves relevant
-  context and generates a response constrained to that context.
+  context and generates a response constrained to that context. Retrieval
+  over-fetches `RAG_RETRIEVAL_CANDIDATES` chunks (default 20) and reranks
+  them (`RAG_RERANKER`, default BM25; see `app.rerank`), keeping the best
+  `RAG_RETRIEVAL_K` (default 3) for generation. The tool and
+  the graph have native async paths (`ainvoke`), so concurrent calls from an
+  async runtime share the event loop instead of each holding a worker thread.
+- Serves paraphrases of earlier questions from a semantic answer cache
+  (`app.semantic_cache`), invalidated whenever the index snapshot changes.
+- Reuses the embedding and retrieved chunks of repeated queries (compared
+  after normalization) from `app.query_cache`, also per index snapshot.
+- Streams generated tokens: runs streamed with `stream_mode="messages"` and
+  subgraphs enabled receive the answer as it is generated, tagged
+  `RAG_STREAM_TAG`, before the tool returns.
+- Serves several document collections (corpora) from one process: each id
+  in `RAG_CORPORA` ("id=path,id=path"; default: the single corpus "default"
+  at `RAG_DATA_DIR`) gets its own index and caches, loaded on first use and
+  evicted least recently used first beyond `RAG_MEMORY_BUDGET_MB`
+  (`app.corpus_registry`). The tool's optional `corpus` argument selects one.
+- Builds each index at most once per load; `start_warmup()` builds the
+  default corpus in a background thread at server start and
+  `rag_readiness()` reports progress.
+- Hot-reloads data directories: `start_data_watcher()` polls the loaded
+  corpora and, when PDFs are added, changed or removed, embeds only those
+  into a new index generation and swaps it in without blocking queries in
+  flight.
 """
 from __future__ import annotations
 
+import asyncio
+import logging
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from functools import lru_cache
-from typing import Annotated, List
+from typing import (
+    Annotated, Any, Callable, Dict, Iterator, List, NamedTuple, Optional,
+    Sequence, Tuple,
+)
 
+import numpy as np
 import tiktoken
-from langchain_community.document_loaders import DirectoryLoader, PyMuPDFLoader
+from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.vectorstores import Qdrant
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI
 from langchain_openai.embeddings import OpenAIEmbeddings
-from langgraph.graph import START, StateGraph
+from langgraph.graph import END, START, StateGraph
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
 from typing_extensions import TypedDict
 
+from app import rag_snapshot
+from app.corpus_registry import Corpus, CorpusRegistry, parse_corpora
+from app.query_cache import QueryCache
+from app.rerank import NoopReranker, get_reranker
+from app.semantic_cache import SemanticAnswerCache
 
+logger = logging.getLogger(__name__)
+
+# Tag carried by the RAG generator's LLM runs; in `stream_mode="messages"`
+# output it appears in the metadata's "tags", marking RAG answer tokens.
+RAG_STREAM_TAG = "rag_answer"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Return the process-wide tiktoken encoding for gpt-4o.
+
+    Looked up once; used for chunk length measurement and token budgeting.
+    """
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+@lru_cache(maxsize=8192)
 def _tiktoken_len(text: str) -> int:
-    """Return token length using tiktoken; used for chunk length measurement."""
-    tokens = tiktoken.encoding_for_model("gpt-4o").encode(text)
-    return len(tokens)
+    """Return token length using tiktoken; used for chunk length measurement.
+
+    Memoized because RecursiveCharacterTextSplitter measures each candidate
+    split more than once (when checking it and again when merging). Special
+    token strings such as "<|endoftext|>" in PDF text count as plain text.
+    """
+    return len(_get_encoding().encode_ordinary(text))
+
+
+def _tiktoken_lens(
+    texts: Sequence[str], num_threads: Optional[int] = None
+) -> List[int]:
+    """Return token lengths of many texts with one threaded `encode_ordinary_batch` call.
+
+    tiktoken releases the GIL while encoding, so the batch spreads across
+    `num_threads` (default: one per CPU); with a single thread or text the
+    pool overhead is skipped.
+    """
+    encoding = _get_encoding()
+    num_threads = num_threads or min(8, os.cpu_count() or 1)
+    if num_threads <= 1 or len(texts) <= 1:
+        return [len(encoding.encode_ordinary(text)) for text in texts]
+    encoded = encoding.encode_ordinary_batch(list(texts), num_threads=num_threads)
+    return [len(tokens) for tokens in encoded]
+
+
+def _pack_context(documents: List[Document], token_budget: int) -> Tuple[str, int]:
+    """Greedily pack retrieved chunks (in rank order) into a token budget.
+
+    Duplicate chunks (ignoring case and whitespace, as in aimakerspace's
+    ContextPacker) are skipped, as is any chunk that would overflow the budget,
+    so smaller lower-ranked chunks can still fill the remainder.
+
+    Returns: the packed context string and the number of tokens saved compared
+    to pasting every retrieved chunk.
+    """
+    separator = "\n\n"
+    separator_tokens = _tiktoken_len(separator)
+    texts = [document.page_content for document in documents]
+    selected: List[str] = []
+    seen = set()
+    input_tokens = packed_tokens = 0
+    for index, (text, tokens) in enumerate(zip(texts, _tiktoken_lens(texts))):
+        input_tokens += tokens + (separator_tokens if index else 0)
+        key = " ".join(text.lower().split())
+        if key in seen:
+            continue
+        seen.add(key)
+        cost = tokens + (separator_tokens if selected else 0)
+        if packed_tokens + cost > token_budget:
+            continue
+        selected.append(text)
+        packed_tokens += cost
+    return separator.join(selected), input_tokens - packed_tokens
+
+
+def _pdf_paths(data_dir: str) -> List[str]:
+    """Return the PDF files under `data_dir` (recursive), sorted."""
+    pdf_paths = []
+    for root, _, files in os.walk(data_dir):
+        pdf_paths.extend(
+            os.path.join(root, name) for name in files if name.lower().endswith(".pdf")
+        )
+    return sorted(pdf_paths)
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    """Return `(size, mtime_ns)`, which changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _data_signatures(data_dir: str) -> Dict[str, Tuple[int, int]]:
+    """Map each PDF under `data_dir` to its signature; cheap enough to poll."""
+    signatures = {}
+    for path in _pdf_paths(data_dir):
+        try:
+            signatures[path] = _file_signature(path)
+        except OSError:
+            pass  # removed since listing
+    return signatures
+
+
+def _load_pdf(path: str) -> Tuple[List[Document], Optional[str]]:
+    """Parse one PDF into page documents; runs in a worker process.
+
+    Returns: the pages and None, or no pages and the error if parsing failed.
+    """
+    try:
+        return PyMuPDFLoader(path).load(), None
+    except Exception as exc:
+        return [], f"{type(exc).__name__}: {exc}"
+
+
+def _iter_pdf_pages(
+    paths: Sequence[str], max_workers: Optional[int] = None
+) -> Iterator[Tuple[str, List[Document], Optional[str]]]:
+    """Yield `(path, pages, error)` for each PDF as soon as it has been parsed.
+
+    Files complete in whatever order the workers finish them. Workers are
+    spawned rather than forked: builds run on threads of a multi-threaded
+    server, and a forked child could inherit a lock another thread held.
+    With a single worker or file, or where worker processes cannot be
+    started, files are parsed in-process instead.
+    """
+    if not paths:
+        return
+    workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    executor = None
+    if workers > 1:
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        except (OSError, NotImplementedError):
+            pass
+    if executor is None:
+        for path in paths:
+            yield (path, *_load_pdf(path))
+        return
+    with executor:
+        futures = {executor.submit(_load_pdf, path): path for path in paths}
+        for future in as_completed(futures):
+            yield (futures[future], *future.result())
+
+
+def _ingest_pdfs(
+    data_dir: str,
+    text_splitter,
+    embedding_model,
+    max_workers: Optional[int] = None,
+    embed_batch_size: int = 256,
+    embed_concurrency: int = 4,
+    paths: Optional[Sequence[str]] = None,
+) -> Tuple[List[Document], np.ndarray, Dict[str, str]]:
+    """Parse, split and embed the PDFs under `data_dir` (or just `paths`) as a pipeline.
+
+    Worker processes parse files concurrently; each file's pages are split as
+    soon as it arrives, and every `embed_batch_size` chunks are sent to the
+    embedding API from a thread pool while parsing continues. Ingest wall
+    time is therefore bounded by the slowest stage rather than their sum.
+
+    Returns: the chunks and their vectors, in the same order, and the error
+    of each PDF that could not be parsed (logged as a warning).
+    """
+    chunks: List[Document] = []
+    pending: List[Document] = []
+    failed: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=embed_concurrency) as embed_pool:
+        batches = []
+
+        def submit(batch: List[Document]) -> None:
+            batches.append(
+                embed_pool.submit(
+                    embedding_model.embed_documents,
+                    [chunk.page_content for chunk in batch],
+                )
+            )
+
+        if paths is None:
+            paths = _pdf_paths(data_dir)
+        for path, pages, error in _iter_pdf_pages(paths, max_workers):
+            if error is not None:
+                logger.warning("Could not parse %s: %s", path, error)
+                failed[path] = error
+            file_chunks = text_splitter.split_documents(pages)
+            chunks.extend(file_chunks)
+            pending.extend(file_chunks)
+            while len(pending) >= embed_batch_size:
+                submit(pending[:embed_batch_size])
+                pending = pending[embed_batch_size:]
+        if pending:
+            submit(pending)
+        vectors = [vector for batch in batches for vector in batch.result()]
+    return chunks, np.asarray(vectors, dtype=np.float32), failed
+
+
+class _IndexedFile(NamedTuple):
+    """One PDF's chunks and their vectors, with the signature they were made from.
+
+    `error` is set, and there are no chunks, if the PDF could not be parsed.
+    """
+    signature: Optional[Tuple[int, int]]
+    chunks: List[Document]
+    vectors: np.ndarray
+    error: Optional[str] = None
+
+
+def _index_by_file(
+    signatures: Dict[str, Tuple[int, int]],
+    chunks: List[Document],
+    vectors: np.ndarray,
+    failed: Optional[Dict[str, str]] = None,
+) -> Dict[str, _IndexedFile]:
+    """Group chunks and vectors by their source PDF (`metadata["source"]`).
+
+    Every path in `signatures` gets an entry, possibly empty, so a PDF that
+    yields no text or fails to parse is not re-parsed on every reload until
+    it changes. `failed` maps the PDFs that failed to their error.
+    """
+    failed = failed or {}
+    rows: Dict[str, List[int]] = {path: [] for path in signatures}
+    for row, chunk in enumerate(chunks):
+        rows.setdefault(chunk.metadata.get("source"), []).append(row)
+    return {
+        path: _IndexedFile(
+            signatures.get(path),
+            [chunks[row] for row in file_rows],
+            vectors[file_rows] if file_rows else np.zeros((0,), dtype=np.float32),
+            failed.get(path),
+        )
+        for path, file_rows in rows.items()
+    }
+
+
+def _flatten_files(files: Dict[str, _IndexedFile]) -> Tuple[List[Document], np.ndarray]:
+    """Concatenate per-file chunks and vectors in path order."""
+    indexed = [files[path] for path in sorted(files, key=str) if files[path].chunks]
+    if not indexed:
+        return [], np.zeros((0,), dtype=np.float32)
+    chunks = [chunk for indexed_file in indexed for chunk in indexed_file.chunks]
+    return chunks, np.concatenate([indexed_file.vectors for indexed_file in indexed])
+
+
+def _file_digests(
+    signatures: Dict[str, Tuple[int, int]], previous: Optional["_RAGGeneration"] = None
+) -> Dict[str, str]:
+    """Content digest of each PDF in `signatures`.
+
+    Files whose signature matches the `previous` generation reuse its digest,
+    so a reload only reads the PDFs that were added or changed.
+    """
+    digests = {}
+    for path, signature in signatures.items():
+        if previous is not None and previous.signatures.get(path) == signature:
+            digests[path] = previous.digests[path]
+            continue
+        try:
+            digests[path] = rag_snapshot.file_digest(path)
+        except OSError:
+            pass  # removed since listing
+    return digests
+
+
+def _vectorstore_from_vectors(
+    chunks: Sequence[Document], vectors: np.ndarray, embedding_model
+) -> Qdrant:
+    """Create an in-memory Qdrant store from precomputed chunk vectors."""
+    collection_name = "rag"
+    client = QdrantClient(location=":memory:")
+    dimension = (
+        vectors.shape[1] if len(vectors) else len(embedding_model.embed_query("dimension"))
+    )
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=qdrant_models.VectorParams(
+            size=dimension, distance=qdrant_models.Distance.COSINE
+        ),
+    )
+    if len(chunks):
+        client.upsert(
+            collection_name=collection_name,
+            points=[
+                qdrant_models.PointStruct(
+                    id=index,
+                    vector=vector,
+                    payload={"page_content": chunk.page_content, "metadata": chunk.metadata},
+                )
+                for index, (chunk, vector) in enumerate(zip(chunks, vectors.tolist()))
+            ],
+        )
+    return Qdrant(client=client, collection_name=collection_name, embeddings=embedding_model)
 
 
 class _RAGState(TypedDict):
-    """State schema for the simple two-step RAG graph: retrieve then generate."""
+    """State schema for the RAG graph: cache lookup, retrieve, generate."""
     question: str
+    query_embedding: List[float]
+    cache_hit: bool
     context: List[Document]
     response: str
+    tokens_saved: int
+
+
+def _new_answer_cache() -> SemanticAnswerCache:
+    """Answers keyed by query embedding; one per corpus, bound to its index snapshot."""
+    return SemanticAnswerCache(
+        threshold=float(os.environ.get("RAG_ANSWER_CACHE_THRESHOLD", "0.95")),
+        max_entries=int(os.environ.get("RAG_ANSWER_CACHE_SIZE", "512")),
+        ttl_seconds=float(os.environ.get("RAG_ANSWER_CACHE_TTL", "3600")),
+    )
 
 
-def _build_rag_graph(data_dir: str) -> "CompiledGraph":
+def _new_query_cache() -> QueryCache:
+    """Embeddings and retrieval results keyed by normalized query text; one per corpus."""
+    return QueryCache(max_entries=int(os.environ.get("RAG_QUERY_CACHE_SIZE", "256")))
+
+
+class _RAGGeneration(NamedTuple):
+    """A compiled RAG graph together with the index it was built from."""
+    graph: Any
+    files: Dict[str, _IndexedFile]
+    signatures: Dict[str, Tuple[int, int]]
+    digests: Dict[str, str]
+    snapshot_key: str
+    answer_namespace: str
+    stats: Dict[str, Any]
+    nbytes: int
+
+
+def _index_nbytes(chunks: List[Document], vectors: np.ndarray) -> int:
+    """Rough memory footprint of an index: vectors and chunk text, each held
+    twice (by the generation's files and by the Qdrant collection)."""
+    return 2 * (int(vectors.nbytes) + sum(len(chunk.page_content) for chunk in chunks))
+
+
+def _build_rag_generation(
+    data_dir: str,
+    progress: Optional[Callable[[str], None]] = None,
+    previous: Optional[_RAGGeneration] = None,
+    answer_cache: Optional[SemanticAnswerCache] = None,
+    query_cache: Optional[QueryCache] = None,
+) -> _RAGGeneration:
     """Construct and compile a minimal RAG graph.
 
     Steps:
-    1) Load PDFs from `data_dir` recursively (best-effort).
-    2) Split documents into token-aware chunks.
-    3) Create embeddings and an in-memory Qdrant vector store retriever.
-    4) Define a chat prompt and generation model.
-    5) Wire a two-node graph: retrieve -> generate.
+    1) Load PDFs from `data_dir` recursively (best-effort), in parallel.
+    2) Split documents into token-aware chunks as each file is parsed.
+    3) Create embeddings (overlapping with 1-2) and an in-memory Qdrant
+       vector store retriever, plus a reranker fitted to the chunks.
+       Steps 1-3 are skipped when a snapshot for the current data directory
+       contents exists under RAG_INDEX_DIR; otherwise one is written (and
+       superseded ones beyond RAG_INDEX_KEEP are deleted). With a
+       `previous` generation they only run for PDFs that were added or
+       changed since; unchanged PDFs keep their chunks and vectors.
+    4) Define a chat prompt and generation model; retrieved chunks are packed
+       into a RAG_CONTEXT_TOKEN_BUDGET token budget (default 2000).
+    5) Wire the graph: lookup -> (cached answer | retrieve -> generate ->
+       remember). `lookup` embeds the query and checks the semantic answer
+       cache; `remember` stores freshly generated answers in it. Query
+       embeddings and retrieved chunks are reused for repeated queries.
+
+    The graph reads and writes `answer_cache` and `query_cache` (fresh,
+    unbound ones by default); binding them to the generation is left to the
+    caller, see `Corpus.activate`.
+    `progress`, if given, is called with the name of each stage as it starts.
     """
-    # Load PDFs from data directory (recursive)
-    try:
-        directory_loader = DirectoryLoader(
-            data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
+    report = progress or (lambda stage: None)
+    answer_cache = answer_cache or _new_answer_cache()
+    query_cache = query_cache or _new_query_cache()
+    report("fingerprinting data")
+    embedding_model_name = "text-embedding-3-small"
+    chunk_size = 750
+    embedding_model = OpenAIEmbeddings(model=embedding_model_name)
+    signatures = _data_signatures(data_dir)
+    digests = _file_digests(signatures, previous)
+    snapshot_key = rag_snapshot.snapshot_key(data_dir, digests, embedding_model_name, chunk_size)
+    snapshot_dir = os.path.join(rag_snapshot.snapshot_root(data_dir), snapshot_key)
+
+    report("loading snapshot")
+    snapshot = rag_snapshot.load_snapshot(snapshot_dir)
+    if snapshot is not None:
+        files = _index_by_file(signatures, *snapshot, rag_snapshot.load_failed(snapshot_dir))
+        reused, embedded = len(signatures), []
+    else:
+        try:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+        except Exception:
+            # Fallback to legacy import path if available
+            from langchain.text_splitter import (  # type: ignore
+                RecursiveCharacterTextSplitter,
+            )
+
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0, length_function=_tiktoken_len
         )
-        documents = directory_loader.load()
-    except Exception:
-        documents = []
 
-    # Split documents
-    try:
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-    except Exception:
-        # Fallback to legacy import path if available
-        from langchain.text_splitter import (  # type: ignore
-            RecursiveCharacterTextSplitter,
+        # Unchanged PDFs of the previous generation keep their vectors
+        files = {
+            path: indexed_file
+            for path, indexed_file in (previous.files if previous else {}).items()
+            if path in signatures and indexed_file.signature == signatures[path]
+        }
+        reused = len(files)
+        embedded = [path for path in signatures if path not in files]
+
+        # Load, split and embed new or changed PDFs (recursive, pipelined)
+        report("ingesting documents")
+        max_workers = int(os.environ.get("RAG_INGEST_WORKERS") or 0) or None
+        new_chunks, new_vectors, new_failed = _ingest_pdfs(
+            data_dir, text_splitter, embedding_model, max_workers=max_workers,
+            paths=embedded,
+        )
+        files.update(
+            _index_by_file(
+                {path: signatures[path] for path in embedded},
+                new_chunks,
+                new_vectors,
+                new_failed,
+            )
         )
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=750, chunk_overlap=0, length_function=_tiktoken_len
-    )
-    chunks = text_splitter.split_documents(documents) if documents else []
+    chunks, vectors = _flatten_files(files)
+    failed = {path: files[path].error for path in sorted(files) if files[path].error}
+    # Persist for later cold starts
+    if snapshot is None and chunks:
+        rag_snapshot.save_snapshot(snapshot_dir, chunks, vectors, failed=failed)
 
-    # Embeddings and vector store (in-memory Qdrant)
-    embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
-    qdrant_vectorstore = Qdrant.from_documents(
-        documents=chunks, embedding=embedding_model, location=":memory:"
+    # Vector store (in-memory Qdrant) from precomputed vectors
+    report("indexing vectors")
+    qdrant_vectorstore = _vectorstore_from_vectors(chunks, vectors, embedding_model)
+
+    # Two-stage retrieval: over-fetch candidates by vector similarity, then
+    # rerank them and keep only the best few for the generator
+    search_k = int(os.environ.get("RAG_RETRIEVAL_K", "3"))
+    reranker = get_reranker(os.environ.get("RAG_RERANKER", "bm25"), chunks)
+    fetch_k = (
+        search_k
+        if isinstance(reranker, NoopReranker)
+        else max(search_k, int(os.environ.get("RAG_RETRIEVAL_CANDIDATES", "20")))
     )
-    retriever = qdrant_vectorstore.as_retriever()
 
     # Prompt and model
     human_template = (
@@ -86,42 +523,316 @@ def _build_rag_graph(data_dir: str) -> "CompiledGraph":
         "Only use the provided context to answer the query. If you do not know the answer, or it's not contained in the provided context respond with \"I don't know\""
     )
     chat_prompt = ChatPromptTemplate.from_messages([("human", human_template)])
-    generator_llm = ChatOpenAI(model=os.environ.get("OPENAI_CHAT_MODEL", "gpt-4.1-nano"))
+    chat_model_name = os.environ.get("OPENAI_CHAT_MODEL", "gpt-4.1-nano")
+    generator_llm = ChatOpenAI(model=chat_model_name)
+    # Composed once here rather than on every generate call. The chat model
+    # streams whenever a caller streams messages (LangGraph attaches a
+    # streaming callback), so tokens surface before generation finishes.
+    generator_chain = (chat_prompt | generator_llm | StrOutputParser()).with_config(
+        tags=[RAG_STREAM_TAG]
+    )
+
+    # Cached answers are only valid for this snapshot and chat model, cached
+    # embeddings and retrieval results for this snapshot. Writes tagged with
+    # a namespace other than the caches' current one are dropped, so queries
+    # still running on a replaced generation cannot pollute its successor.
+    answer_namespace = f"{snapshot_key}:{chat_model_name}"
+
+    # The query is embedded once, for both the cache lookup and retrieval
+    def lookup(state: _RAGState) -> _RAGState:
+        question = state["question"]
+        embedding = query_cache.get_embedding(question)
+        if embedding is None:
+            embedding = embedding_model.embed_query(question)
+            query_cache.put_embedding(question, embedding, namespace=snapshot_key)
+        return _lookup_result(embedding)
+
+    async def alookup(state: _RAGState) -> _RAGState:
+        question = state["question"]
+        embedding = query_cache.get_embedding(question)
+        if embedding is None:
+            embedding = await embedding_model.aembed_query(question)
+            query_cache.put_embedding(question, embedding, namespace=snapshot_key)
+        return _lookup_result(embedding)
+
+    def _lookup_result(embedding: List[float]) -> _RAGState:
+        cached = answer_cache.lookup(embedding)
+        if cached is None:
+            return {"query_embedding": embedding, "cache_hit": False}  # type: ignore
+        return {"query_embedding": embedding, "cache_hit": True, "response": cached}  # type: ignore
+
+    def route_after_lookup(state: _RAGState) -> str:
+        return END if state.get("cache_hit") else "retrieve"
 
     def retrieve(state: _RAGState) -> _RAGState:
-        retrieved_docs = retriever.invoke(state["question"]) if retriever else []
+        retrieved_docs = query_cache.get_documents(state["question"])
+        if retrieved_docs is None:
+            candidates = qdrant_vectorstore.similarity_search_by_vector(
+                state["query_embedding"], k=fetch_k
+            )
+            retrieved_docs = reranker.rerank(state["question"], candidates, search_k)
+            query_cache.put_documents(
+                state["question"], retrieved_docs, namespace=snapshot_key
+            )
+        return {"context": retrieved_docs}  # type: ignore
+
+    async def aretrieve(state: _RAGState) -> _RAGState:
+        retrieved_docs = query_cache.get_documents(state["question"])
+        if retrieved_docs is None:
+            # In-memory Qdrant has no async client: its async search would just
+            # run the sync one on an executor thread. The search is a short
+            # CPU-bound scan, so it runs inline on the event loop instead.
+            candidates = qdrant_vectorstore.similarity_search_by_vector(
+                state["query_embedding"], k=fetch_k
+            )
+            if reranker.inline:
+                retrieved_docs = reranker.rerank(state["question"], candidates, search_k)
+            else:
+                retrieved_docs = await asyncio.to_thread(
+                    reranker.rerank, state["question"], candidates, search_k
+                )
+            query_cache.put_documents(
+                state["question"], retrieved_docs, namespace=snapshot_key
+            )
         return {"context": retrieved_docs}  # type: ignore
 
+    context_token_budget = int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
+
     def generate(state: _RAGState) -> _RAGState:
-        generator_chain = chat_prompt | generator_llm | StrOutputParser()
+        context_text, tokens_saved = _pack_context(
+            state.get("context", []), context_token_budget
+        )
         response_text = generator_chain.invoke(
-            {"query": state["question"], "context": state.get("context", [])}
+            {"query": state["question"], "context": context_text}
+        )
+        return {"response": response_text, "tokens_saved": tokens_saved}  # type: ignore
+
+    async def agenerate(state: _RAGState) -> _RAGState:
+        context_text, tokens_saved = _pack_context(
+            state.get("context", []), context_token_budget
         )
-        return {"response": response_text}  # type: ignore
+        response_text = await generator_chain.ainvoke(
+            {"query": state["question"], "context": context_text}
+        )
+        return {"response": response_text, "tokens_saved": tokens_saved}  # type: ignore
+
+    def remember(state: _RAGState) -> _RAGState:
+        answer_cache.store(
+            state["query_embedding"], state["response"], namespace=answer_namespace
+        )
+        return {}  # type: ignore
 
+    async def aremember(state: _RAGState) -> _RAGState:
+        return remember(state)
+
+    report("compiling graph")
     graph_builder = StateGraph(_RAGState)
-    graph_builder = graph_builder.add_sequence([retrieve, generate])
-    graph_builder.add_edge(START, "retrieve")
-    return graph_builder.compile()
+    # Each node has a sync and an async implementation. Under ainvoke() the
+    # embedding and chat model calls are awaited and the in-memory search
+    # runs inline; only a cross-encoder reranker is sent to a thread.
+    graph_builder.add_node("lookup", RunnableLambda(lookup, afunc=alookup))
+    graph_builder = graph_builder.add_sequence(
+        [
+            ("retrieve", RunnableLambda(retrieve, afunc=aretrieve)),
+            ("generate", RunnableLambda(generate, afunc=agenerate)),
+            ("remember", RunnableLambda(remember, afunc=aremember)),
+        ]
+    )
+    graph_builder.add_edge(START, "lookup")
+    graph_builder.add_conditional_edges("lookup", route_after_lookup, ["retrieve", END])
+    previous_paths = set(previous.signatures) if previous else set()
+    return _RAGGeneration(
+        graph=graph_builder.compile(),
+        files=files,
+        signatures=signatures,
+        digests=digests,
+        snapshot_key=snapshot_key,
+        answer_namespace=answer_namespace,
+        stats={
+            "files": len(signatures),
+            "chunks": len(chunks),
+            "reused_files": reused,
+            "embedded_files": len(embedded),
+            "failed_files": failed,
+            "added_files": len(set(signatures) - previous_paths) if previous else None,
+            "removed_files": len(previous_paths - set(signatures)) if previous else None,
+        },
+        nbytes=_index_nbytes(chunks, vectors),
+    )
 
 
-@lru_cache(maxsize=1)
-def _get_rag_graph():
-    """Return a cached compiled RAG graph built from RAG_DATA_DIR."""
-    data_dir = os.environ.get("RAG_DATA_DIR", "data")
-    return _build_rag_graph(data_dir)
+def _build_rag_graph(
+    data_dir: str, progress: Optional[Callable[[str], None]] = None
+) -> "CompiledGraph":
+    """Build a RAG generation for `data_dir` with its own caches and return its graph."""
+    answer_cache, query_cache = _new_answer_cache(), _new_query_cache()
+    generation = _build_rag_generation(
+        data_dir, progress=progress, answer_cache=answer_cache, query_cache=query_cache
+    )
+    answer_cache.set_namespace(generation.answer_namespace)
+    query_cache.set_namespace(generation.snapshot_key)
+    return generation.graph
 
 
-@tool
-def retrieve_information(
-    query: Annotated[str, "query to ask the retrieve information tool"]
-):
-    """Use Retrieval Augmented Generation to retrieve information about student loan policies"""
-    graph = _get_rag_graph()
-    result = graph.invoke({"question": query})
-    # Prefer returning the response string if available
+def _build_corpus_generation(
+    corpus: Corpus,
+    previous: Optional[_RAGGeneration],
+    progress: Optional[Callable[[str], None]],
+) -> _RAGGeneration:
+    return _build_rag_generation(
+        corpus.data_dir,
+        progress=progress,
+        previous=previous,
+        answer_cache=corpus.answer_cache,
+        query_cache=corpus.query_cache,
+    )
+
+
+# Corpus id -> data directory from RAG_CORPORA ("id=path,id=path"), or the
+# single corpus "default" at RAG_DATA_DIR. Indexes load lazily and the least
+# recently used ones are evicted beyond RAG_MEMORY_BUDGET_MB.
+_registry = CorpusRegistry(
+    corpora=lambda: parse_corpora(
+        os.environ.get("RAG_CORPORA", ""), os.environ.get("RAG_DATA_DIR", "data")
+    ),
+    build=_build_corpus_generation,
+    signatures=_data_signatures,
+    memory_budget_bytes=int(float(os.environ.get("RAG_MEMORY_BUDGET_MB", "1024")) * 2**20),
+    answer_cache_factory=_new_answer_cache,
+    query_cache_factory=_new_query_cache,
+)
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_watcher_thread: Optional[threading.Thread] = None
+
+
+def _get_rag_graph(corpus: Optional[str] = None):
+    """Return the compiled RAG graph of `corpus` (default: the first configured one).
+
+    Builds its index on first use; see `CorpusRegistry.get_graph`.
+    """
+    return _registry.get_graph(corpus)
+
+
+def reload_rag_graph(corpus: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Re-index `corpus` if its PDFs changed, then swap the new graph in.
+
+    Only added or changed PDFs are parsed and embedded; the rest is carried
+    over from the current generation. Returns the reload summary, or None if
+    nothing changed or the corpus is not loaded.
+    """
+    return _registry.reload(corpus)
+
+
+def start_warmup() -> threading.Thread:
+    """Start building the default corpus' RAG graph in a background daemon thread.
+
+    Idempotent: returns the running (or finished) warm-up thread if one was
+    already started. Build errors are reported through `rag_readiness()`.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or (
+            not _warmup_thread.is_alive()
+            and _registry.corpus().status["state"] == "failed"
+        ):
+
+            def _warm() -> None:
+                try:
+                    _get_rag_graph()
+                except Exception:
+                    pass  # recorded in the corpus status
+
+            _warmup_thread = threading.Thread(target=_warm, name="rag-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def start_data_watcher(interval: Optional[float] = None) -> Optional[threading.Thread]:
+    """Start polling the loaded corpora's data directories in a background daemon thread.
+
+    `interval` defaults to RAG_RELOAD_INTERVAL (seconds, default 10); 0
+    disables watching. Idempotent, like `start_warmup()`.
+    """
+    global _watcher_thread
+    if interval is None:
+        interval = float(os.environ.get("RAG_RELOAD_INTERVAL", "10"))
+    if interval <= 0:
+        return None
+    with _warmup_lock:
+        if _watcher_thread is None:
+            _watcher_thread = threading.Thread(
+                target=_registry.watch, args=(interval,), name="rag-watcher", daemon=True
+            )
+            _watcher_thread.start()
+        return _watcher_thread
+
+
+def rag_readiness(corpus: Optional[str] = None) -> Dict[str, Any]:
+    """Return the build status of `corpus` (default: the first configured one).
+
+    See `Corpus.readiness` for the keys.
+    """
+    return _registry.corpus(corpus).readiness()
+
+
+def corpora_stats() -> Dict[str, Any]:
+    """Return memory use and state of every configured corpus."""
+    return _registry.stats()
+
+
+def answer_cache_stats(corpus: Optional[str] = None) -> Dict[str, Any]:
+    """Return hit-rate metrics of the semantic answer cache of `corpus`."""
+    return _registry.corpus(corpus).answer_cache.stats()
+
+
+def query_cache_stats(corpus: Optional[str] = None) -> Dict[str, Any]:
+    """Return hit-rate metrics of the query embedding / retrieval cache of `corpus`."""
+    return _registry.corpus(corpus).query_cache.stats()
+
+
+def _response_text(result):
+    """Prefer returning the response string if available."""
     if isinstance(result, dict) and "response" in result:
         return result["response"]
     return result
 
 
+def _retrieve_information(
+    query: Annotated[str, "query to ask the retrieve information tool"],
+    corpus: Annotated[Optional[str], "id of the document collection to search"] = None,
+):
+    """Use Retrieval Augmented Generation to retrieve information about student loan policies"""
+    graph = _get_rag_graph(corpus)
+    return _response_text(graph.invoke({"question": query}))
+
+
+async def _aretrieve_information(
+    query: Annotated[str, "query to ask the retrieve information tool"],
+    corpus: Annotated[Optional[str], "id of the document collection to search"] = None,
+):
+    """Use Retrieval Augmented Generation to retrieve information about student loan policies"""
+    # Building (or waiting for the warm-up build) blocks, so keep it off the loop
+    graph = _registry.loaded_graph(corpus) or await asyncio.to_thread(
+        _get_rag_graph, corpus
+    )
+    return _response_text(await graph.ainvoke({"question": query}))
+
+
+def _tool_description() -> str:
+    """The tool docstring, plus the corpus ids to choose from if there are several."""
+    corpus_ids = list(parse_corpora(os.environ.get("RAG_CORPORA", ""), ""))
+    description = _retrieve_information.__doc__
+    if len(corpus_ids) > 1:
+        description += (
+            f". Available corpora: {', '.join(corpus_ids)} (default: {corpus_ids[0]})"
+        )
+    return description
+
+
+retrieve_information = StructuredTool.from_function(
+    func=_retrieve_information,
+    coroutine=_aretrieve_information,
+    name="retrieve_information",
+    description=_tool_description(),
+)
@@ -0,0 +1,184 @@
+"""Second-stage rerankers for RAG retrieval.
+
+The vector store over-fetches candidates cheaply; a reranker reorders them
+and keeps only the best few for the generator. Rerankers take the candidates
+in dense-similarity order and return at most `top_k` of them.
+
+- `BM25Reranker` (default): lexical BM25 scores with corpus-wide IDF, fused
+  with the dense ranking by reciprocal rank, so chunks that match the query
+  both semantically and by its terms rise to the top. Pure Python.
+- `CrossEncoderReranker`: a small CPU cross-encoder; needs the optional
+  `sentence-transformers` package.
+- `NoopReranker`: keeps the dense order.
+
+`get_reranker(name, documents)` builds one from a name such as
+`RAG_RERANKER`: "bm25", "cross-encoder", "cross-encoder:<model>" or "none".
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Protocol, Sequence
+
+from langchain_core.documents import Document
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _terms(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class Reranker(Protocol):
+    # True when cheap enough to run on an event loop thread
+    inline: bool
+
+    def rerank(
+        self, query: str, documents: Sequence[Document], top_k: int
+    ) -> List[Document]:
+        """Return the `top_k` most relevant of `documents` (given in dense order)."""
+        ...
+
+
+class NoopReranker:
+    """Keep the dense-similarity order."""
+
+    inline = True
+
+    def rerank(
+        self, query: str, documents: Sequence[Document], top_k: int
+    ) -> List[Document]:
+        return list(documents[:top_k])
+
+
+class BM25Reranker:
+    """BM25 over the candidates, fused with their dense rank (reciprocal rank fusion).
+
+    IDF and the average document length come from `documents`, the whole
+    corpus, when given; otherwise from the candidates of each query.
+    """
+
+    inline = True
+
+    def __init__(
+        self,
+        documents: Optional[Sequence[Document]] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        fusion_k: int = 60,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.fusion_k = fusion_k
+        self._document_frequency: Optional[Counter] = None
+        self._num_documents = 0
+        self._average_length = 0.0
+        if documents:
+            self._fit([_terms(document.page_content) for document in documents])
+
+    def _fit(self, documents_terms: List[List[str]]) -> None:
+        self._document_frequency = Counter(
+            term for terms in documents_terms for term in set(terms)
+        )
+        self._num_documents = len(documents_terms)
+        self._average_length = (
+            sum(len(terms) for terms in documents_terms) / len(documents_terms)
+        )
+
+    def _scores(self, query: str, documents_terms: List[List[str]]) -> List[float]:
+        if self._document_frequency is not None:
+            document_frequency = self._document_frequency
+            num_documents, average_length = self._num_documents, self._average_length
+        else:
+            document_frequency = Counter(
+                term for terms in documents_terms for term in set(terms)
+            )
+            num_documents = len(documents_terms)
+            average_length = sum(len(terms) for terms in documents_terms) / num_documents
+        idf: Dict[str, float] = {
+            term: math.log(
+                1 + (num_documents - document_frequency[term] + 0.5)
+                / (document_frequency[term] + 0.5)
+            )
+            for term in set(_terms(query))
+        }
+        scores = []
+        for terms in documents_terms:
+            frequencies = Counter(terms)
+            length_norm = 1 - self.b + self.b * len(terms) / (average_length or 1)
+            scores.append(
+                sum(
+                    weight * frequencies[term] * (self.k1 + 1)
+                    / (frequencies[term] + self.k1 * length_norm)
+                    for term, weight in idf.items()
+                    if frequencies[term]
+                )
+            )
+        return scores
+
+    def rerank(
+        self, query: str, documents: Sequence[Document], top_k: int
+    ) -> List[Document]:
+        if not documents:
+            return []
+        scores = self._scores(query, [_terms(document.page_content) for document in documents])
+        lexical_rank = {
+            index: rank
+            for rank, index in enumerate(
+                sorted(range(len(documents)), key=lambda index: -scores[index])
+            )
+        }
+        fused = sorted(
+            range(len(documents)),
+            key=lambda index: -(
+                1 / (self.fusion_k + index) + 1 / (self.fusion_k + lexical_rank[index])
+            ),
+        )
+        return [documents[index] for index in fused[:top_k]]
+
+
+class CrossEncoderReranker:
+    """Score (query, chunk) pairs with a sentence-transformers cross-encoder on CPU."""
+
+    inline = False
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+        self.model = _load_cross_encoder(model_name)
+
+    def rerank(
+        self, query: str, documents: Sequence[Document], top_k: int
+    ) -> List[Document]:
+        if not documents:
+            return []
+        scores = self.model.predict(
+            [(query, document.page_content) for document in documents]
+        )
+        order = sorted(range(len(documents)), key=lambda index: -float(scores[index]))
+        return [documents[index] for index in order[:top_k]]
+
+
+@lru_cache(maxsize=None)
+def _load_cross_encoder(model_name: str):
+    """Load a cross-encoder once per process; index rebuilds reuse it."""
+    try:
+        from sentence_transformers import CrossEncoder
+    except ImportError as exc:
+        raise ImportError(
+            "The cross-encoder reranker requires `pip install sentence-transformers`"
+        ) from exc
+    return CrossEncoder(model_name, device="cpu")
+
+
+def get_reranker(name: str, documents: Optional[Sequence[Document]] = None) -> Reranker:
+    """Build the reranker called `name`; `documents` is the corpus, for BM25 statistics."""
+    kind, _, option = name.strip().partition(":")
+    kind = kind.lower()
+    if kind in ("", "none"):
+        return NoopReranker()
+    if kind == "bm25":
+        return BM25Reranker(documents)
+    if kind == "cross-encoder":
+        return CrossEncoderReranker(option) if option else CrossEncoderReranker()
+    raise ValueError(f"Unknown reranker {name!r}; expected bm25, cross-encoder[:model] or none")
@@ -0,0 +1,135 @@
+"""In-process semantic cache for RAG answers.
+
+Answers are stored against the embedding of the query that produced them. A
+later query whose embedding has cosine similarity of at least `threshold` with
+a stored one (e.g. a paraphrase of the same question) is served the stored
+answer without retrieval or generation.
+
+Entries expire after `ttl_seconds`, the least recently used entry is evicted
+once `max_entries` is reached, and all entries are dropped when the namespace
+(the RAG index snapshot the answers were generated from) changes.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Small cosine-similarity index of query embeddings -> answers."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600.0,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace: Optional[str] = None
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), unit rows
+        self._answers: List[Optional[str]] = []
+        self._created_at = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._reset()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def set_namespace(self, namespace: str) -> None:
+        """Bind the cache to an index snapshot; a different one clears it."""
+        with self._lock:
+            if namespace != self.namespace:
+                if self._size:
+                    self.invalidations += 1
+                self._reset()
+                self.namespace = namespace
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _reset(self) -> None:
+        self._vectors = None
+        self._answers = [None] * self.max_entries
+        self._size = 0
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[str]:
+        """Return the cached answer for the nearest live query, or None."""
+        if not self.enabled:
+            return None
+        query = _unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            if self._size and self._vectors is not None and len(query) == self._vectors.shape[1]:
+                similarities = self._vectors[: self._size] @ query
+                expired = self._created_at[: self._size] + self.ttl_seconds < now
+                similarities[expired] = -np.inf
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self._last_used[best] = now
+                    self.hits += 1
+                    return self._answers[best]
+            self.misses += 1
+            return None
+
+    def store(
+        self, embedding: Sequence[float], answer: str, namespace: Optional[str] = None
+    ) -> None:
+        """Remember `answer` for a query embedding, evicting an expired or the LRU entry if full.
+
+        If `namespace` is given and is not the current one, the answer came
+        from a superseded index and is dropped.
+        """
+        if not self.enabled:
+            return
+        vector = _unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            if namespace is not None and namespace != self.namespace:
+                return
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._reset()
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                expired = np.flatnonzero(self._created_at + self.ttl_seconds < now)
+                if len(expired):
+                    slot = int(expired[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    self.evictions += 1
+            self._vectors[slot] = vector
+            self._answers[slot] = answer
+            self._created_at[slot] = self._last_used[slot] = now
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+def _unit(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
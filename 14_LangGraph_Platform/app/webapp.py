@@ -0,0 +1,76 @@
+"""Custom HTTP routes served next to the LangGraph Platform API.
+
+Registered through `http.app` in `langgraph.json`. The lifespan hook starts
+building the RAG graph in the background as soon as the server boots, so the
+first tool call does not pay for it, and `GET /ready` exposes the build
+progress as a readiness probe: 200 once the index is hot, 503 until then.
+It also starts watching `RAG_DATA_DIR`, so added, changed or removed PDFs are
+indexed without a restart.
+`GET /cache` reports hit-rate metrics of the semantic answer cache and of the
+query embedding / retrieval cache of each loaded corpus, and `GET /corpora`
+the memory use and state of every configured corpus. `GET /ready` and
+`GET /cache` take an optional `?corpus=<id>` to report on one corpus.
+"""
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.rag import (
+    answer_cache_stats, corpora_stats, query_cache_stats, rag_readiness,
+    start_data_watcher, start_warmup,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    """Kick off the RAG warm-up and data directory watcher when the server starts."""
+    start_warmup()
+    start_data_watcher()
+    yield
+
+
+async def ready(request: Request) -> JSONResponse:
+    """Readiness probe reporting RAG build progress and time-to-ready."""
+    try:
+        status = rag_readiness(request.query_params.get("corpus"))
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=404)
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+async def cache(request: Request) -> JSONResponse:
+    """Cache metrics (hits, misses, hit rate, occupancy) of the RAG tool, per corpus."""
+    corpus = request.query_params.get("corpus")
+    if corpus is not None:
+        corpus_ids = [corpus]
+    else:
+        corpora = corpora_stats()["corpora"]
+        corpus_ids = [corpus_id for corpus_id, entry in corpora.items() if entry["loaded"]]
+    try:
+        return JSONResponse(
+            {
+                corpus_id: {
+                    "answers": answer_cache_stats(corpus_id),
+                    "queries": query_cache_stats(corpus_id),
+                }
+                for corpus_id in corpus_ids
+            }
+        )
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=404)
+
+
+async def corpora(request: Request) -> JSONResponse:
+    """Memory budget, loads, evictions and per-corpus state of the RAG registry."""
+    return JSONResponse(corpora_stats())
+
+
+app = Starlette(
+    routes=[Route("/ready", ready), Route("/cache", cache), Route("/corpora", corpora)],
+    lifespan=lifespan,
+)
@@ -0,0 +1,104 @@
+"""Micro-benchmark of per-turn overhead in the app.graphs agents.
+
+Compares an agent turn that rebuilds its tool belt and tool-bound model (a
+new ChatOpenAI client, new Tavily/Arxiv tools and a bind_tools schema
+conversion, which is what call_model used to do) with one that reuses the
+bound model built once per compiled graph. Model calls go to a fake chat
+model, so the timings contain only client construction, tool schema
+serialization and LangChain / LangGraph overhead, and no network calls.
+
+Usage:
+    python bench_agent_turn.py [--iterations N]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ.setdefault("TAVILY_API_KEY", "tvly-fake")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import END, StateGraph
+
+from app.graphs import agent_with_helpfulness, simple_agent
+from app.models import get_chat_model
+from app.state import AgentState
+from app.tools import get_tool_belt
+
+QUESTION = {"messages": [("human", "What is the maximum Pell Grant award?")]}
+
+
+class FakeToolChatModel(FakeListChatModel):
+    """Fake chat model that serializes bound tool schemas like ChatOpenAI does."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+
+def fake_chat_model(model_name=None, *, temperature=0):
+    return FakeToolChatModel(responses=["Y"])
+
+
+def per_call_us(fn, iterations, repeat=5):
+    """Best-of-`repeat` mean time per call, after one warm-up call."""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def rebuilding_graph(answering_model):
+    """simple_agent as it was: a ChatOpenAI client bound to a new tool belt on
+    every turn. The client is discarded and `answering_model` replies instead."""
+
+    def call_model(state):
+        get_chat_model().bind_tools(get_tool_belt())
+        return {"messages": [answering_model.invoke(state["messages"])]}
+
+    graph = StateGraph(AgentState)
+    graph.add_node("agent", call_model)
+    graph.set_entry_point("agent")
+    graph.add_edge("agent", END)
+    return graph.compile()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    messages = QUESTION["messages"]
+    bound = fake_chat_model().bind_tools(get_tool_belt())
+    rows = [
+        ("get_tool_belt()", per_call_us(get_tool_belt, args.iterations)),
+        ("ChatOpenAI + bind_tools",
+         per_call_us(lambda: get_chat_model().bind_tools(get_tool_belt()), args.iterations)),
+        ("fake invoke, prebuilt", per_call_us(lambda: bound.invoke(messages), args.iterations)),
+    ]
+
+    # The graphs pick up the fake model through app.models.get_chat_model
+    simple_agent.get_chat_model = fake_chat_model
+    agent_with_helpfulness.get_chat_model = fake_chat_model
+    per_turn = rebuilding_graph(bound)
+    once = simple_agent.build_graph().compile()
+    helpful = agent_with_helpfulness.build_graph().compile()
+    rows += [
+        ("simple_agent turn, rebuilt",
+         per_call_us(lambda: per_turn.invoke(QUESTION), args.iterations)),
+        ("simple_agent turn, prebuilt",
+         per_call_us(lambda: once.invoke(QUESTION), args.iterations)),
+        ("agent_with_helpfulness run",
+         per_call_us(lambda: helpful.invoke(QUESTION), args.iterations)),
+    ]
+    print(f"{'path':<30} {'us/call':>10}")
+    for name, micros in rows:
+        print(f"{name:<30} {micros:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark for the token-length functions used while ingesting PDFs in app.rag.
+
+Splits the PDFs under the data directory with RecursiveCharacterTextSplitter
+(750 tokens, no overlap, as in app.rag) using:
+- legacy: `tiktoken.encoding_for_model("gpt-4o")` looked up on every call
+- cached: app.rag._tiktoken_len (cached encoder, memoized lengths)
+and then token-counts all resulting chunks one by one versus in a single
+threaded `encode_batch` call (app.rag._tiktoken_lens).
+
+Usage:
+    python bench_ingest.py [--data-dir DIR] [--repeat N]
+"""
+import argparse
+import os
+import time
+
+import tiktoken
+from langchain_community.document_loaders import DirectoryLoader, PyMuPDFLoader
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.rag import _get_encoding, _tiktoken_len, _tiktoken_lens
+
+
+def legacy_tiktoken_len(text):
+    return len(tiktoken.encoding_for_model("gpt-4o").encode_ordinary(text))
+
+
+def best_of(repeat, fn, setup=lambda: None):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=os.environ.get("RAG_DATA_DIR", "data"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    documents = DirectoryLoader(
+        args.data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
+    ).load()
+    load_seconds = time.perf_counter() - start
+    if not documents:
+        raise SystemExit(f"No PDFs found under {args.data_dir!r}")
+    print(f"Loaded {len(documents)} pages from {args.data_dir} in {load_seconds:.2f}s")
+
+    def split_with(length_function):
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=750, chunk_overlap=0, length_function=length_function
+        )
+        return splitter.split_documents(documents)
+
+    legacy_s, legacy_chunks = best_of(args.repeat, lambda: split_with(legacy_tiktoken_len))
+    cached_s, cached_chunks = best_of(
+        args.repeat, lambda: split_with(_tiktoken_len), setup=_tiktoken_len.cache_clear
+    )
+    if [c.page_content for c in legacy_chunks] != [c.page_content for c in cached_chunks]:
+        raise SystemExit("cached token lengths changed the chunks")
+
+    texts = [chunk.page_content for chunk in cached_chunks]
+    encoding = _get_encoding()
+    single_s, single_lens = best_of(
+        args.repeat, lambda: [len(encoding.encode_ordinary(text)) for text in texts]
+    )
+    batch_s, batch_lens = best_of(args.repeat, lambda: _tiktoken_lens(texts))
+    if single_lens != batch_lens:
+        raise SystemExit("batched token counts differ from one-by-one counts")
+
+    print(f"{'step':<28} {'before s':>9} {'after s':>9} {'speedup':>8}")
+    print(f"{'split (' + str(len(texts)) + ' chunks)':<28} {legacy_s:>9.3f} {cached_s:>9.3f} {legacy_s / cached_s:>7.1f}x")
+    print(f"{'count chunk tokens':<28} {single_s:>9.3f} {batch_s:>9.3f} {single_s / batch_s:>7.1f}x")
+    before = load_seconds + legacy_s
+    after = load_seconds + cached_s
+    print(f"{'load + split':<28} {before:>9.3f} {after:>9.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Micro-benchmark of per-invocation framework overhead in the app.rag graph.
+
+Builds the RAG graph against a synthetic index snapshot with deterministic
+fake embeddings and a fake chat model, so the timings contain only
+LangChain / LangGraph / Qdrant overhead and no network calls. The answer and
+query caches are disabled so every invocation takes the full
+lookup -> retrieve -> generate -> remember path. Also compares invoking a
+prebuilt generator chain with composing it on every call, which is what the
+generate node used to do.
+
+Usage:
+    python bench_rag_overhead.py [--iterations N] [--chunks N]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+os.environ["RAG_ANSWER_CACHE_SIZE"] = "0"
+os.environ["RAG_QUERY_CACHE_SIZE"] = "0"
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app import rag, rag_snapshot
+
+EMBEDDING_SIZE = 1536
+WORDS = ["loan", "grant", "student", "aid", "federal", "eligibility", "award",
+         "repayment", "interest", "subsidized", "institution", "enrollment"]
+
+
+def fake_chat_model(model=None):
+    return FakeListChatModel(responses=["The maximum Pell Grant depends on the award year."])
+
+
+def seed_snapshot(data_dir, num_chunks):
+    """Write a synthetic snapshot under RAG_INDEX_DIR so _build_rag_graph loads it instead of PDFs."""
+    rng = random.Random(0)
+    chunks = [
+        Document(
+            page_content=" ".join(rng.choice(WORDS) for _ in range(120)),
+            metadata={"source": f"synthetic_{i // 20}.pdf", "page": i % 20},
+        )
+        for i in range(num_chunks)
+    ]
+    embedding = DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    vectors = np.asarray(
+        embedding.embed_documents([chunk.page_content for chunk in chunks]),
+        dtype=np.float32,
+    )
+    key = rag_snapshot.snapshot_key(data_dir, {}, "text-embedding-3-small", 750)
+    rag_snapshot.save_snapshot(
+        os.path.join(rag_snapshot.snapshot_root(data_dir), key), chunks, vectors
+    )
+
+
+def per_call_us(fn, iterations, repeat=5):
+    """Best-of-`repeat` mean time per call, after one warm-up call."""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+async def per_call_us_async(fn, iterations, repeat=5):
+    await fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--chunks", type=int, default=500)
+    args = parser.parse_args()
+
+    rag.OpenAIEmbeddings = lambda model: DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+    rag.ChatOpenAI = fake_chat_model
+
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as index_dir:
+        os.environ["RAG_INDEX_DIR"] = index_dir
+        seed_snapshot(data_dir, args.chunks)
+        start = time.perf_counter()
+        graph = rag._build_rag_graph(data_dir)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+    question = {"question": "What is the maximum Pell Grant award?"}
+    chat_prompt = ChatPromptTemplate.from_messages([("human", "{context}\n\n{query}")])
+    llm = fake_chat_model()
+    prebuilt = chat_prompt | llm | StrOutputParser()
+    chain_input = {"context": "Pell Grants are need-based.", "query": question["question"]}
+
+    rows = [
+        ("chain: compose only",
+         per_call_us(lambda: chat_prompt | llm | StrOutputParser(), args.iterations)),
+        ("chain: composed per call",
+         per_call_us(lambda: (chat_prompt | llm | StrOutputParser()).invoke(chain_input), args.iterations)),
+        ("chain: prebuilt", per_call_us(lambda: prebuilt.invoke(chain_input), args.iterations)),
+        ("graph.invoke", per_call_us(lambda: graph.invoke(question), args.iterations)),
+        ("graph.ainvoke",
+         asyncio.run(per_call_us_async(lambda: graph.ainvoke(question), args.iterations))),
+    ]
+    print(f"Graph built from a {args.chunks}-chunk snapshot in {build_ms:.1f} ms")
+    print(f"{'path':<28} {'us/call':>10}")
+    for name, micros in rows:
+        print(f"{name:<28} {micros:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
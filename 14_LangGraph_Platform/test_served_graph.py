@@ -1,5 +1,10 @@
+import sys
+import time
+
 from langgraph_sdk import get_sync_client
 
+RAG_STREAM_TAG = "rag_answer"  # app.rag.RAG_STREAM_TAG
+
 
 def main():
     client = get_sync_client(url="http://localhost:2024")
@@ -21,5 +26,44 @@ def main():
         print("\n\n")
 
 
+def stream_tokens():
+    """Print LLM tokens as they are generated, including those of the RAG tool.
+
+    `stream_subgraphs=True` is needed for tokens produced inside the
+    retrieve_information tool; those carry RAG_STREAM_TAG in their metadata.
+    """
+    client = get_sync_client(url="http://localhost:2024")
+    start = time.perf_counter()
+    first_token_at = None
+    for chunk in client.runs.stream(
+        None,
+        "simple_agent",
+        input={
+            "messages": [
+                {
+                    "role": "human",
+                    "content": "What is the maximum Pell Grant award?",
+                }
+            ]
+        },
+        stream_mode="messages-tuple",
+        stream_subgraphs=True,
+    ):
+        if not chunk.event.startswith("messages"):
+            continue
+        message, metadata = chunk.data
+        if message.get("type") != "AIMessageChunk" or not message.get("content"):
+            continue
+        if first_token_at is None:
+            first_token_at = time.perf_counter() - start
+        source = "rag" if RAG_STREAM_TAG in metadata.get("tags", []) else "agent"
+        print(f"[{source}] {message['content']}", flush=True)
+    if first_token_at is not None:
+        print(f"\nTime to first token: {first_token_at:.2f}s")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if sys.argv[1:] == ["tokens"]:
+        stream_tokens()
+    else:
+        main()
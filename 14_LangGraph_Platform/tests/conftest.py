@@ -0,0 +1,83 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+import tiktoken
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Tests import the lesson's `app` package, not an installed copy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PDF_PAGES = {
+    "muonclip.pdf": [
+        "MuonClip is the optimizer used to train Kimi K2. It clips attention logits.",
+        "QK-clip rescales query and key weights when attention logits grow too large.",
+    ],
+    "loans.pdf": [
+        "Federal student loans accrue interest from the day they are disbursed.",
+    ],
+}
+
+
+def write_pdf(path, pages):
+    import pymupdf
+
+    document = pymupdf.open()
+    for text in pages:
+        document.new_page().insert_textbox(pymupdf.Rect(72, 72, 540, 720), text)
+    document.save(str(path))
+    document.close()
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic fake embeddings that count the documents they embed."""
+
+    embedded: int = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch):
+    """Offline stand-in for the gpt-4o encoding: one token per UTF-8 byte."""
+    from app import rag
+
+    encoding = tiktoken.Encoding(
+        "test_bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={"<|endoftext|>": 256},
+    )
+    monkeypatch.setattr(rag, "_get_encoding", lambda: encoding)
+    rag._tiktoken_len.cache_clear()
+    yield encoding
+    rag._tiktoken_len.cache_clear()
+
+
+@pytest.fixture
+def pdf_dir(tmp_path):
+    """A data directory with the PDFs of PDF_PAGES."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name, pages in PDF_PAGES.items():
+        write_pdf(data_dir / name, pages)
+    return data_dir
+
+
+@pytest.fixture
+def offline_rag(monkeypatch, tmp_path, byte_encoding):
+    """app.rag with fake embeddings and chat model, indexing into a temporary RAG_INDEX_DIR."""
+    from app import rag
+
+    embeddings = CountingEmbeddings(size=16)
+    monkeypatch.setenv("RAG_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("RAG_INGEST_WORKERS", "1")
+    monkeypatch.setattr(rag, "OpenAIEmbeddings", lambda model: embeddings)
+    monkeypatch.setattr(
+        rag, "ChatOpenAI", lambda model: FakeListChatModel(responses=["fake answer"])
+    )
+    return SimpleNamespace(rag=rag, embeddings=embeddings, index_dir=tmp_path / "index")
@@ -0,0 +1,192 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.corpus_registry import DEFAULT_CORPUS, CorpusRegistry, parse_corpora
+from app.query_cache import QueryCache
+from app.semantic_cache import SemanticAnswerCache
+
+
+class FakeIndex:
+    """Stands in for app.rag: builds generations and fingerprints data dirs."""
+
+    def __init__(self, corpora, nbytes=100):
+        self.corpora = corpora
+        self.nbytes = nbytes
+        self.files = {data_dir: 1 for data_dir in corpora.values()}
+        self.builds = []
+        self.fail_next = False
+        self.gate = None
+
+    def build(self, corpus, previous, progress):
+        self.builds.append((corpus.corpus_id, previous))
+        if progress is not None:
+            progress("loading")
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("embeddings unavailable")
+        version = self.files[corpus.data_dir]
+        key = f"{corpus.corpus_id}-v{version}"
+        if progress is not None:
+            progress("indexed")
+        return SimpleNamespace(
+            graph=f"graph:{key}",
+            signatures={"version": version},
+            snapshot_key=key,
+            answer_namespace=key,
+            stats={"changed_files": 1},
+            nbytes=self.nbytes,
+        )
+
+    def signatures(self, data_dir):
+        return {"version": self.files[data_dir]}
+
+    def registry(self, memory_budget_bytes=0):
+        return CorpusRegistry(
+            corpora=lambda: dict(self.corpora),
+            build=self.build,
+            signatures=self.signatures,
+            memory_budget_bytes=memory_budget_bytes,
+            answer_cache_factory=SemanticAnswerCache,
+            query_cache_factory=QueryCache,
+        )
+
+
+def test_parse_corpora():
+    assert parse_corpora("", "data") == {DEFAULT_CORPUS: "data"}
+    assert parse_corpora(" papers = data/papers, , loans=data/loans ", "data") == {
+        "papers": "data/papers",
+        "loans": "data/loans",
+    }
+    for spec in ("papers", "=data", "papers="):
+        with pytest.raises(ValueError):
+            parse_corpora(spec, "data")
+
+
+def test_first_configured_corpus_is_default_and_unknown_ids_fail():
+    index = FakeIndex({"papers": "data/papers", "loans": "data/loans"})
+    registry = index.registry()
+    assert registry.ids() == ["papers", "loans"]
+    assert registry.get_graph() == "graph:papers-v1"
+    with pytest.raises(ValueError, match="Unknown corpus"):
+        registry.get_graph("nope")
+
+
+def test_concurrent_first_use_builds_once():
+    index = FakeIndex({"papers": "data/papers"})
+    index.gate = threading.Event()
+    registry = index.registry()
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get_graph("papers")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    index.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["graph:papers-v1"] * 8
+    assert len(index.builds) == 1
+    assert registry.loads == 1
+    readiness = registry.corpus("papers").readiness()
+    assert readiness["ready"] and readiness["generation"] == 1
+    assert [stage["stage"] for stage in readiness["stages"]] == ["loading", "indexed"]
+
+
+def test_failed_build_is_recorded_and_retried():
+    index = FakeIndex({"papers": "data/papers"})
+    index.fail_next = True
+    registry = index.registry()
+    with pytest.raises(RuntimeError):
+        registry.get_graph()
+    readiness = registry.corpus().readiness()
+    assert readiness["state"] == "failed" and not readiness["ready"]
+    assert "embeddings unavailable" in readiness["error"]
+
+    assert registry.get_graph() == "graph:papers-v1"
+    assert registry.corpus().readiness()["error"] is None
+
+
+def test_least_recently_used_corpus_is_evicted_over_budget():
+    index = FakeIndex({"a": "data/a", "b": "data/b", "c": "data/c"}, nbytes=100)
+    registry = index.registry(memory_budget_bytes=250)
+    registry.get_graph("a")
+    registry.get_graph("b")
+    registry.loaded_graph("a")  # "b" is now least recently used
+    registry.get_graph("c")
+
+    assert registry.loaded_graph("b") is None
+    assert registry.corpus("b").status["state"] == "evicted"
+    assert registry.corpus("b").readiness()["ready"]
+    stats = registry.stats()
+    assert stats["loaded_bytes"] == 200 and stats["evictions"] == 1
+
+    # The evicted corpus is rebuilt on its next use
+    assert registry.get_graph("b") == "graph:b-v1"
+    assert registry.loads == 4
+    assert registry.loaded_graph("a") is None
+
+
+def test_corpus_in_use_is_kept_even_alone_over_budget():
+    index = FakeIndex({"a": "data/a"}, nbytes=500)
+    registry = index.registry(memory_budget_bytes=100)
+    assert registry.get_graph("a") == "graph:a-v1"
+    assert registry.loaded_graph("a") == "graph:a-v1"
+    assert registry.evictions == 0
+
+
+def test_reload_swaps_in_new_generation_only_on_change():
+    index = FakeIndex({"papers": "data/papers"})
+    registry = index.registry()
+    assert registry.reload() is None  # not loaded yet
+    first = registry.get_graph()
+    corpus = registry.corpus()
+    corpus.query_cache.put_embedding("query", [1.0])
+    assert registry.reload() is None
+
+    index.files["data/papers"] = 2
+    summary = registry.reload()
+    assert summary["generation"] == 2 and summary["changed_files"] == 1
+    assert index.builds[-1][1].graph == first  # built from the previous generation
+    assert registry.get_graph() == "graph:papers-v2"
+    assert corpus.status["last_reload"] == summary
+    assert corpus.query_cache.get_embedding("query") is None
+    assert corpus.answer_cache.namespace == "papers-v2"
+
+
+def test_busy_corpus_is_skipped_by_eviction():
+    index = FakeIndex({"a": "data/a", "b": "data/b", "c": "data/c"}, nbytes=100)
+    registry = index.registry(memory_budget_bytes=250)
+    registry.get_graph("a")
+    registry.get_graph("b")
+    registry.loaded_graph("b")  # "a" is now least recently used
+
+    # "a" is in the middle of a reload, which holds its lock
+    busy = registry.corpus("a")
+    with busy.lock:
+        registry.get_graph("c")
+        assert registry.loaded_graph("a") == "graph:a-v1"
+        assert registry.loaded_graph("b") is None  # evicted in its place
+    assert registry.evictions == 1
+
+
+def test_busy_corpus_is_evicted_once_free():
+    index = FakeIndex({"a": "data/a", "b": "data/b"}, nbytes=100)
+    registry = index.registry(memory_budget_bytes=150)
+    registry.get_graph("a")
+    with registry.corpus("a").lock:
+        registry.get_graph("b")
+        assert registry.stats()["loaded_bytes"] == 200  # nothing else to evict
+    # The next build or reload enforces the budget again
+    index.files["data/b"] = 2
+    registry.reload("b")
+    assert registry.loaded_graph("a") is None
+    assert registry.stats()["loaded_bytes"] == 100
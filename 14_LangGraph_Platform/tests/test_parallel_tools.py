@@ -0,0 +1,192 @@
+import asyncio
+import os
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool, tool
+
+from app import parallel_tools
+from app.parallel_tools import ToolPool, _has_native_async, build_tool_node
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+A2A_COPY = os.path.join(APP_DIR, "..", "15_A2A_LangGraph", "app", "parallel_tools.py")
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A private tool pool per test, so abandoned threads do not leak between tests."""
+
+    def install(workers=4, max_abandoned=4):
+        new_pool = ToolPool(workers=workers, max_abandoned=max_abandoned)
+        monkeypatch.setattr(parallel_tools, "_pool", new_pool)
+        return new_pool
+
+    return install
+
+
+def calls_state(*names, q="x"):
+    calls = [
+        {"name": name, "args": {"q": q}, "id": f"call-{i}", "type": "tool_call"}
+        for i, name in enumerate(names)
+    ]
+    return {"messages": [AIMessage(content="", tool_calls=calls)]}
+
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+@tool
+def sleepy(q: str) -> str:
+    """Sleeps 0.2s."""
+    time.sleep(0.2)
+    return f"sync {q}"
+
+
+@tool
+async def asleep(q: str) -> str:
+    """Awaits 0.2s."""
+    await asyncio.sleep(0.2)
+    return f"async {q}"
+
+
+@tool
+def hangs(q: str) -> str:
+    """Sleeps longer than any test timeout."""
+    time.sleep(0.6)
+    return "late"
+
+
+@tool
+def quick(q: str) -> str:
+    """Returns at once."""
+    return f"quick {q}"
+
+
+@tool
+def boom(q: str) -> str:
+    """Raises."""
+    raise RuntimeError("kaput")
+
+
+def wait_for_abandoned(pool, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while pool.stats()["abandoned"] != count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return pool.stats()["abandoned"]
+
+
+def test_sync_calls_run_concurrently_in_call_order(pool):
+    pool()
+    node = build_tool_node([sleepy, quick], timeout=5)
+    out, seconds = timed(lambda: node.invoke(calls_state("sleepy", "sleepy", "quick", "sleepy")))
+    assert seconds < 0.5  # 0.6s if run one after another
+    messages = out["messages"]
+    assert [m.tool_call_id for m in messages] == ["call-0", "call-1", "call-2", "call-3"]
+    assert [m.content for m in messages] == ["sync x", "sync x", "quick x", "sync x"]
+    for message in messages:
+        assert message.response_metadata["timed_out"] is False
+        assert message.response_metadata["latency_ms"] >= 0
+    assert messages[0].response_metadata["latency_ms"] >= 190
+
+
+def test_async_path_mixes_native_and_pooled_tools(pool):
+    pool()
+    node = build_tool_node([sleepy, asleep], timeout=5)
+    state = calls_state("asleep", "sleepy", "asleep", "sleepy")
+    out, seconds = timed(lambda: asyncio.run(node.ainvoke(state)))
+    assert seconds < 0.5
+    assert [m.content for m in out["messages"]] == ["async x", "sync x", "async x", "sync x"]
+
+
+def test_errors_become_tool_messages(pool):
+    pool()
+    node = build_tool_node([boom, quick], timeout=5)
+    for run in (node.invoke, lambda state: asyncio.run(node.ainvoke(state))):
+        messages = run(calls_state("boom", "nope", "quick"))["messages"]
+        assert [m.status for m in messages] == ["error", "error", "success"]
+        assert "kaput" in messages[0].content
+        assert "nope is not a valid tool" in messages[1].content
+
+
+@pytest.mark.parametrize("path", ["sync", "async"])
+def test_timeout_returns_early_and_frees_the_slot(pool, path):
+    tool_pool = pool(workers=1, max_abandoned=2)
+    node = build_tool_node([hangs, quick, asleep], timeout=5, timeouts={"hangs": 0.1})
+    run = node.invoke if path == "sync" else lambda state: asyncio.run(node.ainvoke(state))
+
+    out, seconds = timed(lambda: run(calls_state("hangs")))
+    message = out["messages"][0]
+    assert seconds < 0.4
+    assert message.status == "error" and "timed out after 0.1s" in message.content
+    assert message.response_metadata["timed_out"] is True
+    assert tool_pool.stats()["abandoned"] == 1
+
+    # The only worker slot was given back, so the next turn runs at once
+    out, seconds = timed(lambda: run(calls_state("quick")))
+    assert out["messages"][0].content == "quick x"
+    assert seconds < 0.2
+    assert wait_for_abandoned(tool_pool, 0) == 0
+
+
+def test_native_coroutines_are_cancelled_on_timeout(pool):
+    pool()
+    node = build_tool_node([asleep], timeouts={"asleep": 0.05})
+    message = asyncio.run(node.ainvoke(calls_state("asleep")))["messages"][0]
+    assert message.status == "error"
+    assert message.response_metadata["timed_out"] is True
+
+
+def test_timeout_counts_from_start_not_from_queueing(pool):
+    pool(workers=1)
+    node = build_tool_node([sleepy], timeout=0.35)
+    # The second call waits 0.2s for the only worker, then runs for 0.2s
+    out, seconds = timed(lambda: node.invoke(calls_state("sleepy", "sleepy")))
+    assert [m.content for m in out["messages"]] == ["sync x", "sync x"]
+    assert seconds >= 0.4
+
+
+def test_too_many_abandoned_calls_fail_fast(pool):
+    tool_pool = pool(workers=2, max_abandoned=1)
+    node = build_tool_node([hangs, quick], timeout=5, timeouts={"hangs": 0.05})
+    node.invoke(calls_state("hangs"))
+    assert tool_pool.stats()["abandoned"] == 1
+
+    message = node.invoke(calls_state("quick"))["messages"][0]
+    assert message.status == "error"
+    assert "ToolPoolExhaustedError" in message.content
+
+    assert wait_for_abandoned(tool_pool, 0) == 0
+    assert node.invoke(calls_state("quick"))["messages"][0].content == "quick x"
+
+
+def test_native_async_detection_and_coroutine_only_tools(pool):
+    pool()
+
+    async def shout(q: str) -> str:
+        return q.upper()
+
+    coroutine_only = StructuredTool.from_function(coroutine=shout, name="shout", description="Shouts.")
+    both = StructuredTool.from_function(
+        func=lambda q: q, coroutine=shout, name="echo", description="Echoes."
+    )
+    assert _has_native_async(asleep) and _has_native_async(coroutine_only) and _has_native_async(both)
+    assert not _has_native_async(sleepy)
+
+    # The sync path runs coroutine-only tools on an event loop of their own
+    node = build_tool_node([coroutine_only], timeout=5)
+    assert node.invoke(calls_state("shout"))["messages"][0].content == "X"
+
+
+def test_a2a_copy_mirrors_the_canonical_module():
+    def without_note(path):
+        with open(path, encoding="utf-8") as f:
+            docstring, body = f.read().split('\n"""\n', 1)
+        # The last docstring paragraph says which copy this is
+        return docstring.rsplit("\n\n", 1)[0], body
+
+    canonical = os.path.join(APP_DIR, "app", "parallel_tools.py")
+    assert without_note(A2A_COPY) == without_note(canonical)
@@ -0,0 +1,67 @@
+from langchain_core.documents import Document
+
+from app.query_cache import QueryCache, normalize_query
+
+
+def test_normalize_query_ignores_case_spacing_and_punctuation():
+    assert normalize_query("  What is   MuonClip?  ") == "what is muonclip"
+    assert normalize_query("WHAT IS MUONCLIP.") == normalize_query("what is muonclip")
+    assert normalize_query("what is muonclip") != normalize_query("what is muon clip")
+
+
+def test_repeat_queries_hit_embedding_and_documents():
+    cache = QueryCache()
+    documents = [Document(page_content="MuonClip is an optimizer.")]
+    cache.put_embedding("What is MuonClip?", [0.1, 0.2])
+    cache.put_documents("What is MuonClip?", documents)
+
+    assert cache.get_embedding("what is muonclip") == [0.1, 0.2]
+    cached = cache.get_documents("WHAT IS MUONCLIP?!")
+    assert cached == documents
+    # Callers get their own list
+    cached.append(Document(page_content="extra"))
+    assert cache.get_documents("what is muonclip") == documents
+
+    assert cache.get_documents("what is kimi") is None
+    stats = cache.stats()
+    assert stats["embedding"] == {"hits": 1, "misses": 0, "hit_rate": 1.0}
+    assert stats["documents"] == {"hits": 2, "misses": 1, "hit_rate": 0.6667}
+
+
+def test_fields_are_cached_independently():
+    cache = QueryCache()
+    cache.put_embedding("query", [1.0])
+    assert cache.get_documents("query") is None
+    assert cache.get_embedding("query") == [1.0]
+
+
+def test_evicts_least_recently_used_query():
+    cache = QueryCache(max_entries=2)
+    cache.put_embedding("a", [1.0])
+    cache.put_embedding("b", [2.0])
+    assert cache.get_embedding("a") == [1.0]  # "b" is now least recently used
+    cache.put_embedding("c", [3.0])
+    assert cache.get_embedding("b") is None
+    assert cache.get_embedding("a") == [1.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_new_namespace_invalidates_and_drops_stale_results():
+    cache = QueryCache()
+    cache.set_namespace("snapshot-1")
+    cache.put_documents("query", [Document(page_content="old")])
+
+    cache.set_namespace("snapshot-2")
+    assert cache.get_documents("query") is None
+    cache.put_documents("query", [Document(page_content="stale")], namespace="snapshot-1")
+    assert cache.get_documents("query") is None
+    cache.put_documents("query", [Document(page_content="new")], namespace="snapshot-2")
+    assert cache.get_documents("query")[0].page_content == "new"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_disabled_with_zero_entries():
+    cache = QueryCache(max_entries=0)
+    cache.put_embedding("query", [1.0])
+    assert cache.get_embedding("query") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,39 @@
+import asyncio
+
+from langchain_community.vectorstores import Qdrant
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+
+def test_async_retrieval_searches_inline(offline_rag, pdf_dir, monkeypatch):
+    graph = offline_rag.rag._build_rag_graph(str(pdf_dir))
+
+    async def executor_backed_search(*args, **kwargs):
+        raise AssertionError("in-memory search must not go through the executor fallback")
+
+    monkeypatch.setattr(Qdrant, "asimilarity_search_by_vector", executor_backed_search)
+    result = asyncio.run(graph.ainvoke({"question": "What is MuonClip?"}))
+    assert result["response"] == "fake answer"
+    assert result["context"]
+    assert {doc.metadata["source"] for doc in result["context"]} <= {
+        str(path) for path in pdf_dir.iterdir()
+    }
+
+
+def test_generate_reuses_the_chain_composed_at_build(offline_rag, pdf_dir, monkeypatch):
+    rag = offline_rag.rag
+    chat_models = []
+    monkeypatch.setattr(
+        rag, "ChatOpenAI", lambda model: chat_models.append(model) or FakeListChatModel(responses=["ok"])
+    )
+    graph = rag._build_rag_graph(str(pdf_dir))
+    assert len(chat_models) == 1
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("the generator chain was composed again")
+
+    monkeypatch.setattr(rag, "StrOutputParser", no_rebuild)
+    monkeypatch.setattr(rag.ChatPromptTemplate, "from_messages", no_rebuild)
+    monkeypatch.setattr(rag, "ChatOpenAI", no_rebuild)
+    assert graph.invoke({"question": "What is MuonClip?"})["response"] == "ok"
+    result = asyncio.run(graph.ainvoke({"question": "Do loans accrue interest?"}))
+    assert result["response"] == "ok"
@@ -0,0 +1,79 @@
+import logging
+import os
+
+import pytest
+
+from app import rag
+from app.corpus_registry import Corpus
+from app.query_cache import QueryCache
+from app.semantic_cache import SemanticAnswerCache
+
+
+@pytest.fixture
+def broken_pdf(pdf_dir):
+    path = pdf_dir / "broken.pdf"
+    path.write_bytes(b"%PDF-1.7\nthis is not a PDF body")
+    return str(path)
+
+
+def test_unreadable_pdf_is_logged_and_reported(offline_rag, pdf_dir, broken_pdf, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.rag"):
+        generation = rag._build_rag_generation(str(pdf_dir))
+
+    assert list(generation.stats["failed_files"]) == [broken_pdf]
+    assert generation.stats["failed_files"][broken_pdf]
+    assert any(broken_pdf in record.getMessage() for record in caplog.records)
+    loans = generation.files[str(pdf_dir / "loans.pdf")]
+    assert loans.chunks and loans.error is None
+
+    corpus = Corpus("default", str(pdf_dir), SemanticAnswerCache(), QueryCache())
+    corpus.activate(generation)
+    assert list(corpus.readiness()["failed_files"]) == [broken_pdf]
+
+
+def test_failures_survive_reloads_and_snapshot_loads(offline_rag, pdf_dir, broken_pdf, tmp_path):
+    first = rag._build_rag_generation(str(pdf_dir))
+    embedded = offline_rag.embeddings.embedded
+
+    # An unrelated change reuses the failed entry instead of parsing it again
+    os.replace(pdf_dir / "loans.pdf", tmp_path / "loans.pdf")
+    reloaded = rag._build_rag_generation(str(pdf_dir), previous=first)
+    assert reloaded.stats["embedded_files"] == 0
+    assert reloaded.stats["failed_files"] == first.stats["failed_files"]
+
+    # A cold start from the first snapshot still knows which file failed
+    os.replace(tmp_path / "loans.pdf", pdf_dir / "loans.pdf")
+    cold = rag._build_rag_generation(str(pdf_dir))
+    assert offline_rag.embeddings.embedded == embedded
+    assert cold.stats["failed_files"] == first.stats["failed_files"]
+
+
+def test_worker_processes_parse_pdfs(pdf_dir, broken_pdf):
+    paths = sorted(str(path) for path in pdf_dir.iterdir())
+    results = {
+        path: (len(pages), error)
+        for path, pages, error in rag._iter_pdf_pages(paths, max_workers=2)
+    }
+    assert results[str(pdf_dir / "muonclip.pdf")] == (2, None)
+    assert results[str(pdf_dir / "loans.pdf")] == (1, None)
+    pages, error = results[broken_pdf]
+    assert pages == 0 and error
+
+
+def test_worker_processes_are_spawned(monkeypatch, tmp_path):
+    contexts = []
+
+    class RecordingPool:
+        def __init__(self, max_workers, mp_context):
+            contexts.append((max_workers, mp_context.get_start_method()))
+            raise OSError("no worker processes here")
+
+    monkeypatch.setattr(rag, "ProcessPoolExecutor", RecordingPool)
+    paths = [str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf"), str(tmp_path / "c.pdf")]
+    assert [path for path, _, _ in rag._iter_pdf_pages(paths, max_workers=2)] == paths
+    assert contexts == [(2, "spawn")]
+
+    # A single worker or file is parsed in-process, without starting a pool
+    list(rag._iter_pdf_pages(paths, max_workers=1))
+    list(rag._iter_pdf_pages(paths[:1], max_workers=4))
+    assert len(contexts) == 1
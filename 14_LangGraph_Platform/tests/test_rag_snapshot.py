@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from app import rag_snapshot
+from app.rag_snapshot import (
+    file_digest,
+    load_snapshot,
+    prune_snapshots,
+    save_snapshot,
+    snapshot_key,
+    snapshot_root,
+)
+from conftest import write_pdf
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COPIES = [
+    os.path.join(APP_DIR, "..", "15_A2A_LangGraph", "app", "rag_snapshot.py"),
+    os.path.join(
+        APP_DIR, "..", "17_Deploying_Open_Source_Endpoints", "14_LangGraph_Platform",
+        "app", "rag_snapshot.py",
+    ),
+]
+
+
+def chunks_and_vectors(n=3):
+    chunks = [
+        Document(page_content=f"chunk {i}", metadata={"source": "a.pdf", "page": i})
+        for i in range(n)
+    ]
+    return chunks, np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+
+
+def test_round_trip(tmp_path):
+    chunks, vectors = chunks_and_vectors()
+    save_snapshot(str(tmp_path / "key"), chunks, vectors)
+
+    loaded_chunks, loaded_vectors = load_snapshot(str(tmp_path / "key"))
+    assert loaded_chunks == chunks
+    np.testing.assert_array_equal(loaded_vectors, vectors)
+    assert loaded_vectors.dtype == np.float32
+    assert sorted(os.listdir(tmp_path)) == ["key"]  # no temporary directory left behind
+
+
+def test_missing_or_inconsistent_snapshot_is_ignored(tmp_path):
+    assert load_snapshot(str(tmp_path / "absent")) is None
+
+    chunks, vectors = chunks_and_vectors()
+    save_snapshot(str(tmp_path / "key"), chunks, vectors[:2])
+    assert load_snapshot(str(tmp_path / "key")) is None
+
+
+def test_key_changes_with_contents_and_settings(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    pdf = data_dir / "a.pdf"
+    write_pdf(pdf, ["first version"])
+
+    def key(model="text-embedding-3-small", chunk_size=750):
+        return snapshot_key(str(data_dir), {str(pdf): file_digest(str(pdf))}, model, chunk_size)
+
+    original = key()
+    assert key() == original
+    assert key(model="text-embedding-3-large") != original
+    assert key(chunk_size=500) != original
+
+    write_pdf(pdf, ["second version"])
+    edited = key()
+    assert edited != original
+
+    pdf = data_dir / "b.pdf"
+    os.replace(data_dir / "a.pdf", pdf)
+    assert key() not in (original, edited)
+
+
+def test_roots_are_scoped_per_data_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("RAG_INDEX_DIR", str(tmp_path / "index"))
+    first, second = snapshot_root(str(tmp_path / "a")), snapshot_root(str(tmp_path / "b"))
+    assert first != second
+    assert os.path.dirname(first) == str(tmp_path / "index")
+
+
+def test_prune_keeps_the_current_and_most_recently_used(tmp_path):
+    chunks, vectors = chunks_and_vectors()
+    for age, name in enumerate(["newest", "older", "oldest"]):
+        save_snapshot(str(tmp_path / name), chunks, vectors, keep=10)
+        mtime = 1_000_000 - age * 100
+        os.utime(tmp_path / name, (mtime, mtime))
+    (tmp_path / ".tmp-in-progress").mkdir()
+
+    save_snapshot(str(tmp_path / "current"), chunks, vectors, keep=2)
+    assert sorted(os.listdir(tmp_path)) == [".tmp-in-progress", "current", "newest"]
+
+    # Loading marks a snapshot as used, so it outlives newer unused ones
+    save_snapshot(str(tmp_path / "older"), chunks, vectors, keep=10)
+    os.utime(tmp_path / "older", (1, 1))
+    assert load_snapshot(str(tmp_path / "older")) is not None
+    prune_snapshots(str(tmp_path / "current"), keep=2)
+    assert sorted(os.listdir(tmp_path)) == [".tmp-in-progress", "current", "older"]
+
+
+def test_keep_defaults_to_rag_index_keep(monkeypatch, tmp_path):
+    monkeypatch.setenv("RAG_INDEX_KEEP", "1")
+    chunks, vectors = chunks_and_vectors()
+    save_snapshot(str(tmp_path / "old"), chunks, vectors)
+    save_snapshot(str(tmp_path / "new"), chunks, vectors)
+    assert os.listdir(tmp_path) == ["new"]
+
+
+def test_rebuild_loads_the_snapshot_until_a_pdf_changes(offline_rag, pdf_dir):
+    rag, embeddings = offline_rag.rag, offline_rag.embeddings
+    rag._build_rag_graph(str(pdf_dir))
+    embedded = embeddings.embedded
+    assert embedded > 0
+
+    rag._build_rag_graph(str(pdf_dir))
+    assert embeddings.embedded == embedded
+
+    write_pdf(pdf_dir / "loans.pdf", ["Grants do not need to be repaid."])
+    rag._build_rag_graph(str(pdf_dir))
+    assert embeddings.embedded > embedded
+    assert len(os.listdir(snapshot_root(str(pdf_dir)))) == 2
+
+
+@pytest.mark.parametrize("copy", COPIES, ids=["15_A2A_LangGraph", "17_Deploying"])
+def test_copies_mirror_the_canonical_module(copy):
+    def without_note(path):
+        with open(path, encoding="utf-8") as f:
+            docstring, body = f.read().split('\n"""\n', 1)
+        # The last docstring paragraph says which copy this is
+        return docstring.rsplit("\n\n", 1)[0], body
+
+    assert without_note(copy) == without_note(rag_snapshot.__file__)
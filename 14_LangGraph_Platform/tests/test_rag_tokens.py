@@ -0,0 +1,45 @@
+import pytest
+from langchain_core.documents import Document
+
+from app import rag
+
+
+pytestmark = pytest.mark.usefixtures("byte_encoding")
+
+
+def test_special_token_strings_count_as_text(byte_encoding):
+    text = "ends with <|endoftext|>"
+    with pytest.raises(ValueError):
+        byte_encoding.encode(text)  # the default that used to fail ingestion
+    assert rag._tiktoken_len(text) == len(text.encode("utf-8"))
+    assert rag._tiktoken_lens([text, text]) == [len(text.encode("utf-8"))] * 2
+
+
+def test_lengths_are_memoized():
+    rag._tiktoken_len("some chunk")
+    rag._tiktoken_len("some chunk")
+    info = rag._tiktoken_len.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_batch_lengths_match_single_lengths(num_threads):
+    texts = ["", "a", "naïve café", "x" * 1000, "<|endoftext|> twice <|endoftext|>"]
+    assert rag._tiktoken_lens(texts, num_threads=num_threads) == [
+        rag._tiktoken_len(text) for text in texts
+    ]
+
+
+def test_pack_context_skips_duplicates_and_overflowing_chunks():
+    documents = [
+        Document(page_content="alpha " * 10),
+        Document(page_content="  ALPHA\n" * 10),  # same text up to case and whitespace
+        Document(page_content="beta " * 30),  # too large for what is left
+        Document(page_content="gamma"),
+    ]
+    budget = rag._tiktoken_len("alpha " * 10) + 2 + 5
+    context, saved = rag._pack_context(documents, token_budget=budget)
+    assert context == "alpha " * 10 + "\n\n" + "gamma"
+
+    total = sum(rag._tiktoken_len(d.page_content) for d in documents) + 3 * 2
+    assert saved == total - rag._tiktoken_len(context)
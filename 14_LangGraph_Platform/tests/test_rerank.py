@@ -0,0 +1,82 @@
+import importlib.util
+
+import pytest
+from langchain_core.documents import Document
+
+from app import rerank
+from app.rerank import BM25Reranker, CrossEncoderReranker, NoopReranker, get_reranker
+
+
+def docs(*texts):
+    return [Document(page_content=text, metadata={"id": i}) for i, text in enumerate(texts)]
+
+
+def ids(documents):
+    return [document.metadata["id"] for document in documents]
+
+
+def test_noop_keeps_dense_order():
+    candidates = docs("a", "b", "c")
+    assert ids(NoopReranker().rerank("query", candidates, top_k=2)) == [0, 1]
+
+
+def test_bm25_fuses_lexical_and_dense_rank():
+    candidates = docs(
+        "Transformers use attention.",  # dense 0, no query terms
+        "The MuonClip optimizer stabilises Kimi training.",  # dense 1, both terms
+        "An optimizer update rule.",  # dense 2, one term
+    )
+    reranker = BM25Reranker(fusion_k=60)
+    # RRF: 1/(60+dense) + 1/(60+lexical) -> 1: 1/61+1/60, 0: 1/60+1/62, 2: 1/62+1/61
+    assert ids(reranker.rerank("MuonClip optimizer", candidates, top_k=3)) == [1, 0, 2]
+    assert ids(reranker.rerank("MuonClip optimizer", candidates, top_k=1)) == [1]
+
+
+def test_bm25_without_query_terms_keeps_dense_order():
+    candidates = docs("alpha", "beta", "gamma")
+    assert ids(BM25Reranker().rerank("delta", candidates, top_k=3)) == [0, 1, 2]
+    assert BM25Reranker().rerank("delta", [], top_k=3) == []
+
+
+def test_bm25_uses_corpus_idf():
+    rare_alpha = BM25Reranker(docs("alpha", "beta", "beta", "beta beta"))
+    rare_beta = BM25Reranker(docs("beta", "alpha", "alpha", "alpha alpha"))
+    candidates = [["alpha"], ["beta"]]
+    alpha_score, beta_score = rare_alpha._scores("alpha beta", candidates)
+    assert alpha_score > beta_score
+    alpha_score, beta_score = rare_beta._scores("alpha beta", candidates)
+    assert alpha_score < beta_score
+
+
+def test_cross_encoder_orders_by_model_score(monkeypatch):
+    class FakeModel:
+        def predict(self, pairs):
+            return [float(len(text)) for _, text in pairs]
+
+    monkeypatch.setattr(rerank, "_load_cross_encoder", lambda model_name: FakeModel())
+    reranker = CrossEncoderReranker()
+    assert not reranker.inline
+    assert ids(reranker.rerank("query", docs("aa", "aaaa", "a"), top_k=2)) == [1, 0]
+
+
+def test_get_reranker_by_name(monkeypatch):
+    assert isinstance(get_reranker("none"), NoopReranker)
+    assert isinstance(get_reranker(""), NoopReranker)
+    assert isinstance(get_reranker(" BM25 ", docs("alpha")), BM25Reranker)
+
+    loaded = []
+    monkeypatch.setattr(rerank, "_load_cross_encoder", lambda model_name: loaded.append(model_name))
+    assert isinstance(get_reranker("cross-encoder:some/model"), CrossEncoderReranker)
+    assert loaded == ["some/model"]
+
+    with pytest.raises(ValueError, match="Unknown reranker"):
+        get_reranker("colbert")
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("sentence_transformers") is not None,
+    reason="sentence-transformers is installed",
+)
+def test_cross_encoder_requires_optional_dependency():
+    with pytest.raises(ImportError, match="sentence-transformers"):
+        get_reranker("cross-encoder")
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from app import semantic_cache
+from app.semantic_cache import SemanticAnswerCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(semantic_cache, "time", fake)
+    return fake
+
+
+def vector(angle: float) -> list:
+    """Unit vector in the plane at `angle` radians from the x axis."""
+    return [float(np.cos(angle)), float(np.sin(angle)), 0.0]
+
+
+def test_serves_paraphrases_above_threshold_only(clock):
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.set_namespace("snapshot-1")
+    cache.store(vector(0.0), "answer")
+    # cos(0.2) ~ 0.98, cos(0.5) ~ 0.88; scale does not matter
+    assert cache.lookup([2 * x for x in vector(0.2)]) == "answer"
+    assert cache.lookup(vector(0.5)) is None
+    assert cache.lookup([1.0, 0.0]) is None  # other embedding model
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, 0.3333)
+
+
+def test_returns_nearest_stored_answer(clock):
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.store(vector(0.0), "first")
+    cache.store(vector(0.3), "second")
+    assert cache.lookup(vector(0.05)) == "first"
+    assert cache.lookup(vector(0.25)) == "second"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = SemanticAnswerCache(ttl_seconds=10)
+    cache.store(vector(0.0), "answer")
+    clock.now += 10
+    assert cache.lookup(vector(0.0)) == "answer"
+    clock.now += 1
+    assert cache.lookup(vector(0.0)) is None
+
+
+def test_evicts_expired_then_least_recently_used(clock):
+    cache = SemanticAnswerCache(threshold=0.99, max_entries=2, ttl_seconds=100)
+    cache.store(vector(0.0), "a")
+    clock.now += 1
+    cache.store(vector(1.0), "b")
+    clock.now += 1
+    assert cache.lookup(vector(0.0)) == "a"  # "b" is now least recently used
+    cache.store(vector(2.0), "c")
+    assert cache.lookup(vector(1.0)) is None
+    assert cache.lookup(vector(0.0)) == "a"
+    assert cache.stats()["evictions"] == 1
+
+    # An expired entry is reused before any live one is evicted
+    clock.now += 99
+    cache.lookup(vector(2.0))
+    cache.store(vector(3.0), "d")
+    assert cache.lookup(vector(2.0)) == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_new_namespace_invalidates_and_drops_stale_stores(clock):
+    cache = SemanticAnswerCache()
+    cache.set_namespace("snapshot-1")
+    cache.store(vector(0.0), "old")
+    cache.set_namespace("snapshot-1")
+    assert cache.lookup(vector(0.0)) == "old"
+
+    cache.set_namespace("snapshot-2")
+    assert cache.lookup(vector(0.0)) is None
+    # An answer generated from the previous snapshot finishes late
+    cache.store(vector(0.0), "stale", namespace="snapshot-1")
+    assert cache.lookup(vector(0.0)) is None
+    cache.store(vector(0.0), "new", namespace="snapshot-2")
+    assert cache.lookup(vector(0.0)) == "new"
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_disabled_with_zero_entries(clock):
+    cache = SemanticAnswerCache(max_entries=0)
+    assert not cache.enabled
+    cache.store(vector(0.0), "answer")
+    assert cache.lookup(vector(0.0)) is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_clear_keeps_namespace(clock):
+    cache = SemanticAnswerCache()
+    cache.set_namespace("snapshot-1")
+    cache.store(vector(0.0), "answer")
+    cache.clear()
+    assert cache.lookup(vector(0.0)) is None
+    assert cache.namespace == "snapshot-1"
+    assert cache.stats()["entries"] == 0
@@ -19,9 +19,12 @@ from a2a.types import (
     AgentSkill,
 )
 from dotenv import load_dotenv
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from app.agent import Agent
 from app.agent_executor import GeneralAgentExecutor
+from app.rag import rag_readiness, start_warmup
 
 
 load_dotenv()
@@ -34,6 +37,12 @@ class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
 
+async def ready(request: Request) -> JSONResponse:
+    """Readiness probe: 200 once the RAG index is built, 503 while warming up."""
+    status = rag_readiness()
+    return JSONResponse(status, status_code=200 if status['ready'] else 503)
+
+
 @click.command()
 @click.option('--host', 'host', default='localhost')
 @click.option('--port', 'port', default=10000)
@@ -96,7 +105,13 @@ def main(host, port):
             agent_card=agent_card, http_handler=request_handler
         )
 
-        uvicorn.run(server.build(), host=host, port=port)
+        # Build the RAG index in the background so the first document
+        # retrieval request does not pay for it; /ready reports progress.
+        start_warmup()
+        starlette_app = server.build()
+        starlette_app.add_route('/ready', ready, methods=['GET'])
+
+        uvicorn.run(starlette_app, host=host, port=port)
         # --8<-- [end:DefaultRequestHandler]
 
     except MissingAPIKeyError as e:
@@ -3,7 +3,7 @@ import os
 from collections.abc import AsyncIterable
 from typing import Any, Literal
 
-from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
@@ -50,14 +50,38 @@ class Agent:
             self.model,
             self.SYSTEM_INSTRUCTION,
             self.FORMAT_INSTRUCTION,
-            checkpointer=memory
+            checkpointer=memory,
+            # 'tool': the final answer and its status come from one model call
+            response_format_mode=os.getenv('AGENT_RESPONSE_FORMAT_MODE', 'tool'),
         )
 
     async def stream(self, query, context_id) -> AsyncIterable[dict[str, Any]]:
         inputs = {'messages': [('user', query)]}
         config = {'configurable': {'thread_id': context_id}}
 
-        for item in self.graph.stream(inputs, config, stream_mode='values'):
+        # 'messages' mode yields LLM tokens as they are generated; subgraphs=True
+        # includes the ones produced inside tools (the RAG tool runs its own
+        # graph), so partial answers reach the client before each step ends.
+        async for namespace, mode, item in self.graph.astream(
+            inputs, config, stream_mode=['values', 'messages'], subgraphs=True
+        ):
+            if mode == 'messages':
+                token, _ = item
+                if (
+                    isinstance(token, AIMessageChunk)
+                    and isinstance(token.content, str)
+                    and token.content
+                ):
+                    yield {
+                        'is_task_complete': False,
+                        'require_user_input': False,
+                        'content': token.content,
+                    }
+                continue
+            if namespace:
+                # State of a nested graph, e.g. the RAG tool's
+                continue
+
             message = item['messages'][-1]
             if (
                 isinstance(message, AIMessage)
@@ -2,17 +2,27 @@
 
 After the agent responds, a secondary node evaluates helpfulness ('Y'/'N').
 If helpful, end; otherwise, continue the loop or terminate after a safe limit.
+
+The final answer's structured response (status + message) is produced in the
+same model call by default: the response format is bound as one more tool,
+and calling it ends the turn. Pass `response_format_mode="separate"` for the
+older behavior of a second structured-output call after each final answer.
 """
 from __future__ import annotations
 
-from typing import Dict, Any, Annotated, TypedDict, List
+from typing import Dict, Any, Annotated, TypedDict, List, Tuple
 
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import AIMessage
+from pydantic import ValidationError
+
+from app.parallel_tools import build_tool_node
+
+RESPONSE_FORMAT_MODES = ("tool", "separate")
 
 
 class AgentState(TypedDict):
@@ -21,18 +31,51 @@ class AgentState(TypedDict):
     structured_response: Any  # ResponseFormat | None
 
 
-def build_model_with_tools(model):
-    """Return a model instance bound to the tool belt."""
-    from app.tools import get_tool_belt
-    return model.bind_tools(get_tool_belt())
-
-
-def call_model(state: Dict[str, Any], model) -> Dict[str, Any]:
-    """Invoke the model with the accumulated messages and append its response."""
-    model_with_tools = build_model_with_tools(model)
-    messages = state["messages"]
-    response = model_with_tools.invoke(messages)
-    return {"messages": [response]}
+def build_model_with_tools(model, tools: List | None = None):
+    """Return a model instance bound to `tools` (default: the tool belt)."""
+    if tools is None:
+        from app.tools import get_tool_belt
+        tools = get_tool_belt()
+    return model.bind_tools(tools)
+
+
+def extract_structured_response(response: AIMessage, response_format) -> Tuple[AIMessage, Any]:
+    """Split the `response_format` tool call off a model response.
+
+    Returns the message to keep in the history and the structured response.
+    While other tool calls are pending, the format call is dropped and the
+    structured response is None. Otherwise the format call becomes a plain
+    AIMessage with its message as content; a reply without it is taken as
+    completed, so no further model call is needed.
+    """
+    name = response_format.__name__
+    tool_calls = getattr(response, "tool_calls", None) or []
+    format_calls = [call for call in tool_calls if call["name"] == name]
+    other_calls = [call for call in tool_calls if call["name"] != name]
+    if other_calls:
+        if format_calls:
+            response = response.model_copy(update={"tool_calls": other_calls})
+        return response, None
+
+    structured_response = None
+    if format_calls:
+        try:
+            structured_response = response_format(**format_calls[-1]["args"])
+        except ValidationError:
+            pass
+    if structured_response is None:
+        content = response.content if isinstance(response.content, str) else ""
+        structured_response = response_format(
+            status="completed" if content else "error",
+            message=content or "The model returned an empty response.",
+        )
+    message = AIMessage(
+        content=structured_response.message,
+        id=response.id,
+        response_metadata=response.response_metadata,
+        usage_metadata=response.usage_metadata,
+    )
+    return message, structured_response
 
 
 def route_to_action_or_helpfulness(state: Dict[str, Any]):
@@ -43,15 +86,8 @@ def route_to_action_or_helpfulness(state: Dict[str, Any]):
     return "helpfulness"
 
 
-def helpfulness_node(state: Dict[str, Any], model) -> Dict[str, Any]:
-    """Evaluate helpfulness of the latest response relative to the initial query."""
-    # If we've exceeded loop limit, short-circuit with END decision marker
-    if len(state["messages"]) > 10:
-        return {"messages": [AIMessage(content="HELPFULNESS:END")]}    
-
-    initial_query = state["messages"][0]
-    final_response = state["messages"][-1]
-
+def build_helpfulness_chain(model):
+    """Return the prompt | model | parser chain that grades a response 'Y'/'N'."""
     prompt_template = """
   Given an initial query and a final response, determine if the final response is extremely helpful or not. 
   A helpful response should:
@@ -68,9 +104,20 @@ def helpfulness_node(state: Dict[str, Any], model) -> Dict[str, Any]:
   {final_response}"""
 
     helpfulness_prompt_template = PromptTemplate.from_template(prompt_template)
-    helpfulness_chain = (
+    # The Y/N verdict is internal, so keep it out of streamed message tokens
+    return (
         helpfulness_prompt_template | model | StrOutputParser()
-    )
+    ).with_config(tags=[TAG_NOSTREAM])
+
+
+def helpfulness_node(state: Dict[str, Any], helpfulness_chain) -> Dict[str, Any]:
+    """Evaluate helpfulness of the latest response relative to the initial query."""
+    # If we've exceeded loop limit, short-circuit with END decision marker
+    if len(state["messages"]) > 10:
+        return {"messages": [AIMessage(content="HELPFULNESS:END")]}    
+
+    initial_query = state["messages"][0]
+    final_response = state["messages"][-1]
 
     helpfulness_response = helpfulness_chain.invoke(
         {
@@ -96,28 +143,70 @@ def helpfulness_decision(state: Dict[str, Any]):
     return "continue"
 
 
-def build_agent_graph_with_helpfulness(model, system_instruction, format_instruction, checkpointer=None):
-    """Build an agent graph with an auxiliary helpfulness evaluation subgraph."""
+def build_agent_graph_with_helpfulness(
+    model,
+    system_instruction,
+    format_instruction,
+    checkpointer=None,
+    response_format_mode: str = "tool",
+):
+    """Build an agent graph with an auxiliary helpfulness evaluation subgraph.
+
+    The tool belt, the tool-bound and structured-output models and the
+    helpfulness chain are created once here and shared by every turn.
+    `response_format_mode` is "tool" (one model call per final answer) or
+    "separate" (an extra structured-output call after it).
+    """
     from app.tools import get_tool_belt
     from app.agent import ResponseFormat
+
+    if response_format_mode not in RESPONSE_FORMAT_MODES:
+        raise ValueError(
+            f"Unknown response_format_mode {response_format_mode!r}; "
+            f"expected one of {', '.join(RESPONSE_FORMAT_MODES)}"
+        )
+
+    tools = get_tool_belt()
+    helpfulness_chain = build_helpfulness_chain(model)
+
+    if response_format_mode == "tool":
+        model_with_tools = build_model_with_tools(model, tools + [ResponseFormat])
+        instructions = (
+            f"{system_instruction}\n\n{format_instruction}\n\n"
+            f"When you are ready to reply to the user, call {ResponseFormat.__name__} "
+            "with the status and your complete reply as the message."
+        )
+
+        def _call_model(state: AgentState) -> Dict[str, Any]:
+            """Invoke the model once; a response-format call ends the turn."""
+            response = model_with_tools.invoke([("system", instructions)] + state["messages"])
+            message, structured_response = extract_structured_response(response, ResponseFormat)
+            if structured_response is None:
+                return {"messages": [message]}
+            return {"messages": [message], "structured_response": structured_response}
+
+        return _compile_agent_graph(_call_model, tools, helpfulness_chain, checkpointer)
+
+    model_with_tools = build_model_with_tools(model, tools)
+    try:
+        # Apply response format to the model
+        model_with_format = model.with_structured_output(
+            ResponseFormat,
+            method="json_schema",
+            include_raw=False
+        ).with_config(tags=[TAG_NOSTREAM])  # JSON, not for streaming
+    except Exception:
+        model_with_format = None  # model without structured output support
     
     # Create model-bound functions
     def _call_model(state: AgentState) -> Dict[str, Any]:
-        """Wrapper to pass model to call_model."""
-        model_with_tools = build_model_with_tools(model)
+        """Invoke the model; a final answer gets a structured-output call of its own."""
         messages = state["messages"]
         response = model_with_tools.invoke(messages)
         
         # If there are no tool calls, try to extract structured response
-        if not getattr(response, "tool_calls", None):
+        if not getattr(response, "tool_calls", None) and model_with_format is not None:
             try:
-                # Apply response format to the model
-                model_with_format = model.with_structured_output(
-                    ResponseFormat,
-                    method="json_schema",
-                    include_raw=False
-                )
-                
                 # Add system and format instructions
                 formatted_messages = [("system", f"{system_instruction}\n\n{format_instruction}")] + state["messages"]
                 structured_response = model_with_format.invoke(formatted_messages)
@@ -132,15 +221,21 @@ def build_agent_graph_with_helpfulness(model, system_instruction, format_instruc
         else:
             # If there are tool calls, just return the response
             return {"messages": [response]}
-    
+
+    return _compile_agent_graph(_call_model, tools, helpfulness_chain, checkpointer)
+
+
+def _compile_agent_graph(call_model_node, tools, helpfulness_chain, checkpointer=None):
+    """Wire the agent, tool and helpfulness nodes into a compiled graph."""
     def _helpfulness_node(state: AgentState) -> Dict[str, Any]:
-        """Wrapper to pass model to helpfulness_node."""
-        return helpfulness_node(state, model)
+        """Wrapper to pass the helpfulness chain to helpfulness_node."""
+        return helpfulness_node(state, helpfulness_chain)
     
     graph = StateGraph(AgentState)
-    tool_node = ToolNode(get_tool_belt())
+    # Runs a turn's tool calls concurrently, with per-call timeouts
+    tool_node = build_tool_node(tools)
     
-    graph.add_node("agent", _call_model)
+    graph.add_node("agent", call_model_node)
     graph.add_node("action", tool_node)
     graph.add_node("helpfulness", _helpfulness_node)
     graph.set_entry_point("agent")
@@ -4,32 +4,106 @@ This module builds an in-memory RAG pipeline that:
 - Loads PDF documents from `RAG_DATA_DIR` (default: "data").
 - Splits documents into chunks using a token-aware splitter.
 - Embeds chunks with OpenAI and stores vectors in an in-memory Qdrant store.
+- Persists the chunks and their vectors to `RAG_INDEX_DIR` (default:
+  ".rag_index"), keyed by the data contents and embedding model, so later
+  cold starts skip loading, splitting and embedding. Only the newest
+  `RAG_INDEX_KEEP` snapshots (default 2) of each data directory are kept
+  (`app.rag_snapshot`).
 - Exposes a LangChain Tool `retrieve_information` that retrieves relevant
-  context and generates a response constrained to that context.
+  context and generates a response constrained to that context. The tool and
+  the graph have native async paths (`ainvoke`), so concurrent calls from the
+  async A2A executor share the event loop instead of each holding a worker
+  thread of the tool pool.
+- Builds the graph at most once per process; `start_warmup()` does so in a
+  background thread at server start and `rag_readiness()` reports progress.
 """
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
 from functools import lru_cache
-from typing import Annotated, List
+from typing import Annotated, Any, Callable, Dict, List, Optional, Sequence
 
+import numpy as np
 import tiktoken
 from langchain_community.document_loaders import DirectoryLoader, PyMuPDFLoader
 from langchain_community.vectorstores import Qdrant
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI
 from langchain_openai.embeddings import OpenAIEmbeddings
 from langgraph.graph import START, StateGraph
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
 from typing_extensions import TypedDict
 
+from app import rag_snapshot
 
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Return the process-wide tiktoken encoding for gpt-4o.
+
+    Looked up once; used for chunk length measurement.
+    """
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+@lru_cache(maxsize=8192)
 def _tiktoken_len(text: str) -> int:
-    """Return token length using tiktoken; used for chunk length measurement."""
-    tokens = tiktoken.encoding_for_model("gpt-4o").encode(text)
-    return len(tokens)
+    """Return token length using tiktoken; used for chunk length measurement.
+
+    Memoized because RecursiveCharacterTextSplitter measures each candidate
+    split more than once (when checking it and again when merging). Special
+    token strings such as "<|endoftext|>" in PDF text count as plain text.
+    """
+    return len(_get_encoding().encode_ordinary(text))
+
+
+def _pdf_digests(data_dir: str) -> Dict[str, str]:
+    """Content digest of each PDF under `data_dir` (recursive)."""
+    digests = {}
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                digests[path] = rag_snapshot.file_digest(path)
+    return digests
+
+
+def _vectorstore_from_vectors(
+    chunks: Sequence[Document], vectors: np.ndarray, embedding_model
+) -> Qdrant:
+    """Create an in-memory Qdrant store from precomputed chunk vectors."""
+    collection_name = "rag"
+    client = QdrantClient(location=":memory:")
+    dimension = (
+        vectors.shape[1] if len(vectors) else len(embedding_model.embed_query("dimension"))
+    )
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=qdrant_models.VectorParams(
+            size=dimension, distance=qdrant_models.Distance.COSINE
+        ),
+    )
+    if len(chunks):
+        client.upsert(
+            collection_name=collection_name,
+            points=[
+                qdrant_models.PointStruct(
+                    id=index,
+                    vector=vector,
+                    payload={"page_content": chunk.page_content, "metadata": chunk.metadata},
+                )
+                for index, (chunk, vector) in enumerate(zip(chunks, vectors.tolist()))
+            ],
+        )
+    return Qdrant(client=client, collection_name=collection_name, embeddings=embedding_model)
 
 
 class _RAGState(TypedDict):
@@ -39,44 +113,76 @@ class _RAGState(TypedDict):
     response: str
 
 
-def _build_rag_graph(data_dir: str):
+def _build_rag_graph(
+    data_dir: str, progress: Optional[Callable[[str], None]] = None
+):
     """Construct and compile a minimal RAG graph.
 
     Steps:
     1) Load PDFs from `data_dir` recursively (best-effort).
     2) Split documents into token-aware chunks.
     3) Create embeddings and an in-memory Qdrant vector store retriever.
+       Steps 1-3 are skipped when a snapshot for the current data directory
+       contents exists under RAG_INDEX_DIR; otherwise one is written.
     4) Define a chat prompt and generation model.
     5) Wire a two-node graph: retrieve -> generate.
+
+    `progress`, if given, is called with the name of each stage as it starts.
     """
-    # Load PDFs from data directory (recursive)
-    try:
-        directory_loader = DirectoryLoader(
-            data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
-        )
-        documents = directory_loader.load()
-    except Exception:
-        documents = []
-
-    # Split documents
-    try:
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-    except Exception:
-        # Fallback to legacy import path if available
-        from langchain.text_splitter import (  # type: ignore
-            RecursiveCharacterTextSplitter,
+    report = progress or (lambda stage: None)
+    report("fingerprinting data")
+    embedding_model_name = "text-embedding-3-small"
+    chunk_size = 750
+    embedding_model = OpenAIEmbeddings(model=embedding_model_name)
+    snapshot_dir = os.path.join(
+        rag_snapshot.snapshot_root(data_dir),
+        rag_snapshot.snapshot_key(
+            data_dir, _pdf_digests(data_dir), embedding_model_name, chunk_size
+        ),
+    )
+
+    report("loading snapshot")
+    snapshot = rag_snapshot.load_snapshot(snapshot_dir)
+    if snapshot is not None:
+        chunks, vectors = snapshot
+    else:
+        # Load PDFs from data directory (recursive)
+        report("loading documents")
+        try:
+            directory_loader = DirectoryLoader(
+                data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
+            )
+            documents = directory_loader.load()
+        except Exception:
+            documents = []
+
+        # Split documents
+        report("splitting documents")
+        try:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+        except Exception:
+            # Fallback to legacy import path if available
+            from langchain.text_splitter import (  # type: ignore
+                RecursiveCharacterTextSplitter,
+            )
+
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0, length_function=_tiktoken_len
         )
+        chunks = text_splitter.split_documents(documents) if documents else []
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=750, chunk_overlap=0, length_function=_tiktoken_len
-    )
-    chunks = text_splitter.split_documents(documents) if documents else []
+        # Embed once and persist for later cold starts
+        report("embedding chunks")
+        vectors = np.asarray(
+            embedding_model.embed_documents([chunk.page_content for chunk in chunks]),
+            dtype=np.float32,
+        )
+        if chunks:
+            rag_snapshot.save_snapshot(snapshot_dir, chunks, vectors)
 
-    # Embeddings and vector store (in-memory Qdrant)
-    embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
-    qdrant_vectorstore = Qdrant.from_documents(
-        documents=chunks, embedding=embedding_model, location=":memory:"
-    )
+    # Vector store (in-memory Qdrant) from precomputed vectors
+    report("indexing vectors")
+    qdrant_vectorstore = _vectorstore_from_vectors(chunks, vectors, embedding_model)
     retriever = qdrant_vectorstore.as_retriever()
 
     # Prompt and model
@@ -99,27 +205,152 @@ def _build_rag_graph(data_dir: str):
         )
         return {"response": response_text}  # type: ignore
 
+    async def aretrieve(state: _RAGState) -> _RAGState:
+        # The query embedding is awaited, but in-memory Qdrant has no async
+        # client (its async search would run the sync one on an executor
+        # thread), so the short CPU-bound search runs inline.
+        embedding = await embedding_model.aembed_query(state["question"])
+        retrieved_docs = qdrant_vectorstore.similarity_search_by_vector(
+            embedding, k=retriever.search_kwargs.get("k", 4)
+        )
+        return {"context": retrieved_docs}  # type: ignore
+
+    async def agenerate(state: _RAGState) -> _RAGState:
+        generator_chain = chat_prompt | generator_llm | StrOutputParser()
+        response_text = await generator_chain.ainvoke(
+            {"query": state["question"], "context": state.get("context", [])}
+        )
+        return {"response": response_text}  # type: ignore
+
+    report("compiling graph")
     graph_builder = StateGraph(_RAGState)
-    graph_builder = graph_builder.add_sequence([retrieve, generate])
+    # Each node has a sync and an async implementation. Under ainvoke() the
+    # embedding and chat model calls are awaited and the in-memory search
+    # runs inline.
+    graph_builder = graph_builder.add_sequence(
+        [
+            ("retrieve", RunnableLambda(retrieve, afunc=aretrieve)),
+            ("generate", RunnableLambda(generate, afunc=agenerate)),
+        ]
+    )
     graph_builder.add_edge(START, "retrieve")
     return graph_builder.compile()
 
 
-@lru_cache(maxsize=1)
+_rag_graph = None
+_rag_graph_lock = threading.Lock()
+_warmup_lock = threading.Lock()
+_warmup_thread: Optional[threading.Thread] = None
+_build_status: Dict[str, Any] = {
+    "state": "idle",
+    "stage": None,
+    "stages": [],
+    "started_at": None,
+    "ready_at": None,
+    "error": None,
+}
+
+
+def _record_stage(stage: str) -> None:
+    """Progress callback for `_build_rag_graph`; records elapsed time per stage."""
+    _build_status["stage"] = stage
+    _build_status["stages"].append(
+        {"stage": stage, "at_seconds": round(time.time() - _build_status["started_at"], 3)}
+    )
+
+
 def _get_rag_graph():
-    """Return a cached compiled RAG graph built from RAG_DATA_DIR."""
-    data_dir = os.environ.get("RAG_DATA_DIR", "data")
-    return _build_rag_graph(data_dir)
+    """Return the compiled RAG graph built from RAG_DATA_DIR.
+
+    Single-flight: the first caller builds while concurrent callers block on
+    the same lock and then reuse its result. A failed build is recorded in
+    the readiness status and retried by the next caller.
+    """
+    global _rag_graph
+    if _rag_graph is not None:
+        return _rag_graph
+    with _rag_graph_lock:
+        if _rag_graph is None:
+            data_dir = os.environ.get("RAG_DATA_DIR", "data")
+            _build_status.update(
+                state="building", stage=None, stages=[], started_at=time.time(),
+                ready_at=None, error=None,
+            )
+            try:
+                graph = _build_rag_graph(data_dir, progress=_record_stage)
+            except Exception as exc:
+                _build_status.update(state="failed", error=f"{type(exc).__name__}: {exc}")
+                raise
+            _build_status.update(state="ready", stage=None, ready_at=time.time())
+            _rag_graph = graph
+    return _rag_graph
+
+
+def start_warmup() -> threading.Thread:
+    """Start building the RAG graph in a background daemon thread.
 
+    Idempotent: returns the running (or finished) warm-up thread if one was
+    already started. Build errors are reported through `rag_readiness()`.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None or (
+            not _warmup_thread.is_alive() and _build_status["state"] == "failed"
+        ):
+
+            def _warm() -> None:
+                try:
+                    _get_rag_graph()
+                except Exception:
+                    pass  # recorded in _build_status
+
+            _warmup_thread = threading.Thread(target=_warm, name="rag-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
+
+
+def rag_readiness() -> Dict[str, Any]:
+    """Return a snapshot of the RAG graph build status for readiness probes.
+
+    Keys: `ready`, `state` (idle/building/ready/failed), the current `stage`,
+    the `stages` reached with their offsets in seconds, `elapsed_seconds`
+    (build time so far, or time-to-ready once ready) and `error`.
+    """
+    status = dict(_build_status, stages=list(_build_status["stages"]))
+    started_at, ready_at = status.pop("started_at"), status.pop("ready_at")
+    status["ready"] = status["state"] == "ready"
+    status["elapsed_seconds"] = (
+        round((ready_at or time.time()) - started_at, 3) if started_at else None
+    )
+    return status
 
-@tool
-def retrieve_information(
+
+def _response_text(result):
+    """Prefer returning the response string if available."""
+    if isinstance(result, dict) and "response" in result:
+        return result["response"]
+    return result
+
+
+def _retrieve_information(
     query: Annotated[str, "query to ask the retrieve information tool"]
 ):
     """Use Retrieval Augmented Generation to retrieve information about student loan policies"""
     graph = _get_rag_graph()
-    result = graph.invoke({"question": query})
-    # Prefer returning the response string if available
-    if isinstance(result, dict) and "response" in result:
-        return result["response"]
-    return result
+    return _response_text(graph.invoke({"question": query}))
+
+
+async def _aretrieve_information(
+    query: Annotated[str, "query to ask the retrieve information tool"]
+):
+    """Use Retrieval Augmented Generation to retrieve information about student loan policies"""
+    # Building (or waiting for the warm-up build) blocks, so keep it off the loop
+    graph = _rag_graph or await asyncio.to_thread(_get_rag_graph)
+    return _response_text(await graph.ainvoke({"question": query}))
+
+
+retrieve_information = StructuredTool.from_function(
+    func=_retrieve_information,
+    coroutine=_aretrieve_information,
+    name="retrieve_information",
+)
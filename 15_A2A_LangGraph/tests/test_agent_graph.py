@@ -0,0 +1,76 @@
+from langchain_core.messages import AIMessage
+
+from app.agent import ResponseFormat
+from app.agent_graph_with_helpfulness import extract_structured_response
+
+
+def format_call(call_id="format", **args):
+    return {"name": "ResponseFormat", "args": args, "id": call_id, "type": "tool_call"}
+
+
+def search_call(call_id="search"):
+    return {"name": "web_search", "args": {"query": "MuonClip"}, "id": call_id, "type": "tool_call"}
+
+
+def response(content="", tool_calls=()):
+    return AIMessage(
+        content=content,
+        tool_calls=list(tool_calls),
+        id="run-1",
+        response_metadata={"finish_reason": "tool_calls"},
+        usage_metadata={"input_tokens": 10, "output_tokens": 5, "total_tokens": 15},
+    )
+
+
+def test_format_call_alone_becomes_the_final_answer():
+    model_response = response(
+        tool_calls=[format_call(status="completed", message="MuonClip clips attention logits.")]
+    )
+    message, structured = extract_structured_response(model_response, ResponseFormat)
+
+    assert structured == ResponseFormat(status="completed", message="MuonClip clips attention logits.")
+    assert message.content == "MuonClip clips attention logits."
+    assert not message.tool_calls
+    assert message.id == "run-1"
+    assert message.usage_metadata == model_response.usage_metadata
+    assert message.response_metadata == model_response.response_metadata
+
+
+def test_format_call_alongside_other_tools_is_dropped_until_they_ran():
+    model_response = response(
+        tool_calls=[search_call(), format_call(status="completed", message="too early")]
+    )
+    message, structured = extract_structured_response(model_response, ResponseFormat)
+
+    assert structured is None
+    assert [call["name"] for call in message.tool_calls] == ["web_search"]
+    assert model_response.tool_calls[1]["name"] == "ResponseFormat"  # original left untouched
+
+    plain_tool_turn = response(tool_calls=[search_call()])
+    assert extract_structured_response(plain_tool_turn, ResponseFormat) == (plain_tool_turn, None)
+
+
+def test_invalid_format_arguments_fall_back_to_the_content():
+    model_response = response(
+        content="Here is what I found.", tool_calls=[format_call(status="finished")]
+    )
+    message, structured = extract_structured_response(model_response, ResponseFormat)
+
+    assert structured == ResponseFormat(status="completed", message="Here is what I found.")
+    assert message.content == "Here is what I found."
+    assert not message.tool_calls
+
+    empty = response(tool_calls=[format_call(message=None)])
+    _, structured = extract_structured_response(empty, ResponseFormat)
+    assert structured.status == "error"
+
+
+def test_plain_text_reply_is_taken_as_completed():
+    message, structured = extract_structured_response(response("Hello!"), ResponseFormat)
+    assert structured == ResponseFormat(status="completed", message="Hello!")
+    assert message.content == "Hello!"
+
+    _, structured = extract_structured_response(response(""), ResponseFormat)
+    assert structured == ResponseFormat(
+        status="error", message="The model returned an empty response."
+    )
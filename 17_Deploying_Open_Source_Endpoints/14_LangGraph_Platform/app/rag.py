@@ -4,6 +4,11 @@ This module builds an in-memory RAG pipeline that:
 - Loads PDF documents from `RAG_DATA_DIR` (default: "data").
 - Splits documents into chunks using a token-aware splitter.
 - Embeds chunks with OpenAI and stores vectors in an in-memory Qdrant store.
+- Persists the chunks and their vectors to `RAG_INDEX_DIR` (default:
+  ".rag_index"), keyed by the data contents and embedding model, so later
+  cold starts skip loading, splitting and embedding. Only the newest
+  `RAG_INDEX_KEEP` snapshots (default 2) of each data directory are kept
+  (`app.rag_snapshot`).
 - Exposes a LangChain Tool `retrieve_information` that retrieves relevant
   context and generates a response constrained to that context.
 """
@@ -11,8 +16,9 @@ from __future__ import annotations
 
 import os
 from functools import lru_cache
-from typing import Annotated, List
+from typing import Annotated, Dict, List, Sequence
 
+import numpy as np
 import tiktoken
 from langchain_community.document_loaders import DirectoryLoader, PyMuPDFLoader
 from langchain_community.vectorstores import Qdrant
@@ -32,13 +38,72 @@ except ImportError:
     ChatTogether = None
     TogetherEmbeddings = None
 from langgraph.graph import START, StateGraph
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
 from typing_extensions import TypedDict
 
+from app import rag_snapshot
 
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Return the process-wide tiktoken encoding for gpt-4o.
+
+    Looked up once; used for chunk length measurement.
+    """
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+@lru_cache(maxsize=8192)
 def _tiktoken_len(text: str) -> int:
-    """Return token length using tiktoken; used for chunk length measurement."""
-    tokens = tiktoken.encoding_for_model("gpt-4o").encode(text)
-    return len(tokens)
+    """Return token length using tiktoken; used for chunk length measurement.
+
+    Memoized because RecursiveCharacterTextSplitter measures each candidate
+    split more than once (when checking it and again when merging). Special
+    token strings such as "<|endoftext|>" in PDF text count as plain text.
+    """
+    return len(_get_encoding().encode_ordinary(text))
+
+
+def _pdf_digests(data_dir: str) -> Dict[str, str]:
+    """Content digest of each PDF under `data_dir` (recursive)."""
+    digests = {}
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                path = os.path.join(root, name)
+                digests[path] = rag_snapshot.file_digest(path)
+    return digests
+
+
+def _vectorstore_from_vectors(
+    chunks: Sequence[Document], vectors: np.ndarray, embedding_model
+) -> Qdrant:
+    """Create an in-memory Qdrant store from precomputed chunk vectors."""
+    collection_name = "rag"
+    client = QdrantClient(location=":memory:")
+    dimension = (
+        vectors.shape[1] if len(vectors) else len(embedding_model.embed_query("dimension"))
+    )
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=qdrant_models.VectorParams(
+            size=dimension, distance=qdrant_models.Distance.COSINE
+        ),
+    )
+    if len(chunks):
+        client.upsert(
+            collection_name=collection_name,
+            points=[
+                qdrant_models.PointStruct(
+                    id=index,
+                    vector=vector,
+                    payload={"page_content": chunk.page_content, "metadata": chunk.metadata},
+                )
+                for index, (chunk, vector) in enumerate(zip(chunks, vectors.tolist()))
+            ],
+        )
+    return Qdrant(client=client, collection_name=collection_name, embeddings=embedding_model)
 
 
 class _RAGState(TypedDict):
@@ -55,49 +120,69 @@ def _build_rag_graph(data_dir: str) -> "CompiledGraph":
     1) Load PDFs from `data_dir` recursively (best-effort).
     2) Split documents into token-aware chunks.
     3) Create embeddings and an in-memory Qdrant vector store retriever.
+       Steps 1-3 are skipped when a snapshot for the current data directory
+       contents exists under RAG_INDEX_DIR; otherwise one is written.
     4) Define a chat prompt and generation model.
     5) Wire a two-node graph: retrieve -> generate.
     """
-    # Load PDFs from data directory (recursive)
-    try:
-        directory_loader = DirectoryLoader(
-            data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
-        )
-        documents = directory_loader.load()
-    except Exception:
-        documents = []
-
-    # Split documents
-    try:
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-    except Exception:
-        # Fallback to legacy import path if available
-        from langchain.text_splitter import (  # type: ignore
-            RecursiveCharacterTextSplitter,
-        )
-
     # Adjust chunk size based on embedding model
     if os.environ.get("TOGETHER_EMBEDDING_MODEL") == "BAAI/bge-large-en-v1.5":
         chunk_size = 400  # Smaller chunks for BAAI model with 512 token limit
     else:
         chunk_size = 750  # Default for other models
-    
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, chunk_overlap=0, length_function=_tiktoken_len
-    )
-    chunks = text_splitter.split_documents(documents) if documents else []
 
-    # Embeddings and vector store (in-memory Qdrant)
     if os.environ.get("TOGETHER_API_KEY"):
-        embedding_model = TogetherEmbeddings(
-            model=os.environ.get("TOGETHER_EMBEDDING_MODEL", "BAAI/bge-large-en-v1.5")
+        embedding_model_name = os.environ.get(
+            "TOGETHER_EMBEDDING_MODEL", "BAAI/bge-large-en-v1.5"
         )
+        embedding_model = TogetherEmbeddings(model=embedding_model_name)
     else:
-        embedding_model = OpenAIEmbeddings(model="text-embedding-3-small")
-    
-    qdrant_vectorstore = Qdrant.from_documents(
-        documents=chunks, embedding=embedding_model, location=":memory:"
+        embedding_model_name = "text-embedding-3-small"
+        embedding_model = OpenAIEmbeddings(model=embedding_model_name)
+    snapshot_dir = os.path.join(
+        rag_snapshot.snapshot_root(data_dir),
+        rag_snapshot.snapshot_key(
+            data_dir, _pdf_digests(data_dir), embedding_model_name, chunk_size
+        ),
     )
+
+    snapshot = rag_snapshot.load_snapshot(snapshot_dir)
+    if snapshot is not None:
+        chunks, vectors = snapshot
+    else:
+        # Load PDFs from data directory (recursive)
+        try:
+            directory_loader = DirectoryLoader(
+                data_dir, glob="**/*.pdf", loader_cls=PyMuPDFLoader
+            )
+            documents = directory_loader.load()
+        except Exception:
+            documents = []
+
+        # Split documents
+        try:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+        except Exception:
+            # Fallback to legacy import path if available
+            from langchain.text_splitter import (  # type: ignore
+                RecursiveCharacterTextSplitter,
+            )
+
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0, length_function=_tiktoken_len
+        )
+        chunks = text_splitter.split_documents(documents) if documents else []
+
+        # Embed once and persist for later cold starts
+        vectors = np.asarray(
+            embedding_model.embed_documents([chunk.page_content for chunk in chunks]),
+            dtype=np.float32,
+        )
+        if chunks:
+            rag_snapshot.save_snapshot(snapshot_dir, chunks, vectors)
+
+    # Vector store (in-memory Qdrant) from precomputed vectors
+    qdrant_vectorstore = _vectorstore_from_vectors(chunks, vectors, embedding_model)
     retriever = qdrant_vectorstore.as_retriever()
 
     # Prompt and model
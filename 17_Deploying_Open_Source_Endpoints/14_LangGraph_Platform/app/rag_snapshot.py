@@ -0,0 +1,154 @@
+"""On-disk snapshots of a RAG index.
+
+A snapshot holds the chunks of a data directory (`chunks.json`), their
+embedding vectors (`vectors.npy`) and the errors of files that could not be
+parsed (`failed.json`, if any), so a cold start can rebuild the in-memory
+vector store without loading, splitting or embedding any PDF again.
+
+Snapshots live under `RAG_INDEX_DIR` (default: ".rag_index"), one directory
+per data directory (`snapshot_root`) and one snapshot per `snapshot_key`: a
+hash of every file's content digest plus the embedding model and chunk size,
+so any change to the data or the indexing settings selects a fresh snapshot.
+Snapshots are published atomically, and only the `RAG_INDEX_KEEP` (default 2)
+most recently used ones of each data directory are kept.
+
+This file mirrors the canonical 14_LangGraph_Platform/app/rag_snapshot.py
+(the top-level lesson app), copied because this app is deployed on its own.
+Make changes there first and copy them here; only this paragraph differs.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_key(
+    data_dir: str, digests: Dict[str, str], embedding_model_name: str, chunk_size: int
+) -> str:
+    """Hash the per-file `digests` of `data_dir` together with the indexing settings.
+
+    Any added, removed, renamed or edited PDF, or a different embedding model
+    or chunk size, yields a new key and therefore a fresh snapshot.
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            {"embedding_model": embedding_model_name, "chunk_size": chunk_size}
+        ).encode()
+    )
+    for path in sorted(digests):
+        digest.update(os.path.relpath(path, data_dir).encode())
+        digest.update(digests[path].encode())
+    return digest.hexdigest()
+
+
+def snapshot_root(data_dir: str) -> str:
+    """Directory under RAG_INDEX_DIR holding the snapshots of one data directory."""
+    scope = hashlib.sha256(os.path.abspath(data_dir).encode()).hexdigest()[:16]
+    return os.path.join(os.environ.get("RAG_INDEX_DIR", ".rag_index"), scope)
+
+
+def load_snapshot(snapshot_dir: str) -> Optional[Tuple[List[Document], np.ndarray]]:
+    """Return `(chunks, vectors)` from a snapshot directory, or None if absent."""
+    try:
+        with open(os.path.join(snapshot_dir, "chunks.json"), encoding="utf-8") as f:
+            records = json.load(f)
+        vectors = np.load(os.path.join(snapshot_dir, "vectors.npy"))
+    except (OSError, ValueError):
+        return None
+    chunks = [
+        Document(page_content=record["page_content"], metadata=record["metadata"])
+        for record in records
+    ]
+    if len(chunks) != len(vectors):
+        return None
+    try:
+        os.utime(snapshot_dir)  # most recently used snapshots survive pruning
+    except OSError:
+        pass
+    return chunks, vectors
+
+
+def load_failed(snapshot_dir: str) -> Dict[str, str]:
+    """Return the path -> error map of files a snapshot could not parse."""
+    try:
+        with open(os.path.join(snapshot_dir, "failed.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def prune_snapshots(snapshot_dir: str, keep: int) -> None:
+    """Delete all but the `keep` most recently used snapshots next to `snapshot_dir`.
+
+    `snapshot_dir` itself is always kept; in-progress temporary directories
+    are left alone.
+    """
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    try:
+        names = [name for name in os.listdir(parent) if not name.startswith(".")]
+        mtimes = {name: os.stat(os.path.join(parent, name)).st_mtime for name in names}
+    except OSError:
+        return
+    current = os.path.basename(os.path.abspath(snapshot_dir))
+    others = sorted((name for name in mtimes if name != current), key=mtimes.get, reverse=True)
+    for name in others[max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def save_snapshot(
+    snapshot_dir: str,
+    chunks: List[Document],
+    vectors: np.ndarray,
+    keep: Optional[int] = None,
+    failed: Optional[Dict[str, str]] = None,
+) -> None:
+    """Write chunks and vectors to `snapshot_dir` atomically (best-effort).
+
+    `failed` maps files that could not be parsed to their error. Once
+    published, older snapshots of the same data directory beyond the newest
+    `keep` (default: RAG_INDEX_KEEP, 2) are deleted.
+    """
+    if keep is None:
+        keep = int(os.environ.get("RAG_INDEX_KEEP", "2"))
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    tmp_dir = None
+    try:
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        with open(os.path.join(tmp_dir, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                [
+                    {"page_content": chunk.page_content, "metadata": chunk.metadata}
+                    for chunk in chunks
+                ],
+                f,
+                default=str,
+            )
+        np.save(os.path.join(tmp_dir, "vectors.npy"), vectors)
+        if failed:
+            with open(os.path.join(tmp_dir, "failed.json"), "w", encoding="utf-8") as f:
+                json.dump(failed, f)
+        os.replace(tmp_dir, snapshot_dir)
+    except OSError:
+        # Another process may have published the same snapshot first
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return
+    prune_snapshots(snapshot_dir, keep)